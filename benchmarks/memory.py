@@ -0,0 +1,58 @@
+"""
+Memory held by the WBS representations the estimation engine consumes.
+
+    python -m benchmarks.memory --tasks 50000
+
+Measures, with tracemalloc, what stays allocated for each representation
+of the same work breakdown: the module dict tree of a stored project, as
+decoded from its BSON document (what calculate_estimation and the snapshot
+builders walk), and the CompactWBS built from it.
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+
+import bson
+
+from benchmarks.wbs_generator import generate_project
+from services.compact_wbs import CompactWBS
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+
+    value = build()
+    retained, peak = tracemalloc.get_traced_memory()
+
+    tracemalloc.stop()
+    del value
+
+    return {"retained_bytes": retained, "peak_bytes": peak}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    document = bson.encode({"modules": generate_project(args.tasks, seed=args.seed)["modules"]})
+
+    dict_tree = measure(lambda: bson.decode(document)["modules"])
+    # decoded inside the measurement so the names it keeps are counted
+    compact = measure(lambda: CompactWBS.from_modules(bson.decode(document)["modules"]))
+
+    print(json.dumps({
+        "tasks": args.tasks,
+        "stored_modules": dict_tree,
+        "compact_wbs": compact,
+        "retained_reduction": round(
+            1 - compact["retained_bytes"] / dict_tree["retained_bytes"], 3
+        )
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
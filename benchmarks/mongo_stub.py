@@ -0,0 +1,30 @@
+from types import SimpleNamespace
+
+from bson import ObjectId
+
+
+class InMemoryCollection:
+    """
+    Just enough of a motor collection for the create_project path:
+    equality filters on top-level fields, no projections.
+    """
+
+    def __init__(self):
+        self.docs = {}
+
+    def _matches(self, doc, filter):
+        return all(doc.get(key) == value for key, value in filter.items())
+
+    async def find_one(self, filter=None, projection=None):
+        for doc in self.docs.values():
+            if self._matches(doc, filter or {}):
+                return doc
+        return None
+
+    async def insert_one(self, doc):
+        doc.setdefault("_id", ObjectId())
+        self.docs[doc["_id"]] = doc
+        return SimpleNamespace(inserted_id=doc["_id"])
+
+    def clear(self):
+        self.docs.clear()
@@ -0,0 +1,190 @@
+"""
+Benchmarks for the cost/timeline engine.
+
+    python -m benchmarks.run run --output bench.json
+    python -m benchmarks.run run --sizes 10 1000 --profiles balanced
+    python -m benchmarks.run compare benchmarks/baselines/baseline.json bench.json --threshold 0.2
+
+`run` writes machine-readable JSON; `compare` exits with status 1 when any
+case's median is more than `threshold` slower than the baseline. Baselines
+are machine specific: regenerate them on the machine that runs compare.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+# database.mongo refuses to import without a URL; nothing connects here
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017/estimly_bench")
+
+import numpy as np
+import pydantic
+from bson import ObjectId
+
+from benchmarks.mongo_stub import InMemoryCollection
+from benchmarks.wbs_generator import generate_project
+
+DEFAULT_SIZES = [10, 100, 1_000, 10_000, 50_000, 200_000]
+
+PROFILES = {
+    "balanced": {},
+    "dev_heavy_wide": {"role_mix": "dev_heavy", "level_mix": "simple", "fan_out": "wide"},
+    "qa_heavy_deep": {"role_mix": "qa_heavy", "level_mix": "complex", "fan_out": "deep"}
+}
+
+MIN_RUNS = 3
+MAX_RUNS = 50
+MIN_SECONDS = 0.5
+
+
+def time_case(fn):
+    fn()  # warm-up
+
+    timings = []
+    started = time.perf_counter()
+
+    while len(timings) < MAX_RUNS:
+        t0 = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t0)
+
+        if len(timings) >= MIN_RUNS and time.perf_counter() - started >= MIN_SECONDS:
+            break
+
+    return {
+        "runs": len(timings),
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "min_ms": round(min(timings) * 1000, 3)
+    }
+
+
+def build_cases(project):
+    from routes import projects as project_routes
+    from schemas.project import EstimationProjectRequest, ProjectCreate
+    from services import rate_cards, work_calendars
+    from services.cost_timeline_engine import calculate_estimation
+    from services.estimation_memo import estimation_memo
+
+    projects = InMemoryCollection()
+    project_routes.projects_collection = projects
+    # the company is looked up for its rate card and working calendar
+    rate_cards.companies_collection = InMemoryCollection()
+    work_calendars.companies_collection = InMemoryCollection()
+
+    user = {"_id": str(ObjectId()), "company_id": str(ObjectId())}
+    loop = asyncio.new_event_loop()
+
+    def create_project():
+        # every run prices the WBS instead of reusing the previous snapshot
+        projects.clear()
+        estimation_memo.clear()
+        payload = ProjectCreate.model_validate(project)
+        loop.run_until_complete(project_routes.create_project(None, payload, user))
+
+    return {
+        "calculate_estimation": lambda: calculate_estimation(project),
+        "validate_estimation_request": lambda: EstimationProjectRequest.model_validate(project),
+        "create_project": create_project
+    }
+
+
+def run(args):
+    results = []
+
+    for profile in args.profiles:
+        for size in args.sizes:
+            project = generate_project(size, seed=args.seed, **PROFILES[profile])
+
+            for case, fn in build_cases(project).items():
+                timing = time_case(fn)
+                results.append({"case": case, "profile": profile, "tasks": size, **timing})
+
+                print(
+                    f"{case:<28} {profile:<15} {size:>8} tasks  "
+                    f"median {timing['median_ms']:>10.3f} ms  ({timing['runs']} runs)",
+                    file=sys.stderr
+                )
+
+    from services.estimation_executor import estimation_executor
+    estimation_executor.shutdown()
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pydantic": pydantic.VERSION,
+            "seed": args.seed
+        },
+        "results": results
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    def key(result):
+        return result["case"], result["profile"], result["tasks"]
+
+    expected = {key(r): r for r in baseline["results"]}
+    regressions = 0
+
+    for result in current["results"]:
+        base = expected.get(key(result))
+        if not base:
+            continue
+
+        ratio = result["median_ms"] / base["median_ms"] if base["median_ms"] else 1
+        regressed = ratio > 1 + args.threshold
+        regressions += regressed
+
+        print(
+            f"{'REGRESSION' if regressed else 'ok':<10} "
+            f"{result['case']:<28} {result['profile']:<15} {result['tasks']:>8} tasks  "
+            f"{base['median_ms']:>10.3f} -> {result['median_ms']:>10.3f} ms  ({ratio:.2f}x)"
+        )
+
+    if regressions:
+        print(f"{regressions} case(s) regressed by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    run_parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=list(PROFILES))
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--output", help="write JSON here instead of stdout")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="compare a run against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.2)
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Validation cost of a large WBS request body.
+
+    python -m benchmarks.validation --tasks 20000
+
+Times, on the same JSON body, what a create-project request pays before the
+engine runs: the previous model-per-task tree (validation plus the
+model_dump() into the dicts that are persisted and priced) and the shared
+TypedDict schema, which validates straight into those dicts.
+"""
+import argparse
+import json
+import os
+from typing import List
+
+# database.mongo refuses to import without a URL; nothing connects here
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017/estimly_bench")
+
+from pydantic import BaseModel, Field
+
+from benchmarks.run import time_case
+from benchmarks.wbs_generator import generate_project
+from schemas.project import ProjectCreate
+
+
+# the model tree the project and template schemas used before schemas.wbs
+class LegacyTask(BaseModel):
+    name: str
+    hours: int = Field(gt=0)
+    role: str
+    level: str
+
+
+class LegacyFeature(BaseModel):
+    name: str
+    tasks: List[LegacyTask]
+
+
+class LegacyModule(BaseModel):
+    name: str
+    features: List[LegacyFeature]
+
+
+class LegacyProjectCreate(ProjectCreate):
+    modules: List[LegacyModule]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    body = json.dumps(generate_project(args.tasks, seed=args.seed))
+
+    def legacy():
+        payload = LegacyProjectCreate.model_validate(json.loads(body))
+        return [module.model_dump(mode="json") for module in payload.modules]
+
+    def shared_schema():
+        # what FastAPI does for a body parameter: json.loads, then validate
+        return ProjectCreate.model_validate(json.loads(body)).modules
+
+    def shared_schema_raw():
+        return ProjectCreate.model_validate_json(body).modules
+
+    assert legacy() == shared_schema() == shared_schema_raw()
+
+    results = {
+        "legacy_model_tree": time_case(legacy),
+        "shared_schema": time_case(shared_schema),
+        "shared_schema_raw_json": time_case(shared_schema_raw)
+    }
+
+    print(json.dumps({
+        "tasks": args.tasks,
+        **results,
+        "speedup": round(
+            results["legacy_model_tree"]["median_ms"] / results["shared_schema"]["median_ms"], 2
+        )
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import random
+
+from core.estimation_constants import RESOURCE_RATES, COMPLEXITY_MULTIPLIERS
+
+# relative weights per role / level; unlisted entries get 0
+ROLE_MIXES = {
+    "balanced": {role: 1 for role in RESOURCE_RATES},
+    "dev_heavy": {
+        "junior_dev": 4, "senior_dev": 5, "tech_lead": 1, "devops": 1,
+        "qa_junior": 1, "qa_senior": 1, "pm": 1
+    },
+    "qa_heavy": {
+        "junior_dev": 2, "senior_dev": 2, "qa_junior": 4, "qa_senior": 3,
+        "pm": 1, "business_analyst": 1
+    }
+}
+
+LEVEL_MIXES = {
+    "balanced": {level: 1 for level in COMPLEXITY_MULTIPLIERS},
+    "simple": {"low": 6, "medium": 3, "high": 1},
+    "complex": {"medium": 2, "high": 4, "extreme": 3}
+}
+
+# (features per module, tasks per feature)
+FAN_OUTS = {
+    "wide": (20, 5),
+    "balanced": (8, 10),
+    "deep": (3, 40)
+}
+
+
+def generate_modules(task_count, seed=0, role_mix="balanced", level_mix="balanced", fan_out="balanced"):
+    """
+    Deterministic WBS with exactly `task_count` tasks.
+    """
+    rng = random.Random(f"{seed}:{task_count}:{role_mix}:{level_mix}:{fan_out}")
+
+    roles, role_weights = zip(*ROLE_MIXES[role_mix].items())
+    levels, level_weights = zip(*LEVEL_MIXES[level_mix].items())
+    features_per_module, tasks_per_feature = FAN_OUTS[fan_out]
+
+    task_roles = rng.choices(roles, role_weights, k=task_count)
+    task_levels = rng.choices(levels, level_weights, k=task_count)
+
+    modules = []
+    produced = 0
+
+    while produced < task_count:
+        features = []
+
+        while produced < task_count and len(features) < features_per_module:
+            size = min(
+                task_count - produced,
+                rng.randint(1, 2 * tasks_per_feature - 1)
+            )
+            features.append({
+                "name": f"Feature {len(modules) + 1}.{len(features) + 1}",
+                "tasks": [
+                    {
+                        "name": f"Task {produced + i + 1}",
+                        "hours": rng.randint(1, 40),
+                        "role": task_roles[produced + i],
+                        "level": task_levels[produced + i]
+                    }
+                    for i in range(size)
+                ]
+            })
+            produced += size
+
+        modules.append({"name": f"Module {len(modules) + 1}", "features": features})
+
+    return modules
+
+
+def generate_project(task_count, seed=0, **mix):
+    """
+    ProjectCreate-shaped payload; also valid as EstimationProjectRequest.
+    """
+    rng = random.Random(seed)
+
+    return {
+        "name": f"Benchmark project {task_count}",
+        "client_name": "Benchmark client",
+        "description": None,
+        "estimation_technique": {"name": "Bottom-up"},
+        "target_margin": rng.randint(10, 40),
+        "risk_buffer": rng.randint(5, 20),
+        "negotiation_buffer": rng.randint(0, 10),
+        "estimated_team_size": rng.randint(2, 12),
+        "template_name": None,
+        "modules": generate_modules(task_count, seed, **mix)
+    }
@@ -27,3 +27,34 @@ DEFAULT_SETTINGS = {
     "working_hours_per_day": 8,
     "working_days_per_week": 5
 }
+
+# Monte Carlo risk simulation
+# Triangular spread around the adjusted task hours: (low factor, high factor)
+SIMULATION_SPREADS = {
+    "low": (0.9, 1.25),
+    "medium": (0.85, 1.5),
+    "high": (0.8, 1.8),
+    "extreme": (0.75, 2.2)
+}
+
+SIMULATION_SETTINGS = {
+    "default_trials": 10000,
+    "percentiles": [50, 80, 95],
+
+    # Trial budget: trials x tasks is capped so a 2,000-task WBS runs at
+    # most 10,000 trials, sampled in chunks of bounded memory
+    "max_cells": 20_000_000,
+    "chunk_cells": 1_000_000
+}
+
+# Timeline scheduling
+# Work on a feature flows through these phases in order; roles that are not
+# listed run in the build phase (1)
+SCHEDULE_ROLE_PHASES = {
+    "business_analyst": 0,
+    "ui_ux": 0,
+    "qa_junior": 2,
+    "qa_senior": 2
+}
+
+RESOURCE_EFFICIENCY = 0.8
@@ -0,0 +1,114 @@
+import hashlib
+import json
+
+import numpy as np
+
+from core.estimation_constants import (
+    RESOURCE_RATES,
+    COMPLEXITY_MULTIPLIERS,
+    DEFAULT_SETTINGS
+)
+
+
+class RateCard:
+    """
+    Compiled rates, complexity multipliers and working-time settings.
+
+    Roles and levels are interned to integer codes with dense rate and
+    multiplier arrays, so the estimation engines look values up by index.
+    Unknown roles price at 0 and unknown levels use a multiplier of 1, as in
+    calculate_task_cost.
+
+    `calibration` ({role: {level: factor}}) holds multipliers fitted from
+    actual hours; where a role/level pair has one it replaces the level's
+    complexity multiplier.
+    """
+
+    __slots__ = (
+        "resource_rates",
+        "complexity_multipliers",
+        "calibration",
+        "settings",
+        "version",
+        "fingerprint",
+        "role_codes",
+        "level_codes",
+        "rates",
+        "multipliers"
+    )
+
+    def __init__(self, resource_rates, complexity_multipliers, settings, version, calibration=None):
+        self.resource_rates = dict(resource_rates)
+        self.complexity_multipliers = dict(complexity_multipliers)
+        self.calibration = {
+            role: dict(levels) for role, levels in (calibration or {}).items()
+        }
+        self.settings = {**DEFAULT_SETTINGS, **settings}
+        self.version = version
+
+        self.fingerprint = hashlib.sha256(json.dumps(
+            [self.resource_rates, self.complexity_multipliers, self.settings]
+            + ([self.calibration] if self.calibration else []),
+            sort_keys=True
+        ).encode()).hexdigest()[:16]
+
+        self.role_codes = {role: i for i, role in enumerate(self.resource_rates)}
+        self.level_codes = {level: i for i, level in enumerate(self.complexity_multipliers)}
+
+        # trailing slot holds the fallback for unknown codes
+        self.rates = np.array(
+            [*self.resource_rates.values(), 0], dtype=np.float64
+        )
+        self.multipliers = np.array(
+            [*self.complexity_multipliers.values(), 1], dtype=np.float64
+        )
+
+    @property
+    def productivity_factor(self):
+        return self.settings["productivity_factor"]
+
+    def rates_for(self, roles):
+        unknown = len(self.role_codes)
+        return self.rates[[self.role_codes.get(role, unknown) for role in roles]]
+
+    def multipliers_for(self, levels):
+        unknown = len(self.level_codes)
+        return self.multipliers[[self.level_codes.get(level, unknown) for level in levels]]
+
+    def multiplier(self, role, level):
+        calibrated = self.calibration.get(role)
+        if calibrated and level in calibrated:
+            return calibrated[level]
+        return self.complexity_multipliers.get(level, 1)
+
+    def multiplier_matrix(self, roles, levels):
+        """
+        roles x levels multipliers, calibrated factors included.
+        """
+        matrix = np.tile(self.multipliers_for(levels), (len(roles), 1))
+
+        for r, role in enumerate(roles):
+            calibrated = self.calibration.get(role)
+            if calibrated:
+                for l, level in enumerate(levels):
+                    if level in calibrated:
+                        matrix[r, l] = calibrated[level]
+
+        return matrix
+
+    def with_overrides(self, resource_rates=None, complexity_multipliers=None, settings=None):
+        return RateCard(
+            {**self.resource_rates, **(resource_rates or {})},
+            {**self.complexity_multipliers, **(complexity_multipliers or {})},
+            {**self.settings, **(settings or {})},
+            f"{self.version}+overrides",
+            self.calibration
+        )
+
+
+DEFAULT_RATE_CARD = RateCard(
+    RESOURCE_RATES,
+    COMPLEXITY_MULTIPLIERS,
+    DEFAULT_SETTINGS,
+    "default"
+)
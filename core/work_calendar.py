@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import numpy as np
+
+from core.estimation_constants import DEFAULT_SETTINGS
+
+# business days are indexed from a year back to this many years ahead
+CALENDAR_HORIZON_YEARS = 20
+
+
+class WorkCalendar:
+    """
+    Company working calendar: timezone, working weekdays (the first
+    working_days_per_week days from Monday) and holidays.
+
+    Business days over the horizon are precomputed once into a sorted
+    array, with the ordinal of every calendar day in it, so adding N
+    business days to a date is two array lookups.
+    """
+
+    __slots__ = (
+        "timezone",
+        "working_days_per_week",
+        "holidays",
+        "first_day",
+        "business_days",
+        "day_ordinals"
+    )
+
+    def __init__(self, timezone="UTC", working_days_per_week=5, holidays=()):
+        try:
+            self.timezone = ZoneInfo(timezone or "UTC")
+        except (ZoneInfoNotFoundError, ValueError):
+            self.timezone = ZoneInfo("UTC")
+
+        self.working_days_per_week = working_days_per_week
+        self.holidays = np.array(sorted(holidays), dtype="datetime64[D]")
+
+        today = self.today()
+        self.first_day = np.datetime64(today - timedelta(days=366), "D")
+        last_day = np.datetime64(today + timedelta(days=366 * CALENDAR_HORIZON_YEARS), "D")
+
+        days = np.arange(self.first_day, last_day, dtype="datetime64[D]")
+        weekmask = [1] * working_days_per_week + [0] * (7 - working_days_per_week)
+        is_business = np.is_busday(days, weekmask=weekmask, holidays=self.holidays)
+
+        self.business_days = days[is_business]
+
+        # business days strictly before each calendar day, i.e. the index of
+        # the first business day on or after it
+        self.day_ordinals = np.concatenate(([0], np.cumsum(is_business)[:-1]))
+
+    def today(self):
+        return datetime.now(self.timezone).date()
+
+    def business_day_ordinals(self, dates):
+        offsets = (np.asarray(dates, dtype="datetime64[D]") - self.first_day).astype(np.int64)
+
+        if (offsets < 0).any() or (offsets >= self.day_ordinals.size).any():
+            raise ValueError("start_date is outside the working calendar")
+
+        return self.day_ordinals[offsets]
+
+    def business_days_at(self, ordinals):
+        if ordinals.size and ordinals.max() >= self.business_days.size:
+            raise ValueError(
+                f"Delivery falls beyond the {CALENDAR_HORIZON_YEARS} year working calendar"
+            )
+
+        return self.business_days[ordinals]
+
+    def delivery_dates(self, timelines, start_dates=None, settings=DEFAULT_SETTINGS):
+        """
+        Start, end and per-sprint dates for a batch of estimation timelines
+        ({"working_days_required", "weeks_required", "sprints_required"}),
+        one start date (date or None for today) per timeline.
+
+        Work starts on the first business day on or after the start date and
+        ends on the business day the remaining effort runs out, as counted
+        in working_days_required from the working hours per day. A sprint is
+        sprint_duration_weeks of working_days_per_week business days.
+        """
+        today = self.today()
+        starts = [
+            start or today for start in (start_dates or [None] * len(timelines))
+        ]
+
+        # snapshots stored before working_days_required count whole weeks
+        days = np.array([
+            t.get("working_days_required", t["weeks_required"] * self.working_days_per_week)
+            for t in timelines
+        ], dtype=np.int64)
+        sprints = np.array([t["sprints_required"] for t in timelines], dtype=np.int64)
+
+        start_ordinals = self.business_day_ordinals(starts)
+        working_days = np.maximum(days, 1)
+        end_ordinals = start_ordinals + working_days - 1
+
+        start_dates = self.business_days_at(start_ordinals)
+        end_dates = self.business_days_at(end_ordinals)
+
+        # every sprint of every timeline in one lookup
+        sprint_days = settings["sprint_duration_weeks"] * self.working_days_per_week
+        owner = np.repeat(np.arange(len(timelines)), sprints)
+        number = np.arange(owner.size) - np.repeat(np.cumsum(sprints) - sprints, sprints)
+
+        sprint_start_ordinals = start_ordinals[owner] + number * sprint_days
+        sprint_end_ordinals = np.minimum(
+            sprint_start_ordinals + sprint_days - 1, end_ordinals[owner]
+        )
+
+        sprint_starts = self.business_days_at(sprint_start_ordinals).astype(str).tolist()
+        sprint_ends = self.business_days_at(sprint_end_ordinals).astype(str).tolist()
+
+        results = []
+        offset = 0
+
+        for i, count in enumerate(sprints.tolist()):
+            results.append({
+                "timezone": self.timezone.key,
+                "start_date": str(start_dates[i]),
+                "end_date": str(end_dates[i]),
+                "working_days": int(working_days[i]),
+                "sprints": [
+                    {
+                        "sprint": n + 1,
+                        "start_date": sprint_starts[offset + n],
+                        "end_date": sprint_ends[offset + n]
+                    }
+                    for n in range(count)
+                ]
+            })
+            offset += count
+
+        return results
@@ -15,4 +15,6 @@ projects_collection = db.projects
 built_in_templates_collection = db.built_in_templates
 custom_templates_collection = db.custom_templates
 estimation_techniques_collection = db.estimation_techniques
+repricing_jobs_collection = db.repricing_jobs
+email_outbox_collection = db.email_outbox
 
@@ -1,3 +1,6 @@
+import time
+
+from decouple import config
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt
@@ -5,23 +8,71 @@ from bson import ObjectId
 
 from database.mongo import users_collection
 from utils.auth_jwt import SECRET_KEY, ALGORITHM
+from utils.ttl_cache import TTLCache
 
 security = HTTPBearer()
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-):
-    token = credentials.credentials
+# Principal cache
+
+PRINCIPAL_CACHE_SIZE = config("PRINCIPAL_CACHE_SIZE", default=10000, cast=int)
+# how long a changed user row can go unnoticed by other workers
+PRINCIPAL_CACHE_TTL_SECONDS = config("PRINCIPAL_CACHE_TTL_SECONDS", default=60, cast=int)
+# read endpoints trust the company_id/role claims without loading the user
+AUTH_CLAIMS_ONLY_READS = config("AUTH_CLAIMS_ONLY_READS", default=False, cast=bool)
+
+# fields routes read from the principal; never the password hash
+USER_PROJECTION = {
+    "full_name": 1,
+    "email": 1,
+    "role": 1,
+    "company_id": 1,
+    "auth_type": 1
+}
+
+# token -> verified claims, kept no longer than the token is valid
+_claims_cache = TTLCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL_SECONDS)
+
+# user id -> normalized user row
+_user_cache = TTLCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+def invalidate_user(user_id):
+    """
+    Drops a cached user row; call after changing a user's password, role
+    or company.
+    """
+    _user_cache.pop(str(user_id))
+
+
+def _verify_claims(token):
+    claims = _claims_cache.get(token)
+    if claims is not None:
+        return claims
 
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("user_id")
-        if not user_id:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        if not claims.get("user_id"):
             raise HTTPException(status_code=401, detail="Invalid token")
+        ObjectId(claims["user_id"])
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
+    ttl = PRINCIPAL_CACHE_TTL_SECONDS
+    if claims.get("exp"):
+        ttl = min(ttl, claims["exp"] - time.time())
+
+    if ttl > 0:
+        _claims_cache.set(token, claims, ttl)
+
+    return claims
+
+
+async def _load_user(user_id):
+    user = _user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    user = await users_collection.find_one({"_id": ObjectId(user_id)}, USER_PROJECTION)
 
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
@@ -34,4 +85,70 @@ async def get_current_user(
     company_id = user.get("company_id")
     user["company_id"] = str(company_id) if company_id else None
 
+    _user_cache.set(user_id, user)
     return user
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    return await get_user_from_token(credentials.credentials)
+
+
+# roles that may change what a company's stored projects are priced with:
+# rate cards, settings and calibration, and the repricing jobs they start
+PRICING_ADMIN_ROLES = ("ADMIN", "company_admin", "manager")
+
+
+def check_roles(user, roles):
+    if user.get("role") not in roles:
+        raise HTTPException(status_code=403, detail="Permission denied")
+
+
+def require_roles(*roles):
+    """
+    get_current_user restricted to users whose role is one of `roles`.
+    """
+    async def dependency(user=Depends(get_current_user)):
+        check_roles(user, roles)
+        return user
+
+    return dependency
+
+
+async def get_read_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    get_current_user for read endpoints. With AUTH_CLAIMS_ONLY_READS the
+    principal is built from the token claims alone, so a role or company
+    change shows up there only once the user signs in again.
+    """
+    if not AUTH_CLAIMS_ONLY_READS:
+        return await get_user_from_token(credentials.credentials)
+
+    claims = _verify_claims(credentials.credentials)
+
+    company_id = claims.get("company_id")
+    if not company_id or company_id == "None" or not claims.get("role"):
+        # tokens issued without these claims
+        return await get_user_from_token(credentials.credentials)
+
+    return {
+        "_id": claims["user_id"],
+        "id": claims["user_id"],
+        "company_id": company_id,
+        "role": claims["role"]
+    }
+
+
+async def get_user_from_token(token):
+    """
+    Resolves a bearer token to its user; also used where no Authorization
+    header is available, e.g. WebSocket handshakes.
+    """
+    claims = _verify_claims(token)
+    user = await _load_user(claims["user_id"])
+
+    # callers get their own copy of the cached row
+    return dict(user)
@@ -7,6 +7,7 @@ from internal.admin_security import internal_admin_auth
 from schemas.built_in_template import BuiltInTemplateCreate
 from schemas.built_in_template import BuiltInTemplateUpdate
 from utils.serializers import serialize_ids_only
+from services.estimation_snapshot import build_template_hour_matrix
 
 admin_built_in_templates_router = APIRouter(
     prefix="/internal/admin/built-in-templates",
@@ -36,13 +37,17 @@ async def add_built_in_template(
         raise HTTPException(400, "Built-in template already exists")
 
     now = datetime.utcnow()
+    modules = payload.modules
 
     doc = {
         "name": payload.name,
         "description": payload.description,
         "default_margin": payload.default_margin,
         "default_risk_buffer": payload.default_risk_buffer,
-        "modules": [m.model_dump() for m in payload.modules],
+        "modules": modules,
+        # role x level hours behind the catalog price estimates and the
+        # pricing of unmodified copies
+        "hour_matrix": build_template_hour_matrix(modules),
         "add_ons": [a.model_dump() for a in payload.add_ons],
         "status": "active",
         "created_by": "system",
@@ -71,6 +76,9 @@ async def patch_built_in_template(
         raise HTTPException(400, "No valid fields provided for update")
 
     # addons are ALREADY dicts here → no conversion needed
+    if update_fields.get("modules") is not None:
+        update_fields["hour_matrix"] = build_template_hour_matrix(update_fields["modules"])
+
     update_fields["updated_at"] = datetime.utcnow()
 
     result = await built_in_templates_collection.update_one(
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+
+from internal.admin_security import internal_admin_auth
+from services.admission_control import admission_metrics
+from services.email_outbox import email_outbox
+from services.password_hasher import password_hasher
+
+admin_metrics_router = APIRouter(
+    prefix="/internal/admin/metrics",
+    tags=["Internal Admin • Metrics"]
+)
+
+
+@admin_metrics_router.get("")
+async def get_metrics(
+    _=Depends(internal_admin_auth)
+):
+    return {
+        "password_hashing": password_hasher.metrics(),
+        "auth_admission": admission_metrics(),
+        "email_outbox": email_outbox.metrics()
+    }
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends
+
+from database.mongo import companies_collection
+from internal.admin_security import internal_admin_auth
+from services.repricing_jobs import start_repricing_job
+
+admin_repricing_jobs_router = APIRouter(
+    prefix="/internal/admin/repricing-jobs",
+    tags=["Internal Admin • Repricing Jobs"]
+)
+
+
+# After a deploy that changes the default rates or multipliers
+@admin_repricing_jobs_router.post("")
+async def reprice_all_companies(
+    _=Depends(internal_admin_auth)
+):
+    job_ids = []
+
+    async for company in companies_collection.find({}, {"_id": 1}):
+        job = await start_repricing_job(company["_id"])
+        job_ids.append(str(job["_id"]))
+
+    return {
+        "message": "Repricing jobs started",
+        "job_ids": job_ids
+    }
@@ -13,9 +13,15 @@ from routes.built_in_templates import router as built_in_templates_router
 from internal.admin_built_in_templates import admin_built_in_templates_router
 from routes.estimation_techniques import router as estimation_techniques_router
 from internal.admin_estimation_techniques import admin_estimation_techniques_router
+from internal.admin_repricing_jobs import admin_repricing_jobs_router
+from internal.admin_metrics import admin_metrics_router
 from routes.social_auth import router as social_auth_router
 
 from routes.estimation_calculate import router as estimation_calculate_router
+from services.estimation_executor import estimation_executor
+from services.password_hasher import password_hasher
+from services.email_outbox import email_outbox
+from services.repricing_jobs import ensure_repricing_indexes, resume_repricing_jobs
 
 app = FastAPI(title="Estimly Backend")
 
@@ -51,8 +57,32 @@ app.include_router(estimation_calculate_router)
 app.include_router(estimation_techniques_router)
 app.include_router(admin_built_in_templates_router)
 app.include_router(admin_estimation_techniques_router)
+app.include_router(admin_repricing_jobs_router)
+app.include_router(admin_metrics_router)
 app.include_router(social_auth_router)
 
+@app.on_event("startup")
+async def resume_interrupted_repricing_jobs():
+    await ensure_repricing_indexes()
+    await resume_repricing_jobs()
+
+
+@app.on_event("startup")
+async def start_email_outbox():
+    await email_outbox.start()
+
+
+@app.on_event("shutdown")
+async def stop_email_outbox():
+    await email_outbox.stop()
+
+
+@app.on_event("shutdown")
+def shutdown_estimation_executor():
+    estimation_executor.shutdown()
+    password_hasher.shutdown()
+
+
 @app.get("/")
 def health():
     return {"status": "ok"}
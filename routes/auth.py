@@ -1,21 +1,30 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from datetime import datetime
 from bson import ObjectId
 
 from database.mongo import users_collection, companies_collection
 from schemas.auth import SignupRequest, LoginRequest, UserResponse
-from utils.security import hash_password, verify_password
+from services.password_hasher import password_hasher
+from services.admission_control import (
+    login_admission,
+    signup_admission,
+    forgot_password_admission
+)
 from utils.auth_jwt import create_access_token
 from utils.normalize import normalize
 from utils.password_reset import create_reset_token, verify_reset_token
-from utils.email import send_reset_email
+from utils.email import reset_email
+from services.email_outbox import email_outbox
+from dependencies import invalidate_user
 from schemas.auth import ForgotPasswordRequest, ResetPasswordRequest
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 # Signup Endpoint
 @router.post("/signup", response_model=UserResponse)
-async def signup(payload: SignupRequest):
+async def signup(request: Request, payload: SignupRequest):
+    signup_admission.check(request, payload.email)
+
     # 1. Check email uniqueness
     existing_user = await users_collection.find_one({"email": payload.email})
     if existing_user:
@@ -52,7 +61,7 @@ async def signup(payload: SignupRequest):
     user_doc = {
         "full_name": payload.full_name,
         "email": payload.email,
-        "password_hash": hash_password(payload.password),
+        "password_hash": await password_hasher.hash(payload.password),
         "role": role,
         "company_id": company_id,
         "created_at": datetime.utcnow()
@@ -70,11 +79,26 @@ async def signup(payload: SignupRequest):
 
 # Login Endpoint
 @router.post("/login")
-async def login(payload: LoginRequest):
+async def login(request: Request, payload: LoginRequest):
+    login_admission.check(request, payload.email)
+
     user = await users_collection.find_one({"email": payload.email})
-    if not user or not verify_password(payload.password, user["password_hash"]):
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    valid, new_hash = await password_hasher.verify_and_update(
+        payload.password, user["password_hash"]
+    )
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    # hashed with outdated Argon2 parameters: upgrade while we have the password
+    if new_hash:
+        await users_collection.update_one(
+            {"_id": user["_id"], "password_hash": user["password_hash"]},
+            {"$set": {"password_hash": new_hash}}
+        )
+
     token = create_access_token({
         "user_id": str(user["_id"]),
         "company_id": str(user["company_id"]),
@@ -95,7 +119,9 @@ async def login(payload: LoginRequest):
 
 # Forgot Password
 @router.post("/forgot-password")
-async def forgot_password(payload: ForgotPasswordRequest):
+async def forgot_password(request: Request, payload: ForgotPasswordRequest):
+    forgot_password_admission.check(request, payload.email)
+
     user = await users_collection.find_one({"email": payload.email})
     
     # Security: always respond the same
@@ -107,8 +133,14 @@ async def forgot_password(payload: ForgotPasswordRequest):
 
     reset_link = f"http://localhost:3000/reset-password?token={token}"
 
-    # Send reset email
-    await send_reset_email(payload.email, reset_link)
+    # Queue reset email; repeated requests within the window send one email
+    subject, html = reset_email(reset_link)
+    await email_outbox.enqueue(
+        payload.email,
+        subject,
+        html,
+        coalesce_key=f"password_reset:{payload.email.lower()}"
+    )
 
     return {"success": True, "message": "Reset link sent to your email"}
 
@@ -125,7 +157,7 @@ async def reset_password(payload: ResetPasswordRequest):
         raise HTTPException(status_code=400, detail="Invalid token")
     
     #  CHECK: new password should NOT be same as old password
-    if verify_password(payload.new_password, user["password_hash"]):
+    if await password_hasher.verify(payload.new_password, user["password_hash"]):
         raise HTTPException(
             status_code=400,
             detail="New password cannot be the same as your old password"
@@ -133,7 +165,8 @@ async def reset_password(payload: ResetPasswordRequest):
 
     await users_collection.update_one(
         {"_id": user["_id"]},
-        {"$set": {"password_hash": hash_password(payload.new_password)}}
+        {"$set": {"password_hash": await password_hasher.hash(payload.new_password)}}
     )
+    invalidate_user(user["_id"])
 
     return {"success": True, "message": "Password reset successfully"}  
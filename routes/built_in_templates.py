@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from database.mongo import built_in_templates_collection
 from utils.serializers import serialize_ids_only
-from dependencies import get_current_user
+from dependencies import get_read_user
+from services.template_estimates import estimate_template
+from services.rate_cards import get_rate_card
 
 router = APIRouter(
     prefix="/api/built-in-templates",
@@ -9,11 +11,18 @@ router = APIRouter(
 )
 
 @router.get("/")
-async def get_builtin_templates(user=Depends(get_current_user)):
+async def get_builtin_templates(
+    team_size: int = 1,
+    user=Depends(get_read_user)
+):
     """
     Global endpoint
-    Returns all ACTIVE built-in templates
+    Returns all ACTIVE built-in templates, each with its estimated cost,
+    price and weeks for `team_size` under the company rate card
     """
+    if team_size < 1:
+        raise HTTPException(status_code=400, detail="team_size must be positive")
+
     cursor = built_in_templates_collection.find(
         {"status": "active"},
         {
@@ -24,8 +33,15 @@ async def get_builtin_templates(user=Depends(get_current_user)):
             "default_risk_buffer": 1,
             "modules": 1,
             "add_ons": 1,
+            "hour_matrix": 1,
         }
     )
 
     templates = await cursor.to_list(length=None)
+    rate_card = await get_rate_card(user["company_id"])
+
+    for template in templates:
+        template["estimate"] = estimate_template(template, rate_card, team_size)
+        template.pop("hour_matrix", None)
+
     return [serialize_ids_only(t) for t in templates]
@@ -3,15 +3,41 @@ from bson import ObjectId
 from datetime import datetime
 
 from database.mongo import companies_collection
-from dependencies import get_current_user
+from dependencies import (
+    PRICING_ADMIN_ROLES,
+    check_roles,
+    get_current_user,
+    get_read_user,
+    require_roles
+)
 from schemas.company import CompanyUpdate
 from utils.normalize import normalize
 from utils.serializers import serialize_ids_only
+from services.rate_cards import (
+    RATE_CARD_FIELDS,
+    RATE_ENTRY_FIELDS,
+    to_rate_entries,
+    from_rate_entries,
+    invalidate_rate_card
+)
+from services.work_calendars import CALENDAR_FIELDS, invalidate_work_calendar
+from services.repricing_jobs import start_repricing_job
+from services.calibration import recalibrate_company
+from database.mongo import repricing_jobs_collection
 
 router = APIRouter(prefix="/api/company", tags=["Company"])
 
+
+def company_response(company):
+    # rate entries are returned in the {name: value} shape PATCH accepts
+    for field in RATE_ENTRY_FIELDS:
+        if field in company:
+            company[field] = from_rate_entries(field, company[field])
+    return serialize_ids_only(company)
+
+
 @router.get("/")
-async def get_company(user=Depends(get_current_user)):
+async def get_company(user=Depends(get_read_user)):
     company = await companies_collection.find_one(
         {"_id": ObjectId(user["company_id"])}
     )
@@ -19,7 +45,7 @@ async def get_company(user=Depends(get_current_user)):
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
 
-    return serialize_ids_only(company)
+    return company_response(company)
 
 @router.patch("/")
 async def update_company(
@@ -28,6 +54,26 @@ async def update_company(
 ):
     update_data = payload.dict(exclude_unset=True)
 
+    rate_card_changed = any(field in update_data for field in RATE_CARD_FIELDS)
+    calendar_changed = any(field in update_data for field in CALENDAR_FIELDS)
+
+    if rate_card_changed:
+        # reprices every project of the company
+        check_roles(user, PRICING_ADMIN_ROLES)
+
+    if update_data.get("holidays") is not None:
+        update_data["holidays"] = sorted(day.isoformat() for day in update_data["holidays"])
+
+    for field in RATE_ENTRY_FIELDS:
+        if update_data.get(field) is not None:
+            update_data[field] = to_rate_entries(field, update_data[field])
+
+    # settings are merged field by field
+    settings = update_data.pop("estimation_settings", None) or {}
+    for key, value in settings.items():
+        if value is not None:
+            update_data[f"estimation_settings.{key}"] = value
+
     if not update_data:
         raise HTTPException(status_code=400, detail="No fields provided")
 
@@ -36,16 +82,94 @@ async def update_company(
 
     update_data["updated_at"] = datetime.utcnow()
 
+    update = {"$set": update_data}
+
+    if rate_card_changed:
+        update["$inc"] = {"rate_card_version": 1}
+
     company = await companies_collection.find_one_and_update(
         {"_id": ObjectId(user["company_id"])},
-        {"$set": update_data},
+        update,
         return_document=True
     )
 
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
 
+    if rate_card_changed:
+        invalidate_rate_card(user["company_id"])
+        # stored project snapshots were priced with the old rates
+        await start_repricing_job(user["company_id"])
+
+    if calendar_changed:
+        invalidate_work_calendar(user["company_id"])
+
     return {
         "message": "Company data updated successfully",
-        "data": serialize_ids_only(company)
+        "data": company_response(company)
     }
+
+
+# Re-pricing of stored project snapshots
+@router.post("/repricing-jobs")
+async def create_repricing_job(
+    user=Depends(require_roles(*PRICING_ADMIN_ROLES))
+):
+    job = await start_repricing_job(user["company_id"])
+    return serialize_ids_only(job)
+
+
+@router.get("/repricing-jobs/{job_id}")
+async def get_repricing_job(
+    job_id: str,
+    user=Depends(get_read_user)
+):
+    try:
+        job = await repricing_jobs_collection.find_one({
+            "_id": ObjectId(job_id),
+            "company_id": ObjectId(user["company_id"])
+        })
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid job ID")
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Repricing job not found")
+
+    job["progress_percent"] = (
+        round(job["processed"] / job["total"] * 100, 1) if job.get("total") else None
+    )
+
+    return serialize_ids_only(job)
+
+
+# Multiplier calibration from completed projects
+@router.get("/calibration")
+async def get_calibration(user=Depends(get_read_user)):
+    company = await companies_collection.find_one(
+        {"_id": ObjectId(user["company_id"])},
+        {
+            "calibration.factors": 1,
+            "calibration.revision": 1,
+            "calibration.fitted_at": 1,
+            "calibration_pending": 1
+        }
+    )
+
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+
+    calibration = company.get("calibration") or {"factors": [], "revision": None, "fitted_at": None}
+
+    # set while a completed project is missing from the fit
+    return {**calibration, "pending": bool(company.get("calibration_pending"))}
+
+
+@router.post("/calibration")
+async def refit_calibration(user=Depends(require_roles(*PRICING_ADMIN_ROLES))):
+    if not await recalibrate_company(user["company_id"]):
+        raise HTTPException(status_code=409, detail="Calibration changed meanwhile, please retry")
+
+    # stored snapshots were priced with the previous multipliers
+    await start_repricing_job(user["company_id"])
+
+    return await get_calibration(user)
@@ -6,7 +6,10 @@ from schemas.custom_template import CustomTemplateCreate
 from schemas.custom_template import CustomTemplateUpdate
 from database.mongo import custom_templates_collection
 from utils.serializers import serialize_ids_only
-from dependencies import get_current_user
+from dependencies import get_current_user, get_read_user
+from services.estimation_snapshot import build_template_hour_matrix
+from services.template_estimates import estimate_template
+from services.rate_cards import get_rate_card
 
 router = APIRouter(prefix="/api/custom-templates", tags=["Templates"])
 
@@ -19,12 +22,17 @@ async def create_custom_template(
     # if user["role"] not in ["manager", "company_admin"]:
     #     raise HTTPException(403, "Permission denied")
 
+    modules = payload.modules
+
     template_doc = {
         "name": payload.name,
         "description": payload.description,
         "default_margin": payload.default_margin,
         "default_risk_buffer": payload.default_risk_buffer,
-        "modules": [module.dict() for module in payload.modules],
+        "modules": modules,
+        # role x level hours behind the catalog price estimates and the
+        # pricing of unmodified copies
+        "hour_matrix": build_template_hour_matrix(modules),
         "status": "active",
         "company_id": ObjectId(user["company_id"]),
         "created_by": ObjectId(user["id"]),
@@ -44,11 +52,15 @@ async def create_custom_template(
 async def get_custom_templates(
     page: int = 1,
     limit: int = 10,
-    user=Depends(get_current_user)
+    team_size: int = 1,
+    user=Depends(get_read_user)
 ):
     if page < 1 or limit < 1:
         raise HTTPException(status_code=400, detail="Invalid pagination params")
 
+    if team_size < 1:
+        raise HTTPException(status_code=400, detail="team_size must be positive")
+
     skip = (page - 1) * limit
 
     cursor = (
@@ -60,6 +72,12 @@ async def get_custom_templates(
     )
 
     templates = await cursor.to_list(length=limit)
+    rate_card = await get_rate_card(user["company_id"])
+
+    for template in templates:
+        template["estimate"] = estimate_template(template, rate_card, team_size)
+        template.pop("hour_matrix", None)
+
     return [serialize_ids_only(t) for t in templates]
 
 
@@ -67,7 +85,7 @@ async def get_custom_templates(
 @router.get("/{template_id}")
 async def get_custom_template_by_id(
     template_id: str,
-    user=Depends(get_current_user)
+    user=Depends(get_read_user)
 ):
     try:
         template = await custom_templates_collection.find_one({
@@ -80,6 +98,8 @@ async def get_custom_template_by_id(
     if not template:
         raise HTTPException(status_code=404, detail="Template not found")
 
+    template.pop("hour_matrix", None)
+
     return serialize_ids_only(template)
 
 
@@ -96,6 +116,9 @@ async def update_custom_template(
     if not update_data:
         raise HTTPException(status_code=400, detail="No data provided for update")
 
+    if update_data.get("modules") is not None:
+        update_data["hour_matrix"] = build_template_hour_matrix(update_data["modules"])
+
     update_data["updated_at"] = datetime.utcnow()
 
     # Update and return updated document in ONE db call
@@ -111,6 +134,8 @@ async def update_custom_template(
     if not template:
         raise HTTPException(status_code=404, detail="Template not found")
 
+    template.pop("hour_matrix", None)
+
     return {
         "message": "Template updated successfully",
         "data": serialize_ids_only(template)
@@ -1,13 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
 from bson import ObjectId
-from dependencies import get_current_user
+from dependencies import get_read_user
 from database.mongo import projects_collection
 from utils.serializers import serialize_ids_only
 
 router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
 
 @router.get("/summary")
-async def dashboard_summary(user=Depends(get_current_user)):
+async def dashboard_summary(user=Depends(get_read_user)):
 
     # Guard for social-login users
     if not user.get("company_id"):
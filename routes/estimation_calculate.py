@@ -1,7 +1,37 @@
-from fastapi import APIRouter, Depends
-from services.cost_timeline_engine import calculate_estimation
-from schemas.project import EstimationProjectRequest
-from dependencies import get_current_user
+import asyncio
+
+from decouple import config
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from services.cost_timeline_engine import EstimationAccumulator
+from services.columnar_engine import calculate_estimation_batch
+from services.sensitivity_sweep import sweep_estimation
+from services.estimation_solver import solve_estimation
+from services.estimation_tasks import estimate_project, count_tasks
+from services.compact_wbs import CompactWBS
+from services.live_estimation import LiveEstimationSession
+from services.risk_simulation import simulate_estimation
+from services.estimation_executor import estimation_executor
+from services.rate_cards import get_rate_card
+from services.work_calendars import get_work_calendar, with_delivery_dates
+from services.estimation_memo import estimation_memo, estimation_key
+from schemas.project import (
+    EstimationProjectRequest,
+    EstimationBatchRequest,
+    EstimationSweepRequest,
+    EstimationSolveRequest,
+    EstimationStreamHeader,
+    EstimationStreamTask,
+    LiveSessionAuth,
+    LiveEstimationEdit
+)
+from dependencies import get_current_user, get_user_from_token
+from utils.ndjson import iter_ndjson_lines, NDJSONLineTooLong
+
+# live sessions hold their WBS in memory, so their size is capped
+LIVE_SESSION_MAX_TASKS = config("LIVE_SESSION_MAX_TASKS", default=50_000, cast=int)
+# a connection that has not authenticated by then is closed
+LIVE_SESSION_AUTH_TIMEOUT_SECONDS = config("LIVE_SESSION_AUTH_TIMEOUT_SECONDS", default=10, cast=float)
 
 router = APIRouter(
     prefix="/api/estimation",
@@ -10,10 +40,307 @@ router = APIRouter(
 
 @router.post("/calculate")
 async def calculate_project_estimation(
+    request: Request,
     payload: EstimationProjectRequest,
     user=Depends(get_current_user)
 ):
+    rate_card = await get_rate_card(user["company_id"])
+
+    project = payload.model_dump(exclude={"modules"})
+
+    # an unseeded simulation is meant to differ between calls
+    memo_key = None
+    if not payload.simulation or payload.simulation.seed is not None:
+        memo_key = estimation_key(project, payload.modules, rate_card)
+
+    result = estimation_memo.get(memo_key) if memo_key else None
+
+    if result is None:
+        # built once from the validated dicts, no copy of the tree
+        wbs = CompactWBS.from_modules(payload.modules)
+
+        try:
+            result = await estimation_executor.run(
+                estimate_project,
+                wbs,
+                project,
+                rate_card,
+                task_count=wbs.task_count,
+                request=request
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        if result is None:
+            # client disconnected, nothing to answer
+            return Response(status_code=204)
+
+        if memo_key:
+            estimation_memo.set(memo_key, result)
+
+    calendar = await get_work_calendar(user["company_id"])
+
+    try:
+        [result] = with_delivery_dates(
+            [result], [payload.start_date], calendar, rate_card.settings
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return result
+
+
+@router.post("/calculate-batch")
+async def calculate_project_estimation_batch(
+    request: Request,
+    payload: EstimationBatchRequest,
+    user=Depends(get_current_user)
+):
+    rate_card = await get_rate_card(user["company_id"])
+
+    projects = [
+        {**p.model_dump(exclude={"modules"}), "modules": p.modules}
+        for p in payload.projects
+    ]
+    results = await estimation_executor.run(
+        calculate_estimation_batch,
+        projects,
+        rate_card,
+        task_count=sum(count_tasks(p["modules"]) for p in projects),
+        request=request
+    )
+
+    if results is None:
+        return Response(status_code=204)
+
+    calendar = await get_work_calendar(user["company_id"])
+
+    try:
+        results = with_delivery_dates(
+            results,
+            [p.start_date for p in payload.projects],
+            calendar,
+            rate_card.settings
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return results
+
+
+@router.get("/metrics")
+async def estimation_executor_metrics(user=Depends(get_current_user)):
+    return {
+        **estimation_executor.metrics(),
+        "memo": estimation_memo.stats()
+    }
+
+
+@router.post("/sweep")
+async def sweep_project_estimation(
+    payload: EstimationSweepRequest,
+    user=Depends(get_current_user)
+):
+    rate_card = await get_rate_card(user["company_id"])
+
     project = payload.model_dump()
-    result = calculate_estimation(project)
+
+    try:
+        result = sweep_estimation(project, rate_card)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
     return result
+
+
+@router.post("/solve")
+async def solve_project_estimation(
+    payload: EstimationSolveRequest,
+    user=Depends(get_current_user)
+):
+    rate_card = await get_rate_card(user["company_id"])
+
+    project = payload.model_dump()
+
+    try:
+        result = solve_estimation(project, rate_card)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return result
+
+
+@router.post("/calculate-stream")
+async def calculate_project_estimation_stream(
+    request: Request,
+    user=Depends(get_current_user)
+):
+    """
+    NDJSON body: the first line holds the pricing fields and start_date of
+    EstimationProjectRequest, every following line is one task tagged with
+    its "module" and "feature", modules in order. Tasks are folded into
+    running aggregates as they arrive, so memory stays bounded whatever the
+    payload size.
+    """
+    rate_card = await get_rate_card(user["company_id"])
+
+    header = None
+    accumulator = EstimationAccumulator(rate_card)
+
+    try:
+        async for line_number, line in iter_ndjson_lines(request.stream()):
+            try:
+                if header is None:
+                    header = EstimationStreamHeader.model_validate_json(line)
+                    continue
+
+                record = EstimationStreamTask.model_validate_json(line)
+            except ValidationError as e:
+                raise HTTPException(
+                    status_code=422,
+                    detail={"line": line_number, "errors": e.errors(include_url=False)}
+                )
+
+            accumulator.add_task(record.module, {
+                "hours": record.hours,
+                "role": record.role,
+                "level": record.level
+            })
+    except NDJSONLineTooLong as e:
+        raise HTTPException(status_code=413, detail=f"Line {e.args[0]} is too long")
+
+    if header is None:
+        raise HTTPException(status_code=400, detail="Missing estimation header line")
+
+    result = accumulator.result(header.model_dump())
+
+    calendar = await get_work_calendar(user["company_id"])
+
+    try:
+        [result] = with_delivery_dates(
+            [result], [header.start_date], calendar, rate_card.settings
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return result
+
+
+@router.websocket("/live")
+async def live_project_estimation(websocket: WebSocket):
+    """
+    Live estimation session. The first message is a LiveSessionAuth; the
+    second an EstimationProjectRequest, answered with the full result as
+    /calculate computes it; every later message is a LiveEstimationEdit,
+    answered with only the sections and modules that changed. Edits do not
+    re-run the risk simulation. Errors are reported without closing the
+    session.
+    """
+    await websocket.accept()
+
+    try:
+        try:
+            auth = LiveSessionAuth.model_validate_json(
+                await asyncio.wait_for(
+                    websocket.receive_text(), LIVE_SESSION_AUTH_TIMEOUT_SECONDS
+                )
+            )
+            user = await get_user_from_token(auth.token)
+        except (asyncio.TimeoutError, ValidationError, HTTPException):
+            await websocket.close(code=1008)
+            return
+
+        try:
+            payload = EstimationProjectRequest.model_validate_json(
+                await websocket.receive_text()
+            )
+        except ValidationError as e:
+            await websocket.send_json({
+                "type": "error",
+                "detail": e.errors(include_url=False, include_context=False)
+            })
+            await websocket.close(code=1003)
+            return
+
+        task_count = count_tasks(payload.modules)
+        if task_count > LIVE_SESSION_MAX_TASKS:
+            await websocket.send_json({
+                "type": "error",
+                "detail": f"Live sessions are limited to {LIVE_SESSION_MAX_TASKS} tasks"
+            })
+            await websocket.close(code=1009)
+            return
+
+        rate_card = await get_rate_card(user["company_id"])
+        calendar = await get_work_calendar(user["company_id"])
+
+        project = payload.model_dump()
+        session = LiveEstimationSession(
+            project, rate_card, calendar, max_tasks=LIVE_SESSION_MAX_TASKS
+        )
+
+        try:
+            result = session.result()
+
+            if payload.simulation:
+                result["simulation"] = await estimation_executor.run(
+                    simulate_estimation,
+                    CompactWBS.from_modules(payload.modules),
+                    project,
+                    payload.simulation.trials,
+                    payload.simulation.seed,
+                    rate_card,
+                    task_count=task_count
+                )
+        except ValueError as e:
+            await websocket.send_json({"type": "error", "detail": str(e)})
+            await websocket.close(code=1003)
+            return
+        except HTTPException as e:
+            # estimation workers are busy
+            await websocket.send_json({"type": "error", "detail": e.detail})
+            await websocket.close(code=1013)
+            return
+
+        await websocket.send_json({"type": "result", "result": result})
+
+        seq = 0
+        while True:
+            message = await websocket.receive_text()
+            seq += 1
+
+            try:
+                edit = LiveEstimationEdit.model_validate_json(message)
+            except ValidationError as e:
+                await websocket.send_json({
+                    "type": "error",
+                    "seq": seq,
+                    "detail": e.errors(include_url=False, include_context=False)
+                })
+                continue
+
+            error = None
+
+            # ops apply in order; a failing op stops the rest of the edit
+            for op in edit.ops:
+                try:
+                    session.apply(op.model_dump())
+                except ValueError as e:
+                    error = str(e)
+                    break
+
+            try:
+                changes = session.delta()
+            except ValueError as e:
+                # the edited WBS cannot be dated or scheduled: drop the edit
+                session.rollback()
+                await websocket.send_json({"type": "error", "seq": seq, "detail": str(e)})
+                continue
+
+            response = {"type": "delta", "seq": seq, "changes": changes}
+            if error:
+                response["error"] = error
+
+            await websocket.send_json(response)
+    except WebSocketDisconnect:
+        return
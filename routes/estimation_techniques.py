@@ -3,7 +3,7 @@ from bson import ObjectId
 
 from database.mongo import estimation_techniques_collection
 from utils.serializers import serialize_ids_only
-from dependencies import get_current_user
+from dependencies import get_read_user
 
 
 router = APIRouter(
@@ -13,7 +13,7 @@ router = APIRouter(
 
 
 @router.get("/")
-async def get_estimation_techniques(user=Depends(get_current_user)):
+async def get_estimation_techniques(user=Depends(get_read_user)):
     """
     Returns all ACTIVE estimation techniques
     """
@@ -38,7 +38,7 @@ async def get_estimation_techniques(user=Depends(get_current_user)):
 @router.get("/{technique_id}")
 async def get_estimation_technique_by_id(
     technique_id: str,
-    user=Depends(get_current_user)
+    user=Depends(get_read_user)
 ):
     technique = await estimation_techniques_collection.find_one(
         {
@@ -1,25 +1,99 @@
-from fastapi import APIRouter, Depends, HTTPException
+import copy
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from datetime import datetime
 from bson import ObjectId
 from pymongo import ReturnDocument
-from database.mongo import projects_collection
-from dependencies import get_current_user
-from schemas.project import ProjectCreate, ProjectUpdate
+from database.mongo import (
+    projects_collection,
+    built_in_templates_collection,
+    custom_templates_collection
+)
+from dependencies import PRICING_ADMIN_ROLES, check_roles, get_current_user, get_read_user
+from schemas.project import (
+    ProjectCreate,
+    ProjectFromTemplateCreate,
+    ProjectUpdate,
+    ProjectRepriceRequest,
+    ProjectActualsUpdate
+)
 from utils.normalize import normalize
 from utils.serializers import serialize_ids_only
-from services.cost_timeline_engine import calculate_estimation
+from services.estimation_snapshot import (
+    build_hour_matrix,
+    build_estimation_snapshot,
+    reprice_from_matrix,
+    module_cache_is_current,
+    module_cache_from_hour_matrix,
+    snapshot_from_module_cache
+)
+from services.rate_cards import get_rate_card
+from services.work_calendars import (
+    get_work_calendar,
+    with_delivery_dates,
+    with_project_dates
+)
+from services.estimation_tasks import count_tasks
+from services.estimation_executor import estimation_executor
+from services.estimation_memo import estimation_memo, estimation_key
+from services.calibration import (
+    project_samples,
+    sufficient_stats,
+    update_company_calibration
+)
+from services.template_instantiation import apply_template_overrides
+from services.repricing_jobs import start_repricing_job
 
 
 router = APIRouter(prefix="/api/projects", tags=["Projects"])
 
-# Create
-@router.post("/")
-async def create_project(
-    payload: ProjectCreate,
-    user=Depends(get_current_user)
-):
-    name_norm = normalize(payload.name)
-    client_norm = normalize(payload.client_name)
+# fields that feed estimation_snapshot
+ESTIMATION_FIELDS = {
+    "modules",
+    "target_margin",
+    "risk_buffer",
+    "negotiation_buffer",
+    "estimated_team_size",
+    "start_date"
+}
+
+async def _price_new_project(request, project_data, now, rate_card):
+    # a project created again from the same WBS (retries, copies) reuses the
+    # complete snapshot, hour matrix and module cache included
+    memo_key = estimation_key(project_data, project_data["modules"], rate_card, kind="snapshot")
+    cached = estimation_memo.get(memo_key)
+
+    if cached is not None:
+        return {**copy.deepcopy(cached), "calculated_at": now}
+
+    # calculate estimation while creating project
+    estimation_snapshot = await estimation_executor.run(
+        build_estimation_snapshot,
+        project_data,
+        now,
+        None,
+        rate_card,
+        task_count=count_tasks(project_data["modules"]),
+        request=request
+    )
+    if estimation_snapshot is not None:
+        estimation_memo.set(memo_key, copy.deepcopy(estimation_snapshot))
+
+    return estimation_snapshot
+
+
+async def insert_project(request, user, project_data, start_date, fields, hour_matrix=None):
+    """
+    Shared tail of the create endpoints: rejects a duplicate name for the
+    client, prices `project_data` (memoized on the WBS and rate card), dates
+    the snapshot from `start_date` and stores the project with `fields`.
+
+    `hour_matrix` is the stored matrix of a template whose modules the
+    project copies unmodified; its per-module aggregates price the project
+    without walking the tasks.
+    """
+    name_norm = normalize(project_data["name"])
+    client_norm = normalize(project_data["client_name"])
 
     existing = await projects_collection.find_one({
         "company_id": ObjectId(user["company_id"]),
@@ -34,25 +108,35 @@ async def create_project(
         )
 
     now = datetime.utcnow()
+    rate_card = await get_rate_card(user["company_id"])
 
-    project_data = payload.model_dump(mode="json")
+    module_cache = None
+    if hour_matrix is not None:
+        module_cache = module_cache_from_hour_matrix(hour_matrix, rate_card)
 
-    # calculate estimation while creating project
-    estimation_result = calculate_estimation(project_data)
-
-    project = {
-        **project_data,
+    if module_cache is not None:
+        estimation_snapshot = snapshot_from_module_cache(
+            module_cache, project_data, now, rate_card
+        )
+    else:
+        estimation_snapshot = await _price_new_project(request, project_data, now, rate_card)
+        if estimation_snapshot is None:
+            # client disconnected, nothing to store
+            return Response(status_code=204)
 
-        "modules": [
-            module.model_dump(mode="json") for module in payload.modules
-        ],
+    calendar = await get_work_calendar(user["company_id"])
 
-        "estimation_snapshot": {
-            **estimation_result,
-            "calculated_at": now
-        },
+    try:
+        [estimation_snapshot] = with_delivery_dates(
+            [estimation_snapshot], [start_date], calendar, rate_card.settings
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        "template_name": payload.template_name,
+    project = {
+        **project_data,
+        "estimation_snapshot": estimation_snapshot,
+        **fields,
         "name_normalized": name_norm,
         "client_name_normalized": client_norm,
         "status": "draft",
@@ -70,12 +154,88 @@ async def create_project(
     }
 
 
+# Create
+@router.post("/")
+async def create_project(
+    request: Request,
+    payload: ProjectCreate,
+    user=Depends(get_current_user)
+):
+    # modules are validated straight into plain dicts: persisted and hashed as is
+    project_data = payload.model_dump(mode="json", exclude={"modules"})
+    project_data["modules"] = payload.modules
+
+    return await insert_project(
+        request,
+        user,
+        project_data,
+        payload.start_date,
+        {"template_name": payload.template_name}
+    )
+
+
+# Create from Template
+@router.post("/from-template")
+async def create_project_from_template(
+    request: Request,
+    payload: ProjectFromTemplateCreate,
+    user=Depends(get_current_user)
+):
+    try:
+        template_oid = ObjectId(payload.template_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid template ID")
+
+    if payload.template_type == "built_in":
+        template = await built_in_templates_collection.find_one(
+            {"_id": template_oid, "status": "active"}
+        )
+    else:
+        template = await custom_templates_collection.find_one({
+            "_id": template_oid,
+            "company_id": ObjectId(user["company_id"])
+        })
+
+    if not template:
+        raise HTTPException(status_code=404, detail="Template not found")
+
+    project_data = payload.model_dump(
+        mode="json", exclude={"template_id", "template_type", "overrides"}
+    )
+    if project_data["target_margin"] is None:
+        project_data["target_margin"] = template["default_margin"]
+    if project_data["risk_buffer"] is None:
+        project_data["risk_buffer"] = template["default_risk_buffer"]
+
+    try:
+        project_data["modules"] = apply_template_overrides(
+            template["modules"],
+            [o.model_dump() for o in payload.overrides]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return await insert_project(
+        request,
+        user,
+        project_data,
+        payload.start_date,
+        {
+            "template_id": template["_id"],
+            "template_type": payload.template_type,
+            "template_name": template["name"]
+        },
+        # an unmodified copy is priced from the template's aggregates
+        hour_matrix=None if payload.overrides else template.get("hour_matrix")
+    )
+
+
 # Get All Projects
 @router.get("/")
 async def get_projects(
     page: int = 1,
     limit: int = 10,
-    user=Depends(get_current_user)
+    user=Depends(get_read_user)
 ):
     if page < 1 or limit < 1:
         raise HTTPException(status_code=400, detail="Invalid pagination params")
@@ -98,7 +258,7 @@ async def get_projects(
 @router.get("/{project_id}")
 async def get_project(
     project_id: str,
-    user=Depends(get_current_user)
+    user=Depends(get_read_user)
 ):
     project = await projects_collection.find_one({
         "_id": ObjectId(project_id),
@@ -114,6 +274,7 @@ async def get_project(
 # Update Project
 @router.patch("/{project_id}")
 async def update_project(
+    request: Request,
     project_id: str,
     payload: ProjectUpdate,
     user=Depends(get_current_user)
@@ -129,21 +290,96 @@ async def update_project(
     if "status" in update_data:
         update_data["status"] = update_data["status"].strip().lower()
 
+        # completion goes through /actuals, which counts the project in the
+        # company calibration exactly once
+        if update_data["status"] == "completed":
+            raise HTTPException(
+                status_code=400,
+                detail="Projects are completed by recording their actual hours"
+            )
+
     if "client_name" in update_data:
         update_data["client_name_normalized"] = normalize(update_data["client_name"])
+
+    if update_data.get("start_date") is not None:
+        update_data["start_date"] = update_data["start_date"].isoformat()
       
     update_data["updated_at"] = datetime.utcnow()
+
+    # refresh the estimation snapshot, walking only modules that changed
+    if update_data.keys() & ESTIMATION_FIELDS:
+        current = await projects_collection.find_one(
+            {
+                "_id": ObjectId(project_id),
+                "company_id": ObjectId(user["company_id"])
+            },
+            {
+                **{field: 1 for field in ESTIMATION_FIELDS - {"modules"}},
+                "estimation_snapshot.module_cache": 1,
+                "estimation_snapshot.module_cache_fingerprint": 1
+            }
+        )
+
+        if not current:
+            raise HTTPException(status_code=404, detail="Project not found")
+
+        previous_snapshot = current.get("estimation_snapshot") or {}
+        estimation_input = {**current, **update_data}
+        rate_card = await get_rate_card(user["company_id"])
+
+        if "modules" not in update_data and not module_cache_is_current(previous_snapshot, rate_card):
+            # module subtotals missing or priced with older rates
+            stored = await projects_collection.find_one(
+                {"_id": current["_id"]}, {"modules": 1}
+            )
+            estimation_input["modules"] = stored.get("modules", [])
+
+        update_data["estimation_snapshot"] = await estimation_executor.run(
+            build_estimation_snapshot,
+            estimation_input,
+            update_data["updated_at"],
+            previous_snapshot,
+            rate_card,
+            task_count=count_tasks(estimation_input.get("modules") or []),
+            request=request
+        )
+        if update_data["estimation_snapshot"] is None:
+            return Response(status_code=204)
+
+        # a start date set by this update must resolve; a stored one may
+        # have left the calendar horizon since
+        add_dates = with_delivery_dates if "start_date" in update_data else with_project_dates
+        calendar = await get_work_calendar(user["company_id"])
+
+        try:
+            [update_data["estimation_snapshot"]] = add_dates(
+                [update_data["estimation_snapshot"]],
+                [estimation_input.get("start_date")],
+                calendar,
+                rate_card.settings
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
     
+    project_filter = {
+        "_id": ObjectId(project_id),
+        "company_id": ObjectId(user["company_id"])
+    }
+    update_filter = dict(project_filter)
+
+    if "status" in update_data:
+        # a completed project keeps its status
+        update_filter["status"] = {"$ne": "completed"}
+
     project = await projects_collection.find_one_and_update(
-        {
-            "_id": ObjectId(project_id),
-            "company_id": ObjectId(user["company_id"])
-        },
+        update_filter,
         {"$set": update_data},
         return_document=ReturnDocument.AFTER
     )
 
     if not project:
+        if update_filter != project_filter and await projects_collection.find_one(project_filter, {"_id": 1}):
+            raise HTTPException(status_code=409, detail="Project is already completed")
         raise HTTPException(status_code=404, detail="Project not found")
 
     return {
@@ -151,6 +387,144 @@ async def update_project(
         "project": serialize_ids_only(project)
     }
 
+# Re-price Project from its stored hour matrix
+@router.post("/{project_id}/reprice")
+async def reprice_project(
+    project_id: str,
+    payload: ProjectRepriceRequest,
+    user=Depends(get_current_user)
+):
+    projection = {
+        "target_margin": 1,
+        "risk_buffer": 1,
+        "negotiation_buffer": 1,
+        "estimated_team_size": 1,
+        "start_date": 1,
+        "estimation_snapshot.hour_matrix": 1
+    }
+
+    project = await projects_collection.find_one(
+        {
+            "_id": ObjectId(project_id),
+            "company_id": ObjectId(user["company_id"])
+        },
+        projection
+    )
+
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    overrides = payload.model_dump(exclude_none=True)
+    rate_card = (await get_rate_card(user["company_id"])).with_overrides(
+        resource_rates=overrides.pop("resource_rates", None),
+        complexity_multipliers=overrides.pop("complexity_multipliers", None)
+    )
+    pricing = {**project, **overrides}
+
+    hour_matrix = project.get("estimation_snapshot", {}).get("hour_matrix")
+
+    if not hour_matrix:
+        # projects created before snapshots carried a matrix
+        modules = project.get("modules")
+        if modules is None:
+            modules = (await projects_collection.find_one(
+                {"_id": project["_id"]}, {"modules": 1}
+            )).get("modules", [])
+        hour_matrix = build_hour_matrix(modules)
+
+    calendar = await get_work_calendar(user["company_id"])
+
+    [result] = with_project_dates(
+        [reprice_from_matrix(hour_matrix, pricing, rate_card)],
+        [project.get("start_date")],
+        calendar,
+        rate_card.settings
+    )
+    return result
+
+
+# Record Actual Hours
+@router.post("/{project_id}/actuals")
+async def record_project_actuals(
+    project_id: str,
+    payload: ProjectActualsUpdate,
+    user=Depends(get_current_user)
+):
+    if payload.complete:
+        # completion refits the calibration and reprices every project
+        check_roles(user, PRICING_ADMIN_ROLES)
+
+    project = await projects_collection.find_one(
+        {
+            "_id": ObjectId(project_id),
+            "company_id": ObjectId(user["company_id"])
+        },
+        {"modules": 1, "actual_hours": 1, "status": 1, "calibration_stats": 1}
+    )
+
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    # a completed project's actuals are already in the company calibration
+    if project.get("status") == "completed":
+        raise HTTPException(status_code=409, detail="Project is already completed")
+
+    # later recordings of the same task replace earlier ones
+    actuals = {
+        (a["module"], a["feature"], a["task"]): a
+        for a in project.get("actual_hours") or []
+    }
+    for a in payload.tasks:
+        actuals[(a.module, a.feature, a.task)] = a.model_dump()
+
+    try:
+        samples = project_samples(project.get("modules") or [], list(actuals.values()))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    now = datetime.utcnow()
+    update_data = {"actual_hours": samples, "updated_at": now}
+
+    if payload.complete:
+        stats = sufficient_stats(
+            [s["role"] for s in samples],
+            [s["level"] for s in samples],
+            [s["estimated_hours"] for s in samples],
+            [s["actual_hours"] for s in samples]
+        )
+        update_data.update({
+            "status": "completed",
+            "completed_at": now,
+            "calibration_stats": stats
+        })
+
+    # only one of two concurrent completions gets counted
+    result = await projects_collection.update_one(
+        {"_id": project["_id"], "status": {"$ne": "completed"}},
+        {"$set": update_data}
+    )
+
+    if result.modified_count == 0:
+        raise HTTPException(status_code=409, detail="Project is already completed")
+
+    if payload.complete:
+        if not await update_company_calibration(
+            user["company_id"], project.get("calibration_stats"), stats
+        ):
+            raise HTTPException(
+                status_code=503,
+                detail="Project completed, but the calibration is pending a full refit"
+            )
+
+        # stored snapshots were priced with the previous multipliers
+        await start_repricing_job(user["company_id"])
+
+    return {
+        "message": "Actual hours recorded successfully",
+        "recorded_tasks": len(samples)
+    }
+
+
 # Delete Project
 @router.delete("/{project_id}")
 async def delete_project(
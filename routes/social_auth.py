@@ -81,6 +81,7 @@ from database.mongo import users_collection, companies_collection
 from datetime import datetime
 from utils.oauth import oauth
 from utils.auth_jwt import create_access_token
+from dependencies import invalidate_user
 import os
 
 router = APIRouter(prefix="/auth/social", tags=["Social Auth"])
@@ -198,6 +199,7 @@ async def social_callback(provider: str, request: Request):
             {"_id": db_user["_id"]},
             {"$set": {"company_id": company_id}}
         )
+        invalidate_user(db_user["_id"])
         db_user = await users_collection.find_one({"_id": db_user["_id"]})
 
     # --- CREATE JWT TOKEN ---
@@ -1,6 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
-from bson import ObjectId
-from database.mongo import users_collection
+from fastapi import APIRouter, Depends
 from dependencies import get_current_user
 
 router = APIRouter(
@@ -12,15 +10,8 @@ router = APIRouter(
 async def get_user_info(
     user=Depends(get_current_user)
 ):
-    db_user = await users_collection.find_one(
-        {"_id": ObjectId(user["_id"])},   
-        {"full_name": 1, "role": 1}
-    )
-
-    if not db_user:
-        raise HTTPException(status_code=404, detail="User not found")
-
+    # the principal already carries the (cached) user row
     return {
-        "name": db_user["full_name"],
-        "role": db_user["role"]
+        "name": user["full_name"],
+        "role": user["role"]
     }
@@ -1,22 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional
-
-
-class BuiltInTaskSchema(BaseModel):
-    name: str
-    hours: int = Field(gt=0)
-    role: str
-    level: str
-
-
-class BuiltInFeatureSchema(BaseModel):
-    name: str
-    tasks: List[BuiltInTaskSchema]
-
-
-class BuiltInModuleSchema(BaseModel):
-    name: str
-    features: List[BuiltInFeatureSchema]
+from schemas.wbs import ModuleSchema
 
 
 class BuiltInAddOnSchema(BaseModel):
@@ -30,7 +14,7 @@ class BuiltInTemplateCreate(BaseModel):
     description: Optional[str] = None
     default_margin: float
     default_risk_buffer: float
-    modules: List[BuiltInModuleSchema]
+    modules: List[ModuleSchema]
     add_ons: List[BuiltInAddOnSchema]
 
 
@@ -39,6 +23,6 @@ class BuiltInTemplateUpdate(BaseModel):
     description: Optional[str] = None
     default_margin: Optional[float] = None
     default_risk_buffer: Optional[float] = None
-    modules: Optional[List[BuiltInModuleSchema]] = None
+    modules: Optional[List[ModuleSchema]] = None
     add_ons: Optional[List[BuiltInAddOnSchema]] = None
     status: Optional[str] = None
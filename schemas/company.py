@@ -1,5 +1,14 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from datetime import date
+from typing import Annotated, Dict, List, Optional
+
+
+class EstimationSettings(BaseModel):
+    productivity_factor: Optional[float] = Field(default=None, gt=0, le=1)
+    sprint_duration_weeks: Optional[int] = Field(default=None, gt=0)
+    working_hours_per_day: Optional[float] = Field(default=None, gt=0, le=24)
+    working_days_per_week: Optional[int] = Field(default=None, gt=0, le=7)
+
 
 class CompanyUpdate(BaseModel):
     name: Optional[str] = None
@@ -8,3 +17,11 @@ class CompanyUpdate(BaseModel):
     currency: Optional[str] = None
     date_format: Optional[str] = None
     timezone: Optional[str] = None
+
+    # non-working days of the delivery calendar
+    holidays: Optional[List[date]] = None
+
+    # rate card, merged over the defaults in core.estimation_constants
+    resource_rates: Optional[Dict[str, Annotated[float, Field(ge=0, allow_inf_nan=False)]]] = None
+    complexity_multipliers: Optional[Dict[str, Annotated[float, Field(gt=0, allow_inf_nan=False)]]] = None
+    estimation_settings: Optional[EstimationSettings] = None
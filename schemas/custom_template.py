@@ -1,19 +1,6 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel
 from typing import List, Optional
-
-class TaskSchema(BaseModel):
-    name: str
-    hours: int = Field(gt=0)  
-    role: str
-    level: str
-
-class FeatureSchema(BaseModel):
-    name: str
-    tasks: List[TaskSchema]
-
-class ModuleSchema(BaseModel):
-    name: str
-    features: List[FeatureSchema]
+from schemas.wbs import ModuleSchema
 
 class CustomTemplateCreate(BaseModel):
     name: str
@@ -1,22 +1,10 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from datetime import date
+from pydantic import BaseModel, Field, model_validator
+from typing import Annotated, Dict, List, Literal, Optional, Union
 
-class ProjectTaskSchema(BaseModel):
-    name: str
-    hours: int = Field(gt=0)
-    role: str
-    level: str
-
-
-class ProjectFeatureSchema(BaseModel):
-    name: str
-    tasks: List[ProjectTaskSchema]
+from schemas.wbs import MAX_TASK_HOURS, TaskSchema, ModuleSchema
 
 
-class ProjectModuleSchema(BaseModel):
-    name: str
-    features: List[ProjectFeatureSchema]
-
 class EstimationTechniqueSnapshot(BaseModel):
     name: str
     standard: Optional[str] = None
@@ -36,7 +24,10 @@ class ProjectCreate(BaseModel):
     template_name: Optional[str] = None
     # template_type: Optional[str] = None 
     
-    modules: List[ProjectModuleSchema]
+    modules: List[ModuleSchema]
+
+    # first day of work for timeline dates; the creation day when not set
+    start_date: Optional[date] = None
 
 
 class ProjectUpdate(BaseModel):
@@ -49,7 +40,13 @@ class ProjectUpdate(BaseModel):
     negotiation_buffer: Optional[float] = None
     estimated_team_size: Optional[int] = None
     status: Optional[str] = None
-    modules: Optional[List[ProjectModuleSchema]] = None
+    modules: Optional[List[ModuleSchema]] = None
+    start_date: Optional[date] = None
+
+
+class EstimationSimulationOptions(BaseModel):
+    trials: Optional[int] = Field(default=None, ge=100, le=100000)
+    seed: Optional[int] = Field(default=None, ge=0)
 
 
 class EstimationProjectRequest(BaseModel):
@@ -57,4 +54,206 @@ class EstimationProjectRequest(BaseModel):
     risk_buffer: int
     negotiation_buffer: int
     estimated_team_size: int
-    modules: List[ProjectModuleSchema]
+    modules: List[ModuleSchema]
+
+    # opt-in Monte Carlo risk simulation
+    simulation: Optional[EstimationSimulationOptions] = None
+
+    # members per role; when set the timeline comes from the scheduler
+    team_composition: Optional[Dict[str, Annotated[int, Field(gt=0)]]] = None
+
+    # first day of work for timeline dates; today in the company timezone
+    start_date: Optional[date] = None
+
+
+class EstimationBatchRequest(BaseModel):
+    projects: List[EstimationProjectRequest] = Field(min_length=1)
+
+    @model_validator(mode="after")
+    def no_per_project_options(self):
+        # a batch is priced in one columnar pass, without the scheduler or
+        # the risk simulation
+        for i, project in enumerate(self.projects):
+            if project.team_composition or project.simulation:
+                raise ValueError(
+                    f"projects[{i}]: team_composition and simulation are only "
+                    "supported by /calculate"
+                )
+        return self
+
+
+class TemplateOverride(BaseModel):
+    action: Literal["remove_module", "remove_feature", "remove_task", "set_hours"]
+    module: str
+    feature: Optional[str] = None
+    task: Optional[str] = None
+    hours: Optional[int] = Field(default=None, gt=0, le=MAX_TASK_HOURS)
+
+
+class ProjectFromTemplateCreate(BaseModel):
+    template_id: str
+    template_type: Literal["built_in", "custom"]
+
+    name: str
+    client_name: str
+    description: Optional[str] = None
+    estimation_technique: EstimationTechniqueSnapshot
+
+    # default to the template's default_margin / default_risk_buffer
+    target_margin: Optional[float] = None
+    risk_buffer: Optional[float] = None
+    negotiation_buffer: float
+    estimated_team_size: int
+    start_date: Optional[date] = None
+
+    # edits applied to the template WBS, in order
+    overrides: List[TemplateOverride] = Field(default_factory=list, max_length=200)
+
+
+class ProjectRepriceRequest(BaseModel):
+    target_margin: Optional[float] = None
+    risk_buffer: Optional[float] = None
+    negotiation_buffer: Optional[float] = None
+    estimated_team_size: Optional[int] = Field(default=None, gt=0)
+    resource_rates: Optional[Dict[str, float]] = None
+    complexity_multipliers: Optional[Dict[str, float]] = None
+
+
+class TaskActualHours(BaseModel):
+    module: str
+    feature: str
+    task: str
+    actual_hours: float = Field(gt=0)
+
+
+class ProjectActualsUpdate(BaseModel):
+    tasks: List[TaskActualHours] = Field(min_length=1)
+    # completed projects feed the company's multiplier calibration
+    complete: bool = False
+
+
+class SweepRange(BaseModel):
+    start: float
+    stop: float
+    step: float = Field(gt=0)
+
+    @model_validator(mode="after")
+    def stop_not_before_start(self):
+        if self.stop < self.start:
+            raise ValueError("stop must not be less than start")
+        return self
+
+
+class TeamSizeSweepRange(SweepRange):
+    # team sizes are whole people
+    start: int
+    stop: int
+    step: int = Field(gt=0)
+
+
+class EstimationSweepRequest(BaseModel):
+    # each parameter is a single value, a list of values or an inclusive range
+    target_margin: Union[float, List[float], SweepRange]
+    risk_buffer: Union[float, List[float], SweepRange]
+    negotiation_buffer: Union[float, List[float], SweepRange]
+    estimated_team_size: Union[int, List[int], TeamSizeSweepRange]
+    modules: List[ModuleSchema]
+
+
+class EstimationSolveRequest(BaseModel):
+    # which input to search for: the team for target_weeks, the margin for target_price
+    solve_for: Literal["estimated_team_size", "target_margin"]
+    target_weeks: Optional[int] = Field(default=None, gt=0)
+    target_price: Optional[float] = Field(default=None, gt=0)
+
+    risk_buffer: float
+    negotiation_buffer: float
+
+    max_team_size: int = Field(default=100, gt=0, le=1000)
+    margin_step: float = Field(default=0.1, ge=0.000001)
+
+    modules: List[ModuleSchema]
+
+    @model_validator(mode="after")
+    def target_matches_solve_for(self):
+        if self.solve_for == "estimated_team_size" and self.target_weeks is None:
+            raise ValueError("target_weeks is required to solve for estimated_team_size")
+        if self.solve_for == "target_margin" and self.target_price is None:
+            raise ValueError("target_price is required to solve for target_margin")
+        return self
+
+
+# NDJSON streaming estimation: one header line, then one line per task
+class EstimationStreamHeader(BaseModel):
+    target_margin: int
+    risk_buffer: int
+    negotiation_buffer: int
+    estimated_team_size: int
+
+    # first day of work for timeline dates; today in the company timezone
+    start_date: Optional[date] = None
+
+
+class EstimationStreamTask(BaseModel):
+    name: str
+    hours: int = Field(gt=0, le=MAX_TASK_HOURS)
+    role: str
+    level: str
+    module: str
+    feature: str
+
+
+# Live estimation sessions: a LiveSessionAuth, the initial
+# EstimationProjectRequest, then edits sent over the WebSocket
+class LiveSessionAuth(BaseModel):
+    # bearer token, sent as a message so it stays out of URLs and access logs
+    token: str
+
+
+class LiveSetPricing(BaseModel):
+    op: Literal["set_pricing"]
+    target_margin: Optional[float] = None
+    risk_buffer: Optional[float] = None
+    negotiation_buffer: Optional[float] = None
+    estimated_team_size: Optional[int] = Field(default=None, gt=0)
+
+
+class LiveAddTask(BaseModel):
+    op: Literal["add_task"]
+    module: str
+    feature: str
+    task: TaskSchema
+
+
+class LiveTaskChanges(BaseModel):
+    name: Optional[str] = None
+    hours: Optional[int] = Field(default=None, gt=0, le=MAX_TASK_HOURS)
+    role: Optional[str] = None
+    level: Optional[str] = None
+
+
+class LiveUpdateTask(BaseModel):
+    op: Literal["update_task"]
+    module: str
+    feature: str
+    task: str
+    changes: LiveTaskChanges
+
+
+class LiveRemoveTask(BaseModel):
+    op: Literal["remove_task"]
+    module: str
+    feature: str
+    task: str
+
+
+class LiveRemoveModule(BaseModel):
+    op: Literal["remove_module"]
+    module: str
+
+
+class LiveEstimationEdit(BaseModel):
+    ops: List[Annotated[
+        Union[LiveSetPricing, LiveAddTask, LiveUpdateTask, LiveRemoveTask, LiveRemoveModule],
+        Field(discriminator="op")
+    ]] = Field(min_length=1, max_length=100)
@@ -0,0 +1,32 @@
+from typing import Annotated, List
+
+from pydantic import Field, TypeAdapter
+from typing_extensions import TypedDict
+
+
+# CompactWBS keeps task hours in a 32-bit unsigned array; this bound also
+# keeps a single task a plausible size (about 50 person-years)
+MAX_TASK_HOURS = 100_000
+
+
+# The work breakdown shared by projects, custom and built-in templates.
+# TypedDicts validate straight into the plain dicts the estimation engines
+# and Mongo consume, without a model instance per task.
+class TaskSchema(TypedDict):
+    name: str
+    hours: Annotated[int, Field(gt=0, le=MAX_TASK_HOURS)]
+    role: str
+    level: str
+
+
+class FeatureSchema(TypedDict):
+    name: str
+    tasks: List[TaskSchema]
+
+
+class ModuleSchema(TypedDict):
+    name: str
+    features: List[FeatureSchema]
+
+
+modules_adapter = TypeAdapter(List[ModuleSchema])
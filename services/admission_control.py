@@ -0,0 +1,148 @@
+import math
+import time
+
+from decouple import config
+from fastapi import HTTPException
+
+from utils.ttl_cache import TTLCache
+
+# clients (IPs or emails) tracked per limiter; the least recently seen are
+# dropped first, which only ever makes a limit more lenient
+ADMISSION_MAX_KEYS = config("ADMISSION_MAX_KEYS", default=100000, cast=int)
+# behind proxies the client is the X-Forwarded-For address appended by the
+# outermost trusted proxy, ADMISSION_TRUSTED_PROXY_HOPS entries from the
+# right; everything left of it is whatever the client sent
+ADMISSION_TRUST_FORWARDED_FOR = config("ADMISSION_TRUST_FORWARDED_FOR", default=False, cast=bool)
+ADMISSION_TRUSTED_PROXY_HOPS = config("ADMISSION_TRUSTED_PROXY_HOPS", default=1, cast=int)
+
+if ADMISSION_TRUSTED_PROXY_HOPS < 1:
+    raise ValueError("ADMISSION_TRUSTED_PROXY_HOPS must be at least 1")
+
+
+def _parse_limit(value):
+    # "N/S": N requests per S seconds; "off" disables the limit
+    if not value or value.strip().lower() == "off":
+        return None
+    requests, seconds = value.split("/")
+    requests, seconds = int(requests), float(seconds)
+    if requests < 1 or not seconds > 0:
+        raise ValueError(f"Invalid limit '{value}': expected N/S with N >= 1 and S > 0")
+    return requests, seconds
+
+
+class TokenBucketLimiter:
+    """
+    Token buckets by key: `capacity` requests in a burst, refilled at
+    capacity / period per second. A bucket untouched for a whole period is
+    full again, so it simply expires from the cache.
+    """
+
+    def __init__(self, capacity, period, maxsize):
+        self.capacity = capacity
+        self.period = period
+        self.rate = capacity / period
+        self._buckets = TTLCache(maxsize, period)
+
+    def acquire(self, key):
+        """
+        Takes a token; returns 0 when admitted, otherwise the seconds until
+        a token is available.
+        """
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+
+        if bucket is None:
+            tokens = self.capacity
+        else:
+            tokens, updated = bucket
+            tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+
+        if tokens < 1:
+            self._buckets.set(key, (tokens, now))
+            return (1 - tokens) / self.rate
+
+        self._buckets.set(key, (tokens - 1, now))
+        return 0
+
+    def metrics(self):
+        return {
+            "capacity": self.capacity,
+            "period_seconds": self.period,
+            "tracked_keys": len(self._buckets),
+            "evictions": self._buckets.evictions
+        }
+
+
+class AdmissionPolicy:
+    """
+    Per client IP and per email limits of one route, checked before the
+    route does any expensive work.
+    """
+
+    def __init__(self, name, ip_limit, email_limit, maxsize=ADMISSION_MAX_KEYS):
+        self.name = name
+        self.by_ip = TokenBucketLimiter(*ip_limit, maxsize) if ip_limit else None
+        self.by_email = TokenBucketLimiter(*email_limit, maxsize) if email_limit else None
+        self.rejected = {"ip": 0, "email": 0}
+
+    def check(self, request, email=None):
+        retry_after = 0
+
+        if self.by_ip:
+            retry_after = self.by_ip.acquire(client_ip(request))
+            if retry_after:
+                self.rejected["ip"] += 1
+
+        if not retry_after and self.by_email and email:
+            retry_after = self.by_email.acquire(email.strip().lower())
+            if retry_after:
+                self.rejected["email"] += 1
+
+        if retry_after:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many attempts, please retry later",
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+
+    def metrics(self):
+        return {
+            "rejected": dict(self.rejected),
+            "per_ip": self.by_ip.metrics() if self.by_ip else None,
+            "per_email": self.by_email.metrics() if self.by_email else None
+        }
+
+
+def client_ip(request):
+    if ADMISSION_TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            addresses = [address.strip() for address in forwarded.split(",")]
+            return addresses[max(len(addresses) - ADMISSION_TRUSTED_PROXY_HOPS, 0)]
+    return request.client.host if request.client else "unknown"
+
+
+login_admission = AdmissionPolicy(
+    "login",
+    _parse_limit(config("LOGIN_LIMIT_PER_IP", default="20/60")),
+    _parse_limit(config("LOGIN_LIMIT_PER_EMAIL", default="5/60"))
+)
+
+signup_admission = AdmissionPolicy(
+    "signup",
+    _parse_limit(config("SIGNUP_LIMIT_PER_IP", default="10/3600")),
+    _parse_limit(config("SIGNUP_LIMIT_PER_EMAIL", default="3/3600"))
+)
+
+forgot_password_admission = AdmissionPolicy(
+    "forgot_password",
+    _parse_limit(config("FORGOT_PASSWORD_LIMIT_PER_IP", default="10/900")),
+    _parse_limit(config("FORGOT_PASSWORD_LIMIT_PER_EMAIL", default="3/900"))
+)
+
+
+def admission_metrics():
+    return {
+        policy.name: policy.metrics()
+        for policy in (login_admission, signup_admission, forgot_password_admission)
+    }
@@ -0,0 +1,234 @@
+from datetime import datetime
+
+import numpy as np
+from bson import ObjectId
+
+from database.mongo import companies_collection, projects_collection
+from services.rate_cards import invalidate_rate_card
+
+# samples a role/level pair needs before its factor replaces the multiplier
+CALIBRATION_MIN_SAMPLES = 5
+
+# two-sided 95% normal quantile for the confidence intervals
+CALIBRATION_Z = 1.96
+
+# optimistic-concurrency retries when completions race on a company
+CALIBRATION_UPDATE_RETRIES = 5
+
+
+def project_samples(modules, actuals):
+    """
+    Resolves recorded actuals ({"module", "feature", "task", "actual_hours"})
+    against the project WBS into calibration samples, adding the task's
+    role, level and estimated (raw) hours.
+    """
+    tasks = {
+        (module["name"], feature["name"], task["name"]): task
+        for module in modules
+        for feature in module["features"]
+        for task in feature["tasks"]
+    }
+
+    samples = []
+    for actual in actuals:
+        task = tasks.get((actual["module"], actual["feature"], actual["task"]))
+        if task is None:
+            raise ValueError(
+                f"Task '{actual['module']} / {actual['feature']} / {actual['task']}' not found"
+            )
+
+        samples.append({
+            "module": actual["module"],
+            "feature": actual["feature"],
+            "task": actual["task"],
+            "role": task["role"],
+            "level": task["level"],
+            "estimated_hours": task["hours"],
+            "actual_hours": actual["actual_hours"]
+        })
+
+    return samples
+
+
+def sufficient_stats(roles, levels, estimated, actual):
+    """
+    Per role/level sums for a no-intercept least-squares fit of actual on
+    estimated hours, as [role, level, n, sum(h^2), sum(h*a), sum(a^2)] rows.
+    """
+    if not len(roles):
+        return []
+
+    pairs, cell_idx = np.unique(
+        np.array([roles, levels], dtype=object).T.astype(str), axis=0, return_inverse=True
+    )
+    cell_idx = cell_idx.ravel()
+
+    h = np.asarray(estimated, dtype=np.float64)
+    a = np.asarray(actual, dtype=np.float64)
+    n_cells = len(pairs)
+
+    sums = np.stack([
+        np.bincount(cell_idx, minlength=n_cells).astype(np.float64),
+        np.bincount(cell_idx, h * h, minlength=n_cells),
+        np.bincount(cell_idx, h * a, minlength=n_cells),
+        np.bincount(cell_idx, a * a, minlength=n_cells)
+    ], axis=1)
+
+    return [
+        [str(role), str(level), *row]
+        for (role, level), row in zip(pairs, sums.tolist())
+    ]
+
+
+def merge_stats(*weighted_rows):
+    """
+    Adds stats rows; each argument is a (sign, rows) pair so a project's
+    previous contribution can be taken out again.
+    """
+    merged = {}
+    for sign, rows in weighted_rows:
+        for role, level, *values in rows:
+            current = merged.setdefault((role, level), [0.0, 0.0, 0.0, 0.0])
+            for i, value in enumerate(values):
+                current[i] += sign * value
+
+    return [
+        [role, level, *values]
+        for (role, level), values in merged.items()
+        if values[0] > 0
+    ]
+
+
+def fit_calibration(rows):
+    """
+    Least-squares factor k = sum(h*a) / sum(h^2) per role/level with its
+    confidence interval, vectorized over all pairs. Returns the fit details
+    and the [role, level, factor] rows that enough samples back.
+    """
+    if not rows:
+        return [], []
+
+    stats = np.array([row[2:] for row in rows], dtype=np.float64)
+    n, shh, sha, saa = stats.T
+
+    factor = np.divide(sha, shh, out=np.ones_like(sha), where=shh > 0)
+
+    residual = np.maximum(saa - 2 * factor * sha + factor ** 2 * shh, 0)
+    dof = n - 1
+    variance = np.divide(residual, dof * shh, out=np.full_like(sha, np.inf), where=(dof > 0) & (shh > 0))
+    margin = CALIBRATION_Z * np.sqrt(variance)
+
+    factors = []
+    calibrated = []
+
+    for i, (role, level, *_) in enumerate(rows):
+        applied = bool(n[i] >= CALIBRATION_MIN_SAMPLES)
+        bounded = bool(np.isfinite(margin[i]))
+
+        factors.append({
+            "role": role,
+            "level": level,
+            "samples": int(n[i]),
+            "factor": round(float(factor[i]), 4),
+            "ci_low": round(float(factor[i] - margin[i]), 4) if bounded else None,
+            "ci_high": round(float(factor[i] + margin[i]), 4) if bounded else None,
+            "applied": applied
+        })
+
+        if applied:
+            calibrated.append([role, level, round(float(factor[i]), 4)])
+
+    return factors, calibrated
+
+
+async def _save_calibration(company_id, stats, revision, full_refit=False):
+    factors, calibrated = fit_calibration(stats)
+
+    update = {
+        "$set": {
+            "calibration": {
+                "stats": stats,
+                "factors": factors,
+                "revision": (revision or 0) + 1,
+                "fitted_at": datetime.utcnow()
+            },
+            "calibrated_multipliers": calibrated
+        },
+        "$inc": {"rate_card_version": 1}
+    }
+    if full_refit:
+        # a full refit takes in every completed project again
+        update["$unset"] = {"calibration_pending": ""}
+
+    result = await companies_collection.update_one(
+        {"_id": company_id, "calibration.revision": revision}, update
+    )
+    return result.modified_count == 1
+
+
+async def update_company_calibration(company_id, previous_rows, rows):
+    """
+    Incremental refit after a project completes: swaps the project's
+    previous stats contribution for the new one and refits from the
+    company totals, without reading any other project.
+
+    When every retry loses the race, the company is flagged
+    calibration_pending until recalibrate_company refits it in full, and
+    False is returned.
+    """
+    company_id = ObjectId(company_id)
+
+    for _ in range(CALIBRATION_UPDATE_RETRIES):
+        company = await companies_collection.find_one(
+            {"_id": company_id}, {"calibration": 1}
+        )
+        calibration = (company or {}).get("calibration") or {}
+
+        stats = merge_stats(
+            (1, calibration.get("stats") or []),
+            (-1, previous_rows or []),
+            (1, rows)
+        )
+
+        if await _save_calibration(company_id, stats, calibration.get("revision")):
+            invalidate_rate_card(company_id)
+            return True
+
+    await companies_collection.update_one(
+        {"_id": company_id}, {"$set": {"calibration_pending": True}}
+    )
+    return False
+
+
+async def recalibrate_company(company_id):
+    """
+    Full refit over every completed project of the company: actual hours
+    are streamed with a projection and fitted in one vectorized pass.
+    """
+    company_id = ObjectId(company_id)
+
+    roles, levels, estimated, actual = [], [], [], []
+
+    cursor = projects_collection.find(
+        {"company_id": company_id, "status": "completed", "actual_hours": {"$ne": []}},
+        {"actual_hours": 1}
+    )
+    async for project in cursor:
+        for sample in project.get("actual_hours") or []:
+            roles.append(sample["role"])
+            levels.append(sample["level"])
+            estimated.append(sample["estimated_hours"])
+            actual.append(sample["actual_hours"])
+
+    stats = sufficient_stats(roles, levels, estimated, actual)
+
+    company = await companies_collection.find_one(
+        {"_id": company_id}, {"calibration.revision": 1}
+    )
+    revision = ((company or {}).get("calibration") or {}).get("revision")
+
+    saved = await _save_calibration(company_id, stats, revision, full_refit=True)
+    if saved:
+        invalidate_rate_card(company_id)
+
+    return saved
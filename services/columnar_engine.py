@@ -0,0 +1,189 @@
+import numpy as np
+
+from core.rate_card import DEFAULT_RATE_CARD
+from services.cost_timeline_engine import build_estimation_result
+
+
+def flatten_projects(projects):
+    """
+    Flattens every task of every project into columnar arrays.
+
+    Roles and levels are interned into integer codes shared by the whole
+    batch, modules get a batch-wide index so per-module sums are a single
+    reduction.
+    """
+    role_codes = {}
+    level_codes = {}
+
+    hours = []
+    role_idx = []
+    level_idx = []
+    module_idx = []
+    project_idx = []
+
+    module_names = []
+    module_project = []
+
+    for p_idx, project in enumerate(projects):
+        for module in project["modules"]:
+            m_idx = len(module_names)
+            module_names.append(module["name"])
+            module_project.append(p_idx)
+
+            for feature in module["features"]:
+                for task in feature["tasks"]:
+                    role = task["role"]
+                    level = task["level"]
+
+                    r = role_codes.get(role)
+                    if r is None:
+                        r = role_codes[role] = len(role_codes)
+
+                    l = level_codes.get(level)
+                    if l is None:
+                        l = level_codes[level] = len(level_codes)
+
+                    hours.append(task["hours"])
+                    role_idx.append(r)
+                    level_idx.append(l)
+                    module_idx.append(m_idx)
+                    project_idx.append(p_idx)
+
+    return {
+        "roles": list(role_codes),
+        "levels": list(level_codes),
+        "hours": np.asarray(hours, dtype=np.float64),
+        "role_idx": np.asarray(role_idx, dtype=np.intp),
+        "level_idx": np.asarray(level_idx, dtype=np.intp),
+        "module_idx": np.asarray(module_idx, dtype=np.intp),
+        "project_idx": np.asarray(project_idx, dtype=np.intp),
+        "module_names": module_names,
+        "module_project": np.asarray(module_project, dtype=np.intp),
+        "project_count": len(projects)
+    }
+
+
+def price_tasks(cols, rate_card=DEFAULT_RATE_CARD):
+    """
+    Adjusted hours and cost per flattened task.
+    """
+    rates = rate_card.rates_for(cols["roles"])
+    multipliers = rate_card.multiplier_matrix(cols["roles"], cols["levels"])
+
+    adj_hours = cols["hours"] * multipliers[cols["role_idx"], cols["level_idx"]]
+    cost = adj_hours * rates[cols["role_idx"]] * rate_card.productivity_factor
+
+    return adj_hours, cost
+
+
+def calculate_totals(projects, rate_card=DEFAULT_RATE_CARD):
+    """
+    Total adjusted hours and base cost per project, as two arrays.
+    """
+    cols = flatten_projects(projects)
+    adj_hours, cost = price_tasks(cols, rate_card)
+
+    n_projects = cols["project_count"]
+    return (
+        np.bincount(cols["project_idx"], adj_hours, minlength=n_projects),
+        np.bincount(cols["project_idx"], cost, minlength=n_projects)
+    )
+
+
+def calculate_estimation_batch(projects, rate_card=DEFAULT_RATE_CARD):
+    """
+    Prices many projects in one pass over their flattened tasks.
+
+    np.bincount accumulates weights in input order, so every sum matches the
+    sequential accumulation of calculate_estimation bit for bit.
+    """
+    cols = flatten_projects(projects)
+
+    n_projects = cols["project_count"]
+    n_roles = len(cols["roles"])
+    n_modules = len(cols["module_names"])
+
+    # Base Cost
+    adj_hours, cost = price_tasks(cols, rate_card)
+
+    total_hours = np.bincount(cols["project_idx"], adj_hours, minlength=n_projects)
+    total_cost = np.bincount(cols["project_idx"], cost, minlength=n_projects)
+
+    module_hours = np.bincount(cols["module_idx"], adj_hours, minlength=n_modules)
+    module_cost = np.bincount(cols["module_idx"], cost, minlength=n_modules)
+
+    # (project, role) pairs, ordered by first appearance inside each project
+    pair = cols["project_idx"] * n_roles + cols["role_idx"]
+    role_hours = np.bincount(pair, adj_hours, minlength=n_projects * n_roles)
+
+    unique_pairs, first_seen = np.unique(pair, return_index=True)
+    ordered_pairs = unique_pairs[np.argsort(first_seen, kind="stable")]
+
+    project_roles = [[] for _ in range(n_projects)]
+    role_hours_list = role_hours.tolist()
+    for code in ordered_pairs.tolist():
+        p_idx, r_idx = divmod(code, n_roles)
+        project_roles[p_idx].append((cols["roles"][r_idx], role_hours_list[code]))
+
+    project_modules = [[] for _ in range(n_projects)]
+    module_hours_list = module_hours.tolist()
+    module_cost_list = module_cost.tolist()
+    for m_idx, p_idx in enumerate(cols["module_project"].tolist()):
+        project_modules[p_idx].append({
+            "name": cols["module_names"][m_idx],
+            "hours": round(module_hours_list[m_idx], 1),
+            "cost": round(module_cost_list[m_idx])
+        })
+
+    total_hours_list = total_hours.tolist()
+    total_cost_list = total_cost.tolist()
+
+    return [
+        build_estimation_result(
+            project,
+            total_hours_list[p_idx],
+            total_cost_list[p_idx],
+            project_modules[p_idx],
+            dict(project_roles[p_idx]),
+            rate_card.settings
+        )
+        for p_idx, project in enumerate(projects)
+    ]
+
+
+def calculate_estimation_compact(wbs, project, rate_card=DEFAULT_RATE_CARD):
+    """
+    calculate_estimation for a CompactWBS; `project` only needs the pricing
+    fields. Role codes are already in first-appearance order, so the role
+    reduction needs no reordering.
+    """
+    cols = wbs.columns()
+    adj_hours, cost = price_tasks(cols, rate_card)
+
+    n_modules = len(wbs.modules)
+
+    total_hours = np.bincount(cols["project_idx"], adj_hours, minlength=1).tolist()[0]
+    total_cost = np.bincount(cols["project_idx"], cost, minlength=1).tolist()[0]
+
+    module_hours = np.bincount(cols["module_idx"], adj_hours, minlength=n_modules).tolist()
+    module_cost = np.bincount(cols["module_idx"], cost, minlength=n_modules).tolist()
+
+    role_hours = np.bincount(cols["role_idx"], adj_hours, minlength=len(wbs.roles)).tolist()
+
+    modules = [
+        {
+            "name": module.name,
+            "hours": round(module_hours[m_idx], 1),
+            "cost": round(module_cost[m_idx])
+        }
+        for m_idx, module in enumerate(wbs.modules)
+    ]
+
+    return build_estimation_result(
+        project,
+        total_hours,
+        total_cost,
+        modules,
+        dict(zip(wbs.roles, role_hours)),
+        rate_card.settings
+    )
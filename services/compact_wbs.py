@@ -0,0 +1,156 @@
+import sys
+from array import array
+
+import numpy as np
+
+
+class WBSFeature:
+    __slots__ = ("name", "start", "stop")
+
+    def __init__(self, name, start, stop):
+        self.name = name
+        # task index range in the CompactWBS arrays
+        self.start = start
+        self.stop = stop
+
+
+class WBSModule:
+    __slots__ = ("name", "features", "start", "stop")
+
+    def __init__(self, name, features, start, stop):
+        self.name = name
+        self.features = features
+        self.start = start
+        self.stop = stop
+
+
+class CompactWBS:
+    """
+    Array-backed work breakdown for the estimation engines.
+
+    Tasks live in flat typed arrays (hours plus interned role/level codes,
+    first-appearance order); modules and features are slotted nodes holding
+    an index range into them. Built once from the validated request models,
+    without an intermediate dict tree.
+    """
+
+    __slots__ = (
+        "modules",
+        "roles",
+        "levels",
+        "task_names",
+        "hours",
+        "role_codes",
+        "level_codes",
+        "module_codes"
+    )
+
+    def __init__(self):
+        self.modules = []
+        self.roles = []
+        self.levels = []
+        self.task_names = []
+        self.hours = array("I")
+        self.role_codes = array("I")
+        self.level_codes = array("I")
+        self.module_codes = array("I")
+
+    @classmethod
+    def from_modules(cls, modules):
+        """
+        `modules` is a list of validated module models or of plain dicts.
+        """
+        wbs = cls()
+        get = _item if modules and isinstance(modules[0], dict) else getattr
+
+        role_index = {}
+        level_index = {}
+
+        for m_idx, module in enumerate(modules):
+            module_start = len(wbs.hours)
+            features = []
+
+            for feature in get(module, "features"):
+                feature_start = len(wbs.hours)
+
+                for task in get(feature, "tasks"):
+                    role = get(task, "role")
+                    level = get(task, "level")
+
+                    r = role_index.get(role)
+                    if r is None:
+                        r = role_index[role] = len(wbs.roles)
+                        wbs.roles.append(sys.intern(role))
+
+                    l = level_index.get(level)
+                    if l is None:
+                        l = level_index[level] = len(wbs.levels)
+                        wbs.levels.append(sys.intern(level))
+
+                    wbs.task_names.append(get(task, "name"))
+                    wbs.hours.append(get(task, "hours"))
+                    wbs.role_codes.append(r)
+                    wbs.level_codes.append(l)
+                    wbs.module_codes.append(m_idx)
+
+                features.append(WBSFeature(get(feature, "name"), feature_start, len(wbs.hours)))
+
+            wbs.modules.append(
+                WBSModule(get(module, "name"), features, module_start, len(wbs.hours))
+            )
+
+        return wbs
+
+    @property
+    def task_count(self):
+        return len(self.hours)
+
+    def columns(self):
+        """
+        The columnar layout of columnar_engine.flatten_projects for this one
+        project; code arrays are zero-copy views.
+        """
+        n_tasks = len(self.hours)
+
+        return {
+            "roles": self.roles,
+            "levels": self.levels,
+            "hours": np.frombuffer(self.hours, dtype=np.uint32).astype(np.float64),
+            "role_idx": np.frombuffer(self.role_codes, dtype=np.uint32),
+            "level_idx": np.frombuffer(self.level_codes, dtype=np.uint32),
+            "module_idx": np.frombuffer(self.module_codes, dtype=np.uint32),
+            "project_idx": np.zeros(n_tasks, dtype=np.intp),
+            "module_names": [module.name for module in self.modules],
+            "module_project": np.zeros(len(self.modules), dtype=np.intp),
+            "project_count": 1
+        }
+
+    def to_dicts(self):
+        """
+        Nested module/feature/task dicts, e.g. for persisting the WBS.
+        """
+        return [
+            {
+                "name": module.name,
+                "features": [
+                    {
+                        "name": feature.name,
+                        "tasks": [
+                            {
+                                "name": self.task_names[i],
+                                "hours": self.hours[i],
+                                "role": self.roles[self.role_codes[i]],
+                                "level": self.levels[self.level_codes[i]]
+                            }
+                            for i in range(feature.start, feature.stop)
+                        ]
+                    }
+                    for feature in module.features
+                ]
+            }
+            for module in self.modules
+        ]
+
+
+def _item(obj, name):
+    return obj[name]
@@ -1,24 +1,21 @@
-from core.estimation_constants import (
-    RESOURCE_RATES,
-    COMPLEXITY_MULTIPLIERS,
-    DEFAULT_SETTINGS
-)
+from core.estimation_constants import DEFAULT_SETTINGS, RESOURCE_EFFICIENCY
+from core.rate_card import DEFAULT_RATE_CARD
 
-def calculate_task_cost(task, resource_rates):
+def calculate_task_cost(task, rate_card):
     hours = task["hours"]
     role = task["role"]
     level = task["level"]
 
-    hourly_rate = resource_rates.get(role, 0)
-    multiplier = COMPLEXITY_MULTIPLIERS.get(level, 1)
+    hourly_rate = rate_card.resource_rates.get(role, 0)
+    multiplier = rate_card.multiplier(role, level)
 
     adjusted_hours = hours * multiplier
-    cost = adjusted_hours * hourly_rate * DEFAULT_SETTINGS["productivity_factor"]
+    cost = adjusted_hours * hourly_rate * rate_card.productivity_factor
 
     return adjusted_hours, cost, role
 
 
-def calculate_estimation(project, resource_rates=RESOURCE_RATES):
+def calculate_estimation(project, rate_card=DEFAULT_RATE_CARD):
     total_hours = 0
     total_cost = 0
 
@@ -32,7 +29,7 @@ def calculate_estimation(project, resource_rates=RESOURCE_RATES):
 
         for feature in module["features"]:
             for task in feature["tasks"]:
-                adj_hours, cost, role = calculate_task_cost(task, resource_rates)
+                adj_hours, cost, role = calculate_task_cost(task, rate_card)
 
                 module_hours += adj_hours
                 module_cost += cost
@@ -48,6 +45,86 @@ def calculate_estimation(project, resource_rates=RESOURCE_RATES):
             "cost": round(module_cost)
         })
 
+    return build_estimation_result(
+        project, total_hours, total_cost, modules, resource_hours, rate_card.settings
+    )
+
+
+class EstimationAccumulator:
+    """
+    Running aggregates for tasks that arrive one at a time.
+
+    Tasks come in WBS order: consecutive tasks with the same module name
+    form one module, which is flushed to a subtotal row as soon as the next
+    module starts. A name that comes back after another module is a new
+    module, as a repeated name is in calculate_estimation. Memory is bounded
+    by the number of modules and roles, not tasks.
+    """
+
+    __slots__ = (
+        "rate_card",
+        "total_hours",
+        "total_cost",
+        "modules",
+        "resource_hours",
+        "current"
+    )
+
+    def __init__(self, rate_card=DEFAULT_RATE_CARD):
+        self.rate_card = rate_card
+        self.total_hours = 0
+        self.total_cost = 0
+        self.modules = []
+        self.resource_hours = {}
+        # [name, hours, cost] of the module being streamed
+        self.current = None
+
+    def _flush(self):
+        if self.current is not None:
+            name, hours, cost = self.current
+            self.modules.append({
+                "name": name,
+                "hours": round(hours, 1),
+                "cost": round(cost)
+            })
+            self.current = None
+
+    def add_task(self, module_name, task):
+        adj_hours, cost, role = calculate_task_cost(task, self.rate_card)
+
+        if self.current is None or self.current[0] != module_name:
+            self._flush()
+            self.current = [module_name, 0, 0]
+
+        self.current[1] += adj_hours
+        self.current[2] += cost
+
+        self.total_hours += adj_hours
+        self.total_cost += cost
+
+        self.resource_hours[role] = self.resource_hours.get(role, 0) + adj_hours
+
+    def result(self, project):
+        self._flush()
+
+        return build_estimation_result(
+            project,
+            self.total_hours,
+            self.total_cost,
+            self.modules,
+            self.resource_hours,
+            self.rate_card.settings
+        )
+
+
+def build_estimation_result(
+    project,
+    total_hours,
+    total_cost,
+    modules,
+    resource_hours,
+    settings=DEFAULT_SETTINGS
+):
     # Pricing
     risk_amount = total_cost * project["risk_buffer"] / 100
     cost_with_risk = total_cost + risk_amount
@@ -63,17 +140,21 @@ def calculate_estimation(project, resource_rates=RESOURCE_RATES):
 
     # Timeline
     hours_per_week = (
-        DEFAULT_SETTINGS["working_hours_per_day"]
-        * DEFAULT_SETTINGS["working_days_per_week"]
+        settings["working_hours_per_day"]
+        * settings["working_days_per_week"]
     )
 
     available_hours_per_week = (
-        hours_per_week * project["estimated_team_size"] * 0.8
+        hours_per_week * project["estimated_team_size"] * RESOURCE_EFFICIENCY
+    )
+    available_hours_per_day = (
+        available_hours_per_week / settings["working_days_per_week"]
     )
 
     weeks_required = (total_hours / available_hours_per_week).__ceil__()
+    working_days_required = (total_hours / available_hours_per_day).__ceil__()
     sprints_required = (
-        weeks_required / DEFAULT_SETTINGS["sprint_duration_weeks"]
+        weeks_required / settings["sprint_duration_weeks"]
     ).__ceil__()
 
     # Resource allocation
@@ -116,14 +197,15 @@ def calculate_estimation(project, resource_rates=RESOURCE_RATES):
 
         "timeline": {
             "weeks_required": weeks_required,
+            "working_days_required": working_days_required,
             "months_estimate": (weeks_required / 4).__ceil__(),
             "sprints_required": sprints_required,
             "estimated_team_size": project["estimated_team_size"],
             "assumptions": {
-                "working_hours_per_day": DEFAULT_SETTINGS["working_hours_per_day"],
-                "working_days_per_week": DEFAULT_SETTINGS["working_days_per_week"],
-                "sprint_duration_weeks": DEFAULT_SETTINGS["sprint_duration_weeks"],
-                "resource_efficiency_percent": 80
+                "working_hours_per_day": settings["working_hours_per_day"],
+                "working_days_per_week": settings["working_days_per_week"],
+                "sprint_duration_weeks": settings["sprint_duration_weeks"],
+                "resource_efficiency_percent": round(RESOURCE_EFFICIENCY * 100)
             }
         },
 
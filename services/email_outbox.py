@@ -0,0 +1,247 @@
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from decouple import config
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+
+from database.mongo import email_outbox_collection
+from utils.email import SMTPConnection
+
+# workers, each holding one reused SMTP connection
+EMAIL_OUTBOX_WORKERS = config("EMAIL_OUTBOX_WORKERS", default=2, cast=int)
+# repeated emails with the same coalesce key within this window are merged
+EMAIL_OUTBOX_COALESCE_SECONDS = config("EMAIL_OUTBOX_COALESCE_SECONDS", default=60, cast=int)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config("EMAIL_OUTBOX_MAX_ATTEMPTS", default=6, cast=int)
+# retry n waits base * 2^(n-1), capped, plus up to 20% jitter
+EMAIL_OUTBOX_RETRY_BASE_SECONDS = config("EMAIL_OUTBOX_RETRY_BASE_SECONDS", default=10, cast=float)
+EMAIL_OUTBOX_RETRY_MAX_SECONDS = config("EMAIL_OUTBOX_RETRY_MAX_SECONDS", default=900, cast=float)
+# idle workers look for due retries and other processes' messages this often
+EMAIL_OUTBOX_POLL_SECONDS = config("EMAIL_OUTBOX_POLL_SECONDS", default=5, cast=float)
+# an SMTP connection idle this long is closed
+EMAIL_OUTBOX_IDLE_CLOSE_SECONDS = config("EMAIL_OUTBOX_IDLE_CLOSE_SECONDS", default=30, cast=float)
+
+# a worker that dies mid-send lets its message be picked up again
+EMAIL_OUTBOX_LEASE_SECONDS = 60
+
+
+def retry_delay(attempts):
+    delay = min(
+        EMAIL_OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+        EMAIL_OUTBOX_RETRY_MAX_SECONDS
+    )
+    return delay * (1 + random.random() * 0.2)
+
+
+class EmailOutbox:
+    """
+    Persisted outbox drained by a pool of background workers.
+
+    Requests only insert a message; workers claim due messages with a lease,
+    send them over SMTP connections they keep open between messages, and
+    retry failures with exponential backoff until max_attempts.
+    """
+
+    def __init__(self, collection, workers, connect=SMTPConnection):
+        self.collection = collection
+        self.workers = workers
+        self.connect = connect
+
+        self._worker_id = uuid.uuid4().hex
+        self._wakeup = None
+        self._tasks = []
+
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.coalesced = 0
+        # outbox reads or writes that failed, each followed by a back-off
+        self.errors = 0
+
+    async def enqueue(self, recipient, subject, html, coalesce_key=None):
+        """
+        Stores a message for sending and returns its id. A message with the
+        same coalesce_key created within the window is reused instead: a
+        pending one gets the newer content, one already sent is not sent
+        again.
+        """
+        now = datetime.utcnow()
+
+        if coalesce_key:
+            existing = await self.collection.find_one_and_update(
+                {
+                    "coalesce_key": coalesce_key,
+                    "status": "pending",
+                    "created_at": {"$gte": now - timedelta(seconds=EMAIL_OUTBOX_COALESCE_SECONDS)}
+                },
+                {"$set": {"subject": subject, "html": html, "updated_at": now}},
+                sort=[("created_at", DESCENDING)],
+                projection={"_id": 1}
+            )
+            if existing is None:
+                existing = await self.collection.find_one(
+                    {
+                        "coalesce_key": coalesce_key,
+                        "status": {"$in": ["sending", "sent"]},
+                        "created_at": {"$gte": now - timedelta(seconds=EMAIL_OUTBOX_COALESCE_SECONDS)}
+                    },
+                    {"_id": 1}
+                )
+            if existing is not None:
+                self.coalesced += 1
+                return existing["_id"]
+
+        result = await self.collection.insert_one({
+            "recipient": recipient,
+            "subject": subject,
+            "html": html,
+            "coalesce_key": coalesce_key,
+            "status": "pending",
+            "attempts": 0,
+            "next_attempt_at": now,
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "last_error": None,
+            "created_at": now,
+            "updated_at": now,
+            "sent_at": None
+        })
+
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+        return result.inserted_id
+
+    async def _claim(self):
+        now = datetime.utcnow()
+
+        return await self.collection.find_one_and_update(
+            {"$or": [
+                {"status": "pending", "next_attempt_at": {"$lte": now}},
+                {"status": "sending", "lease_expires_at": {"$lt": now}}
+            ]},
+            {"$set": {
+                "status": "sending",
+                "lease_owner": self._worker_id,
+                "lease_expires_at": now + timedelta(seconds=EMAIL_OUTBOX_LEASE_SECONDS),
+                "updated_at": now
+            }},
+            sort=[("next_attempt_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _deliver(self, smtp, message):
+        try:
+            await smtp.send(message["recipient"], message["subject"], message["html"])
+        except Exception as e:
+            # start the retry on a fresh connection
+            await smtp.close()
+
+            attempts = message["attempts"] + 1
+            failed = attempts >= EMAIL_OUTBOX_MAX_ATTEMPTS
+
+            await self.collection.update_one(
+                {"_id": message["_id"], "lease_owner": self._worker_id},
+                {"$set": {
+                    "status": "failed" if failed else "pending",
+                    "attempts": attempts,
+                    "next_attempt_at": datetime.utcnow() + timedelta(seconds=retry_delay(attempts)),
+                    "lease_owner": None,
+                    "lease_expires_at": None,
+                    "last_error": str(e) or type(e).__name__,
+                    "updated_at": datetime.utcnow()
+                }}
+            )
+            if failed:
+                self.failed += 1
+            else:
+                self.retried += 1
+            return
+
+        await self.collection.update_one(
+            {"_id": message["_id"], "lease_owner": self._worker_id},
+            {"$set": {
+                "status": "sent",
+                "attempts": message["attempts"] + 1,
+                "lease_owner": None,
+                "lease_expires_at": None,
+                "last_error": None,
+                "sent_at": datetime.utcnow(),
+                "updated_at": datetime.utcnow()
+            }}
+        )
+        self.sent += 1
+
+    async def _wait_for_work(self, smtp, last_sent):
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), EMAIL_OUTBOX_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            if time.monotonic() - last_sent >= EMAIL_OUTBOX_IDLE_CLOSE_SECONDS:
+                await smtp.close()
+
+    async def _work(self):
+        smtp = self.connect()
+        last_sent = time.monotonic()
+
+        try:
+            while True:
+                # cleared before looking, so a message enqueued meanwhile wakes us
+                self._wakeup.clear()
+
+                try:
+                    message = await self._claim()
+                    if message is not None:
+                        await self._deliver(smtp, message)
+                except Exception:
+                    # the outbox is unreachable: back off and keep the worker;
+                    # a message left "sending" is claimed again once its
+                    # lease expires
+                    self.errors += 1
+                    await asyncio.sleep(EMAIL_OUTBOX_POLL_SECONDS)
+                    continue
+
+                if message is None:
+                    await self._wait_for_work(smtp, last_sent)
+                else:
+                    last_sent = time.monotonic()
+        finally:
+            await smtp.close()
+
+    async def start(self):
+        if self._tasks:
+            return
+
+        await self.collection.create_index(
+            [("status", ASCENDING), ("next_attempt_at", ASCENDING)]
+        )
+        # expired leases of messages left "sending"
+        await self.collection.create_index(
+            [("status", ASCENDING), ("lease_expires_at", ASCENDING)]
+        )
+        await self.collection.create_index(
+            [("coalesce_key", ASCENDING), ("created_at", DESCENDING)]
+        )
+
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def metrics(self):
+        return {
+            "workers": len(self._tasks),
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "coalesced": self.coalesced,
+            "errors": self.errors
+        }
+
+
+email_outbox = EmailOutbox(email_outbox_collection, EMAIL_OUTBOX_WORKERS)
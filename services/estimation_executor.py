@@ -0,0 +1,138 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from decouple import config
+from fastapi import HTTPException
+
+from utils.timing import Timing
+
+# payloads up to this many tasks run inline on the event loop
+ESTIMATION_INLINE_MAX_TASKS = config("ESTIMATION_INLINE_MAX_TASKS", default=2000, cast=int)
+ESTIMATION_POOL_WORKERS = config("ESTIMATION_POOL_WORKERS", default=os.cpu_count() or 2, cast=int)
+# jobs allowed to wait for a free worker before new ones get a 503
+ESTIMATION_MAX_QUEUED = config("ESTIMATION_MAX_QUEUED", default=32, cast=int)
+
+DISCONNECT_POLL_SECONDS = 0.25
+
+
+def _timed_call(fn, args):
+    # runs in the worker process; wall-clock so the parent can derive queue wait
+    started = time.time()
+    result = fn(*args)
+    return started, time.time(), result
+
+
+class EstimationExecutor:
+    """
+    Runs estimation work inline for small payloads and on a process pool
+    above a task-count threshold, so large WBS payloads do not block the
+    event loop.
+
+    Pool work is bounded: at most `workers` jobs run and `max_queued` wait,
+    anything beyond is rejected with 503. A job still waiting when its client
+    disconnects is cancelled; a job already running in a worker cannot be
+    interrupted and its result is dropped, but it keeps its slot until the
+    worker is done with it. Either way run() returns None, as there is no
+    one left to answer.
+    """
+
+    def __init__(self, inline_max_tasks, workers, max_queued):
+        self.inline_max_tasks = inline_max_tasks
+        self.workers = workers
+        self.max_queued = max_queued
+
+        self._pool = None
+        self._in_flight = 0
+
+        self.rejected = 0
+        self.cancelled = 0
+        self.inline_time = Timing()
+        self.pool_time = Timing()
+        self.queue_wait = Timing()
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    async def run(self, fn, *args, task_count, request=None):
+        if task_count <= self.inline_max_tasks:
+            started = time.perf_counter()
+            result = fn(*args)
+            self.inline_time.record(time.perf_counter() - started)
+            return result
+
+        if self._in_flight >= self.workers + self.max_queued:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Estimation workers are busy, please retry shortly"
+            )
+
+        loop = asyncio.get_running_loop()
+        submitted = time.time()
+
+        pool_future = self.pool.submit(_timed_call, fn, args)
+        self._in_flight += 1
+        # released when the worker is done, not when the caller stops waiting
+        pool_future.add_done_callback(lambda _: self._release(loop))
+
+        future = asyncio.wrap_future(pool_future)
+
+        while True:
+            done, _ = await asyncio.wait({future}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                break
+
+            if request is not None and await request.is_disconnected():
+                # a job still queued is dropped; a running one runs to the end
+                future.cancel()
+                self.cancelled += 1
+                return None
+
+        started, finished, result = future.result()
+
+        self.queue_wait.record(max(0.0, started - submitted))
+        self.pool_time.record(finished - started)
+
+        return result
+
+    def _release(self, loop):
+        # called from the pool's thread
+        try:
+            loop.call_soon_threadsafe(self._decrement_in_flight)
+        except RuntimeError:
+            # the loop is closed: no one is left to count
+            pass
+
+    def _decrement_in_flight(self):
+        self._in_flight -= 1
+
+    def metrics(self):
+        return {
+            "inline_max_tasks": self.inline_max_tasks,
+            "workers": self.workers,
+            "max_queued": self.max_queued,
+            "in_flight": self._in_flight,
+            "queue_depth": max(0, self._in_flight - self.workers),
+            "rejected": self.rejected,
+            "cancelled": self.cancelled,
+            "inline_execution": self.inline_time.as_dict(),
+            "pool_execution": self.pool_time.as_dict(),
+            "pool_queue_wait": self.queue_wait.as_dict()
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+estimation_executor = EstimationExecutor(
+    ESTIMATION_INLINE_MAX_TASKS,
+    ESTIMATION_POOL_WORKERS,
+    ESTIMATION_MAX_QUEUED
+)
@@ -0,0 +1,53 @@
+import hashlib
+import json
+from decouple import config
+
+from schemas.project import EstimationProjectRequest
+from schemas.wbs import modules_adapter
+from utils.ttl_cache import TTLCache
+
+ESTIMATION_MEMO_SIZE = config("ESTIMATION_MEMO_SIZE", default=512, cast=int)
+ESTIMATION_MEMO_TTL_SECONDS = config("ESTIMATION_MEMO_TTL_SECONDS", default=600, cast=int)
+
+# request fields besides the WBS that change the /calculate result; dates
+# are resolved against the calendar after the memo
+ESTIMATION_REQUEST_FIELDS = tuple(
+    field for field in EstimationProjectRequest.model_fields
+    if field not in ("modules", "start_date")
+)
+
+estimation_memo = TTLCache(ESTIMATION_MEMO_SIZE, ESTIMATION_MEMO_TTL_SECONDS)
+
+
+def _canonical(value):
+    # 20 and 20.0 price the same; ProjectCreate sends floats, /calculate ints
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, dict):
+        return {key: _canonical(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_canonical(item) for item in value]
+    return value
+
+
+def estimation_key(request_fields, modules, rate_card, kind="result"):
+    """
+    Canonical hash of an estimation request: the non-WBS request fields, the
+    validated modules serialized by pydantic's JSON encoder, and the version
+    of the rate card that prices them. `kind` keeps /calculate results and
+    stored project snapshots of the same request apart.
+    """
+    fields = {
+        field: _canonical(request_fields.get(field))
+        for field in ESTIMATION_REQUEST_FIELDS
+    }
+
+    digest = hashlib.sha256(kind.encode())
+    digest.update(b"\0")
+    digest.update(rate_card.version.encode())
+    digest.update(b"\0")
+    digest.update(json.dumps(fields, sort_keys=True, separators=(",", ":")).encode())
+    digest.update(b"\0")
+    digest.update(modules_adapter.dump_json(modules))
+
+    return digest.hexdigest()
@@ -0,0 +1,351 @@
+import hashlib
+import json
+
+import numpy as np
+
+from core.rate_card import DEFAULT_RATE_CARD
+from services.cost_timeline_engine import build_estimation_result, calculate_task_cost
+
+
+def build_hour_matrix(modules):
+    """
+    Aggregates raw (unadjusted) task hours into a role x level matrix for the
+    whole project plus one matrix per module.
+
+    Roles and levels keep first-appearance order so resource allocation comes
+    out in the same order as calculate_estimation.
+    """
+    roles = {}
+    levels = {}
+    module_cells = []
+
+    for module in modules:
+        cells = {}
+
+        for feature in module["features"]:
+            for task in feature["tasks"]:
+                r = roles.setdefault(task["role"], len(roles))
+                l = levels.setdefault(task["level"], len(levels))
+                cells[(r, l)] = cells.get((r, l), 0) + task["hours"]
+
+        module_cells.append((module["name"], cells))
+
+    def to_matrix(cells):
+        matrix = [[0] * len(levels) for _ in roles]
+        for (r, l), hours in cells.items():
+            matrix[r][l] += hours
+        return matrix
+
+    total = {}
+    for _, cells in module_cells:
+        for key, hours in cells.items():
+            total[key] = total.get(key, 0) + hours
+
+    return {
+        "roles": list(roles),
+        "levels": list(levels),
+        "hours": to_matrix(total),
+        "modules": [
+            {"name": name, "hours": to_matrix(cells)}
+            for name, cells in module_cells
+        ]
+    }
+
+
+def reprice_from_matrix(hour_matrix, project, rate_card=DEFAULT_RATE_CARD):
+    """
+    Rebuilds the calculate_estimation result from a stored hour matrix.
+
+    Work is O(modules x roles x levels), independent of the task count.
+    `project` only needs the pricing fields (target_margin, risk_buffer,
+    negotiation_buffer, estimated_team_size).
+    """
+    roles = hour_matrix["roles"]
+    levels = hour_matrix["levels"]
+
+    rates = rate_card.rates_for(roles)
+    multipliers = rate_card.multiplier_matrix(roles, levels)
+
+    module_hours = np.array(
+        [m["hours"] for m in hour_matrix["modules"]],
+        dtype=np.float64
+    ).reshape(len(hour_matrix["modules"]), len(roles), len(levels))
+
+    # adjusted hours per module x role
+    adj_role_hours = (module_hours * multipliers).sum(axis=2)
+    module_cost = (
+        adj_role_hours @ rates * rate_card.productivity_factor
+    ).tolist()
+    module_total_hours = adj_role_hours.sum(axis=1).tolist()
+
+    modules = [
+        {
+            "name": m["name"],
+            "hours": round(module_total_hours[i], 1),
+            "cost": round(module_cost[i])
+        }
+        for i, m in enumerate(hour_matrix["modules"])
+    ]
+
+    resource_hours = dict(zip(roles, adj_role_hours.sum(axis=0).tolist()))
+
+    return build_estimation_result(
+        project,
+        sum(module_total_hours),
+        sum(module_cost),
+        modules,
+        resource_hours,
+        rate_card.settings
+    )
+
+
+def diff_estimations(expected, actual, path=""):
+    """
+    Lists the leaves where two estimation results disagree.
+    """
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        differences = []
+        for key in {**expected, **actual}:
+            differences += diff_estimations(
+                expected.get(key), actual.get(key), f"{path}.{key}" if path else key
+            )
+        return differences
+
+    if isinstance(expected, list) and isinstance(actual, list) and len(expected) == len(actual):
+        differences = []
+        for i, (a, b) in enumerate(zip(expected, actual)):
+            differences += diff_estimations(a, b, f"{path}[{i}]")
+        return differences
+
+    if expected != actual:
+        return [{"path": path, "full_recompute": expected, "repriced": actual}]
+
+    return []
+
+
+def module_digest(module):
+    payload = json.dumps(module, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _salted_hash(digest, fingerprint):
+    return hashlib.sha256(f"{fingerprint}:{digest}".encode()).hexdigest()
+
+
+def module_content_hash(module, fingerprint):
+    """
+    Content hash of one module, salted with the rate fingerprint so cached
+    subtotals are dropped when rates or multipliers change.
+    """
+    return _salted_hash(module_digest(module), fingerprint)
+
+
+def build_template_hour_matrix(modules):
+    """
+    build_hour_matrix with the content digest of every module, stored on
+    templates so unmodified copies are priced without walking their tasks.
+    """
+    hour_matrix = build_hour_matrix(modules)
+
+    for entry, module in zip(hour_matrix["modules"], modules):
+        entry["digest"] = module_digest(module)
+
+    return hour_matrix
+
+
+def calculate_module_subtotal(module, rate_card=DEFAULT_RATE_CARD):
+    hours = 0
+    cost = 0
+    resource_hours = {}
+    cells = {}
+
+    for feature in module["features"]:
+        for task in feature["tasks"]:
+            adj_hours, task_cost, role = calculate_task_cost(task, rate_card)
+
+            hours += adj_hours
+            cost += task_cost
+            resource_hours[role] = resource_hours.get(role, 0) + adj_hours
+
+            key = (role, task["level"])
+            cells[key] = cells.get(key, 0) + task["hours"]
+
+    return {
+        "name": module["name"],
+        "hours": hours,
+        "cost": cost,
+        # role names are free text, so keep them out of Mongo keys
+        "resource_hours": [[role, hrs] for role, hrs in resource_hours.items()],
+        "cells": [[role, level, hrs] for (role, level), hrs in cells.items()]
+    }
+
+
+def build_module_cache(modules, previous_cache=None, rate_card=DEFAULT_RATE_CARD):
+    """
+    Per-module subtotals keyed by content hash. Only modules whose hash is
+    not in `previous_cache` are walked again.
+    """
+    fingerprint = rate_card.fingerprint
+    cached = {entry["hash"]: entry for entry in previous_cache or []}
+
+    cache = []
+    for module in modules:
+        content_hash = module_content_hash(module, fingerprint)
+        entry = cached.get(content_hash)
+
+        if entry is None:
+            entry = {
+                "hash": content_hash,
+                **calculate_module_subtotal(module, rate_card)
+            }
+        else:
+            entry = {**entry, "name": module["name"]}
+
+        cache.append(entry)
+
+    return cache
+
+
+def module_cache_from_hour_matrix(hour_matrix, rate_card=DEFAULT_RATE_CARD):
+    """
+    The build_module_cache entries of the modules of a template, priced from
+    the matrices of build_template_hour_matrix in O(modules x roles x
+    levels). None for a matrix stored without module digests.
+    """
+    if not all("digest" in module for module in hour_matrix["modules"]):
+        return None
+
+    rates = rate_card.resource_rates
+    cache = []
+
+    for module in hour_matrix["modules"]:
+        hours = 0
+        cost = 0
+        resource_hours = {}
+        cells = []
+
+        for role, row in zip(hour_matrix["roles"], module["hours"]):
+            for level, raw_hours in zip(hour_matrix["levels"], row):
+                if not raw_hours:
+                    continue
+
+                adj_hours = raw_hours * rate_card.multiplier(role, level)
+                hours += adj_hours
+                cost += adj_hours * rates.get(role, 0) * rate_card.productivity_factor
+                resource_hours[role] = resource_hours.get(role, 0) + adj_hours
+                cells.append([role, level, raw_hours])
+
+        cache.append({
+            "hash": _salted_hash(module["digest"], rate_card.fingerprint),
+            "name": module["name"],
+            "hours": hours,
+            "cost": cost,
+            "resource_hours": [[role, hrs] for role, hrs in resource_hours.items()],
+            "cells": cells
+        })
+
+    return cache
+
+
+def estimation_from_module_cache(module_cache, project, rate_card=DEFAULT_RATE_CARD):
+    total_hours = 0
+    total_cost = 0
+    modules = []
+    resource_hours = {}
+
+    for entry in module_cache:
+        total_hours += entry["hours"]
+        total_cost += entry["cost"]
+
+        for role, hrs in entry["resource_hours"]:
+            resource_hours[role] = resource_hours.get(role, 0) + hrs
+
+        modules.append({
+            "name": entry["name"],
+            "hours": round(entry["hours"], 1),
+            "cost": round(entry["cost"])
+        })
+
+    return build_estimation_result(
+        project, total_hours, total_cost, modules, resource_hours, rate_card.settings
+    )
+
+
+def hour_matrix_from_module_cache(module_cache):
+    """
+    Same layout as build_hour_matrix, rebuilt from cached module cells.
+    """
+    roles = {}
+    levels = {}
+
+    for entry in module_cache:
+        for role, level, _ in entry["cells"]:
+            roles.setdefault(role, len(roles))
+            levels.setdefault(level, len(levels))
+
+    total = [[0] * len(levels) for _ in roles]
+    module_matrices = []
+
+    for entry in module_cache:
+        matrix = [[0] * len(levels) for _ in roles]
+        for role, level, hrs in entry["cells"]:
+            matrix[roles[role]][levels[level]] += hrs
+            total[roles[role]][levels[level]] += hrs
+        module_matrices.append({"name": entry["name"], "hours": matrix})
+
+    return {
+        "roles": list(roles),
+        "levels": list(levels),
+        "hours": total,
+        "modules": module_matrices
+    }
+
+
+def module_cache_is_current(snapshot, rate_card):
+    """
+    Whether the module subtotals of a stored snapshot were priced with
+    `rate_card`, so a pricing-only change can reuse them.
+    """
+    return (
+        bool(snapshot.get("module_cache"))
+        and snapshot.get("module_cache_fingerprint") == rate_card.fingerprint
+    )
+
+
+def build_estimation_snapshot(
+    project,
+    calculated_at,
+    previous_snapshot=None,
+    rate_card=DEFAULT_RATE_CARD
+):
+    """
+    Builds the stored estimation_snapshot for a project, reusing the module
+    subtotals of `previous_snapshot` for modules that did not change.
+
+    When `project` carries no "modules" (pricing-only change) the previous
+    module cache is reused as is, which is only valid while it was priced
+    with `rate_card`; otherwise the modules must be passed.
+    """
+    previous_snapshot = previous_snapshot or {}
+    previous_cache = previous_snapshot.get("module_cache")
+
+    if project.get("modules") is None:
+        if not module_cache_is_current(previous_snapshot, rate_card):
+            raise ValueError("Modules are required to price with a different rate card")
+        module_cache = previous_cache
+    else:
+        module_cache = build_module_cache(project["modules"], previous_cache, rate_card)
+
+    return snapshot_from_module_cache(module_cache, project, calculated_at, rate_card)
+
+
+def snapshot_from_module_cache(module_cache, project, calculated_at, rate_card=DEFAULT_RATE_CARD):
+    return {
+        **estimation_from_module_cache(module_cache, project, rate_card),
+        "hour_matrix": hour_matrix_from_module_cache(module_cache),
+        "module_cache": module_cache,
+        "module_cache_fingerprint": rate_card.fingerprint,
+        "rate_card_version": rate_card.version,
+        "rate_card_fingerprint": rate_card.fingerprint,
+        "calculated_at": calculated_at
+    }
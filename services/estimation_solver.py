@@ -0,0 +1,131 @@
+import math
+
+import numpy as np
+
+from core.rate_card import DEFAULT_RATE_CARD
+from services.columnar_engine import calculate_totals
+from services.sensitivity_sweep import price_points, weeks_for_team
+
+# margin grid points a single solve may evaluate
+SOLVE_MAX_MARGIN_POINTS = 1_000_000
+
+
+def solve_team_size(total_hours, target_weeks, max_team_size, settings):
+    """
+    Smallest team whose weeks_required fits in `target_weeks`, with the
+    team sizes right below and above it.
+    """
+    team = np.arange(1, max_team_size + 1)
+    weeks = weeks_for_team(total_hours, team, settings)
+
+    # weeks never grow with the team, so the first fit is the minimum
+    fits = weeks <= target_weeks
+    if not fits.any():
+        raise ValueError(
+            f"{target_weeks} weeks is not reachable with up to {max_team_size} members"
+        )
+
+    solution = int(np.argmax(fits))
+
+    def point(i):
+        weeks_required = int(weeks[i])
+        return {
+            "estimated_team_size": int(team[i]),
+            "weeks_required": weeks_required,
+            "sprints_required": math.ceil(weeks_required / settings["sprint_duration_weeks"]),
+            "meets_target": bool(fits[i])
+        }
+
+    return point(solution), [
+        point(i) for i in (solution - 1, solution + 1) if 0 <= i < team.size
+    ]
+
+
+def solve_margin(total_cost, target_price, risk_buffer, negotiation_buffer, step):
+    """
+    Smallest target_margin, on a grid of `step` percent, whose rounded
+    final_price reaches `target_price`, with the grid points around it.
+    """
+    if not total_cost:
+        raise ValueError("The project has no cost to put a margin on")
+
+    cost_with_risk = total_cost * (1 + risk_buffer / 100)
+    price_per_margin = cost_with_risk * (1 + negotiation_buffer / 100)
+
+    # final_price is rounded, so the answer lies where the unrounded price is
+    # within half a unit of target_price. That band is solved in closed form
+    # and the grid spans it, however many steps that takes, plus two points
+    # either side; each point is then checked against the engine formula
+    low = ((target_price - 0.5) / price_per_margin - 1) * 100
+    high = ((target_price + 0.5) / price_per_margin - 1) * 100
+
+    first = math.floor(low / step) - 2
+    count = math.ceil(high / step) + 2 - first + 1
+    if count > SOLVE_MAX_MARGIN_POINTS:
+        raise ValueError(f"margin_step {step} is too fine for this project, use a coarser one")
+
+    margin = np.round((first + np.arange(count)) * step, 6)
+
+    final_price, profit_percent = price_points(
+        total_cost, risk_buffer, margin, negotiation_buffer
+    )
+    final_price = np.round(final_price)
+    fits = final_price >= target_price
+    if not fits.any():
+        raise ValueError("Could not find a margin for the target price")
+
+    solution = int(np.argmax(fits))
+
+    def point(i):
+        return {
+            "target_margin": float(margin[i]),
+            "final_price": int(final_price[i]),
+            "profit_margin_percent": round(float(profit_percent[i]), 1),
+            "meets_target": bool(fits[i])
+        }
+
+    return point(solution), [
+        point(i) for i in (solution - 1, solution + 1) if 0 <= i < margin.size
+    ]
+
+
+def solve_estimation(project, rate_card=DEFAULT_RATE_CARD):
+    """
+    Solves calculate_estimation backwards: the minimum estimated_team_size
+    for `target_weeks`, or the target_margin needed for `target_price`.
+
+    Tasks are aggregated once; candidates are evaluated as arrays with the
+    same formulas the sweep uses.
+    """
+    total_hours, total_cost = calculate_totals([project], rate_card)
+    total_hours = float(total_hours[0])
+    total_cost = float(total_cost[0])
+
+    if project["solve_for"] == "estimated_team_size":
+        target = {"weeks": project["target_weeks"]}
+        solution, neighbours = solve_team_size(
+            total_hours,
+            project["target_weeks"],
+            project["max_team_size"],
+            rate_card.settings
+        )
+    else:
+        target = {"final_price": project["target_price"]}
+        solution, neighbours = solve_margin(
+            total_cost,
+            project["target_price"],
+            project["risk_buffer"],
+            project["negotiation_buffer"],
+            project["margin_step"]
+        )
+
+    return {
+        "solve_for": project["solve_for"],
+        "target": target,
+        "totals": {
+            "hours": round(total_hours, 1),
+            "base_cost": round(total_cost)
+        },
+        "solution": solution,
+        "neighbours": neighbours
+    }
@@ -0,0 +1,53 @@
+from core.rate_card import DEFAULT_RATE_CARD
+from services.columnar_engine import calculate_estimation_compact
+from services.estimation_snapshot import build_estimation_snapshot
+from services.risk_simulation import simulate_estimation
+from services.timeline_scheduler import scheduled_timeline
+
+# Module-level entry points so the estimation executor can ship them to a
+# worker process by reference.
+
+
+def count_tasks(modules):
+    return sum(
+        len(feature["tasks"])
+        for module in modules
+        for feature in module["features"]
+    )
+
+
+def estimate_project(wbs, project, rate_card=DEFAULT_RATE_CARD):
+    """
+    Everything /api/estimation/calculate computes for one payload: `wbs` is
+    the CompactWBS, `project` the remaining request fields.
+    Raises ValueError when team_composition misses a role.
+    """
+    result = calculate_estimation_compact(wbs, project, rate_card)
+
+    if project.get("team_composition"):
+        result["timeline"] = scheduled_timeline(
+            wbs, project["team_composition"], rate_card
+        )
+
+    simulation = project.get("simulation")
+    if simulation:
+        result["simulation"] = simulate_estimation(
+            wbs,
+            project,
+            trials=simulation["trials"],
+            seed=simulation["seed"],
+            rate_card=rate_card
+        )
+
+    return result
+
+
+def reprice_projects(projects, calculated_at, rate_card=DEFAULT_RATE_CARD):
+    """
+    Fresh estimation snapshots for a chunk of stored projects, as
+    (project _id, snapshot) pairs.
+    """
+    return [
+        (project["_id"], build_estimation_snapshot(project, calculated_at, None, rate_card))
+        for project in projects
+    ]
@@ -0,0 +1,298 @@
+from core.rate_card import DEFAULT_RATE_CARD
+from services.compact_wbs import CompactWBS
+from services.cost_timeline_engine import build_estimation_result
+from services.timeline_scheduler import scheduled_timeline
+from services.work_calendars import with_delivery_dates
+
+PRICING_FIELDS = (
+    "target_margin",
+    "risk_buffer",
+    "negotiation_buffer",
+    "estimated_team_size"
+)
+
+# result sections rebuilt on every edit; each is O(roles x levels)
+RESULT_SECTIONS = ("totals", "pricing", "timeline", "resource_allocation")
+
+
+def _add_cell(cells, key, hours):
+    total = cells.get(key, 0) + hours
+    if total:
+        cells[key] = total
+    else:
+        del cells[key]
+
+
+def _first(items, name, kind):
+    for i, item in enumerate(items):
+        if item["name"] == name:
+            return i, item
+    raise ValueError(f"{kind} '{name}' not found")
+
+
+class LiveEstimationSession:
+    """
+    Server-side WBS of one live estimation session.
+
+    Raw task hours are kept as integers per (role, level) cell, for every
+    module and for the whole project, so an edit only moves hours between
+    cells and never accumulates float error. Prices are derived from the
+    cells, which makes every edit O(roles x levels) whatever the WBS size;
+    with a team_composition the timeline is rescheduled, which is O(tasks).
+
+    Names may repeat at any level, as in /calculate. Edits address modules,
+    features and tasks by name and change the first match.
+    """
+
+    def __init__(
+        self,
+        project,
+        rate_card=DEFAULT_RATE_CARD,
+        calendar=None,
+        max_tasks=None
+    ):
+        self.rate_card = rate_card
+        self.pricing = {field: project[field] for field in PRICING_FIELDS}
+        self.team_composition = project.get("team_composition")
+        self.start_date = project.get("start_date")
+        self.calendar = calendar
+        self.max_tasks = max_tasks
+
+        # in order: {"name", "features": [{"name", "tasks": [task]}], "cells"}
+        self.modules = []
+        self.cells = {}
+        self.task_count = 0
+
+        for module in project["modules"]:
+            entry = {"name": module["name"], "features": [], "cells": {}}
+            self.modules.append(entry)
+
+            for feature in module["features"]:
+                tasks = [dict(task) for task in feature["tasks"]]
+                entry["features"].append({"name": feature["name"], "tasks": tasks})
+
+                for task in tasks:
+                    self._move_hours(entry, task, task["hours"])
+                self.task_count += len(tasks)
+
+        self.sent = {}
+        # modules edited since the last delta, and whether any were added
+        # or removed
+        self._changed = []
+        self._reshaped = False
+        # inverse of every operation applied since the last delta
+        self._undo = []
+
+    def _move_hours(self, module, task, hours):
+        key = (task["role"], task["level"])
+        _add_cell(module["cells"], key, hours)
+        _add_cell(self.cells, key, hours)
+
+    def _price_cells(self, cells):
+        rates = self.rate_card.resource_rates
+
+        hours = 0
+        cost = 0
+        resource_hours = {}
+
+        for (role, level), raw_hours in cells.items():
+            adjusted_hours = raw_hours * self.rate_card.multiplier(role, level)
+            hours += adjusted_hours
+            cost += adjusted_hours * rates.get(role, 0) * self.rate_card.productivity_factor
+            resource_hours[role] = resource_hours.get(role, 0) + adjusted_hours
+
+        return hours, cost, resource_hours
+
+    def module_result(self, module):
+        hours, cost, _ = self._price_cells(module["cells"])
+        return {"name": module["name"], "hours": round(hours, 1), "cost": round(cost)}
+
+    def _sections(self, modules):
+        hours, cost, resource_hours = self._price_cells(self.cells)
+        result = build_estimation_result(
+            self.pricing, hours, cost, modules, resource_hours, self.rate_card.settings
+        )
+
+        if self.team_composition:
+            result["timeline"] = scheduled_timeline(
+                CompactWBS.from_modules(self.modules), self.team_composition, self.rate_card
+            )
+
+        if self.calendar is not None:
+            [result] = with_delivery_dates(
+                [result], [self.start_date], self.calendar, self.rate_card.settings
+            )
+
+        return result
+
+    def result(self):
+        """
+        The full calculate_estimation-shaped result, without the risk
+        simulation; O(modules), sent once when the session starts. Raises
+        ValueError when team_composition misses a role or the start date
+        is outside the calendar.
+        """
+        result = self._sections([self.module_result(module) for module in self.modules])
+        self.sent = {section: result[section] for section in RESULT_SECTIONS}
+        return result
+
+    # Edits
+
+    def _check_task(self, task):
+        if self.team_composition and task["role"] not in self.team_composition:
+            raise ValueError(f"No team members for role '{task['role']}'")
+
+    def _add_task(self, op):
+        if self.max_tasks is not None and self.task_count >= self.max_tasks:
+            raise ValueError(f"Live sessions are limited to {self.max_tasks} tasks")
+        task = dict(op["task"])
+        self._check_task(task)
+
+        try:
+            _, module = _first(self.modules, op["module"], "Module")
+            new_module = False
+        except ValueError:
+            module = {"name": op["module"], "features": [], "cells": {}}
+            self.modules.append(module)
+            self._reshaped = new_module = True
+
+        try:
+            _, feature = _first(module["features"], op["feature"], "Feature")
+            new_feature = False
+        except ValueError:
+            feature = {"name": op["feature"], "tasks": []}
+            module["features"].append(feature)
+            new_feature = True
+
+        feature["tasks"].append(task)
+        self._move_hours(module, task, task["hours"])
+        self.task_count += 1
+        self._changed.append(module)
+
+        def undo():
+            feature["tasks"].pop()
+            self._move_hours(module, task, -task["hours"])
+            self.task_count -= 1
+            if new_feature:
+                module["features"].pop()
+            if new_module:
+                self.modules.pop()
+
+        return undo
+
+    def _edit(self, op):
+        action = op["op"]
+
+        if action == "set_pricing":
+            previous = dict(self.pricing)
+            for field in PRICING_FIELDS:
+                if op.get(field) is not None:
+                    self.pricing[field] = op[field]
+            return lambda: self.pricing.update(previous)
+
+        if action == "remove_module":
+            m, module = _first(self.modules, op["module"], "Module")
+            tasks = sum(len(f["tasks"]) for f in module["features"])
+
+            del self.modules[m]
+            for key, hours in module["cells"].items():
+                _add_cell(self.cells, key, -hours)
+            self.task_count -= tasks
+            self._reshaped = True
+
+            def undo():
+                self.modules.insert(m, module)
+                for key, hours in module["cells"].items():
+                    _add_cell(self.cells, key, hours)
+                self.task_count += tasks
+
+            return undo
+
+        if action == "add_task":
+            return self._add_task(op)
+
+        _, module = _first(self.modules, op["module"], "Module")
+        _, feature = _first(module["features"], op["feature"], "Feature")
+        tasks = feature["tasks"]
+        t, task = _first(tasks, op["task"], "Task")
+
+        if action == "remove_task":
+            del tasks[t]
+            self._move_hours(module, task, -task["hours"])
+            self.task_count -= 1
+            self._changed.append(module)
+
+            def undo():
+                tasks.insert(t, task)
+                self._move_hours(module, task, task["hours"])
+                self.task_count += 1
+
+            return undo
+
+        if action == "update_task":
+            changes = {key: value for key, value in op["changes"].items() if value is not None}
+            self._check_task({**task, **changes})
+            previous = dict(task)
+
+            self._move_hours(module, task, -task["hours"])
+            task.update(changes)
+            self._move_hours(module, task, task["hours"])
+            self._changed.append(module)
+
+            def undo():
+                self._move_hours(module, task, -task["hours"])
+                task.update(previous)
+                self._move_hours(module, task, task["hours"])
+
+            return undo
+
+        raise ValueError(f"Unknown operation '{action}'")
+
+    def apply(self, op):
+        """
+        Applies one edit operation; a ValueError leaves the session as it
+        was before the operation. rollback() undoes every operation applied
+        since the last delta.
+        """
+        self._undo.append(self._edit(op))
+
+    def rollback(self):
+        while self._undo:
+            self._undo.pop()()
+        self._changed = []
+        self._reshaped = False
+
+    def delta(self):
+        """
+        The parts of the result that changed since it was last sent: whole
+        sections compared by value, then either the edited modules with
+        their position in wbs.modules or, once modules were added or
+        removed, the whole module list.
+
+        Raises ValueError when the edited WBS cannot be scheduled or dated;
+        the edit can then be rolled back.
+        """
+        sections = self._sections([])
+
+        changes = {}
+        for section in RESULT_SECTIONS:
+            if sections[section] != self.sent.get(section):
+                changes[section] = self.sent[section] = sections[section]
+
+        if self._reshaped:
+            changes["module_list"] = [self.module_result(module) for module in self.modules]
+        else:
+            changed = {id(module) for module in self._changed}
+            modules = [
+                {"index": i, **self.module_result(module)}
+                for i, module in enumerate(self.modules)
+                if id(module) in changed
+            ]
+            if modules:
+                changes["modules"] = modules
+
+        self._changed = []
+        self._reshaped = False
+        self._undo = []
+
+        return changes
@@ -0,0 +1,102 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from decouple import config
+from fastapi import HTTPException
+
+from utils.security import hash_password, verify_password, verify_and_update_password
+from utils.timing import Timing
+
+# argon2 releases the GIL, so hashes on these threads run in parallel
+PASSWORD_HASH_WORKERS = config("PASSWORD_HASH_WORKERS", default=os.cpu_count() or 2, cast=int)
+# hashes allowed to wait for a free thread before new ones get a 503
+PASSWORD_HASH_MAX_QUEUED = config("PASSWORD_HASH_MAX_QUEUED", default=64, cast=int)
+
+
+def _timed_call(fn, args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return started, time.perf_counter(), result
+
+
+class PasswordHasher:
+    """
+    Runs Argon2 hashing and verification on a dedicated thread pool, so a
+    burst of logins does not stall the event loop.
+
+    At most `workers` hashes run and `max_queued` wait; anything beyond is
+    rejected with 503 straight away instead of queueing without bound.
+    """
+
+    def __init__(self, workers, max_queued):
+        self.workers = workers
+        self.max_queued = max_queued
+
+        self._pool = None
+        self._in_flight = 0
+
+        self.rejected = 0
+        self.hash_time = Timing()
+        self.queue_wait = Timing()
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="password-hasher"
+            )
+        return self._pool
+
+    async def _run(self, fn, *args):
+        if self._in_flight >= self.workers + self.max_queued:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Too many sign-in requests, please retry shortly"
+            )
+
+        self._in_flight += 1
+        submitted = time.perf_counter()
+
+        try:
+            started, finished, result = await asyncio.get_running_loop().run_in_executor(
+                self.pool, _timed_call, fn, args
+            )
+        finally:
+            self._in_flight -= 1
+
+        # recorded on the event loop, never from the pool threads
+        self.queue_wait.record(started - submitted)
+        self.hash_time.record(finished - started)
+
+        return result
+
+    async def hash(self, password):
+        return await self._run(hash_password, password)
+
+    async def verify(self, password, hashed_password):
+        return await self._run(verify_password, password, hashed_password)
+
+    async def verify_and_update(self, password, hashed_password):
+        return await self._run(verify_and_update_password, password, hashed_password)
+
+    def metrics(self):
+        return {
+            "workers": self.workers,
+            "max_queued": self.max_queued,
+            "in_flight": self._in_flight,
+            "queue_depth": max(0, self._in_flight - self.workers),
+            "rejected": self.rejected,
+            "hash_execution": self.hash_time.as_dict(),
+            "queue_wait": self.queue_wait.as_dict()
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUED)
@@ -0,0 +1,92 @@
+from bson import ObjectId
+
+from core.rate_card import RateCard, DEFAULT_RATE_CARD
+from database.mongo import companies_collection
+from utils.ttl_cache import TTLCache
+
+RATE_CARD_CACHE_SIZE = 1024
+
+# other workers only see a company update once their entry expires
+RATE_CARD_TTL_SECONDS = 300
+
+RATE_CARD_FIELDS = (
+    "resource_rates",
+    "complexity_multipliers",
+    "estimation_settings",
+    "calibrated_multipliers"
+)
+
+# resource_rates and complexity_multipliers are stored as lists of entries,
+# e.g. {"role": ..., "rate": ...}: role and level names are free text, so
+# they stay out of Mongo keys
+RATE_ENTRY_FIELDS = {
+    "resource_rates": ("role", "rate"),
+    "complexity_multipliers": ("level", "multiplier")
+}
+
+_rate_cards = TTLCache(RATE_CARD_CACHE_SIZE, RATE_CARD_TTL_SECONDS)
+
+
+def to_rate_entries(field, values):
+    name_key, value_key = RATE_ENTRY_FIELDS[field]
+    return [{name_key: name, value_key: value} for name, value in values.items()]
+
+
+def from_rate_entries(field, entries):
+    # companies updated before the entry layout still hold a {name: value} dict
+    if isinstance(entries, dict):
+        return dict(entries)
+
+    name_key, value_key = RATE_ENTRY_FIELDS[field]
+    return {entry[name_key]: entry[value_key] for entry in entries or []}
+
+
+def compile_rate_card(company):
+    """
+    Builds a RateCard from a company document; anything the company did not
+    set falls back to the defaults in core.estimation_constants.
+    """
+    if not company or not any(company.get(field) for field in RATE_CARD_FIELDS):
+        return DEFAULT_RATE_CARD
+
+    # stored as [role, level, factor] rows: role names are free text
+    calibration = {}
+    for role, level, factor in company.get("calibrated_multipliers") or []:
+        calibration.setdefault(role, {})[level] = factor
+
+    return RateCard(
+        {**DEFAULT_RATE_CARD.resource_rates, **from_rate_entries("resource_rates", company.get("resource_rates"))},
+        {**DEFAULT_RATE_CARD.complexity_multipliers, **from_rate_entries("complexity_multipliers", company.get("complexity_multipliers"))},
+        company.get("estimation_settings") or {},
+        f"{company['_id']}:{company.get('rate_card_version', 0)}",
+        calibration
+    )
+
+
+async def get_rate_card(company_id):
+    """
+    Returns the compiled rate card of a company from the in-process LRU,
+    reading the company document only on a miss or after the TTL.
+    """
+    if not company_id:
+        return DEFAULT_RATE_CARD
+
+    key = str(company_id)
+
+    rate_card = _rate_cards.get(key)
+    if rate_card is not None:
+        return rate_card
+
+    company = await companies_collection.find_one(
+        {"_id": ObjectId(key)},
+        {field: 1 for field in (*RATE_CARD_FIELDS, "rate_card_version")}
+    )
+    rate_card = compile_rate_card(company)
+
+    _rate_cards.set(key, rate_card)
+
+    return rate_card
+
+
+def invalidate_rate_card(company_id):
+    _rate_cards.pop(str(company_id))
@@ -0,0 +1,357 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from decouple import config
+from fastapi import HTTPException
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from database.mongo import projects_collection, repricing_jobs_collection
+from services.estimation_executor import estimation_executor
+from services.estimation_tasks import count_tasks, reprice_projects
+from services.rate_cards import get_rate_card, invalidate_rate_card
+from services.work_calendars import get_work_calendar, with_project_dates
+
+# projects read, repriced and written back per bulk_write
+REPRICING_BATCH_SIZE = config("REPRICING_BATCH_SIZE", default=200, cast=int)
+# projects per executor job; chunks of a batch run in parallel
+REPRICING_CHUNK_SIZE = config("REPRICING_CHUNK_SIZE", default=50, cast=int)
+REPRICING_PARALLEL_CHUNKS = config("REPRICING_PARALLEL_CHUNKS", default=2, cast=int)
+# pause after every batch, and while live requests are queued for the pool
+REPRICING_PAUSE_SECONDS = config("REPRICING_PAUSE_SECONDS", default=0.1, cast=float)
+
+# a worker that stops renewing its lease lets another one resume the job
+REPRICING_LEASE_SECONDS = 120
+
+ACTIVE_STATUSES = ["queued", "running"]
+
+# set while a job is queued or running; a partial unique index on it keeps
+# one active job per company ($in is not allowed in partial filters)
+ACTIVE_JOB = {"active": True}
+
+PROJECT_PROJECTION = {
+    "_id": 1,
+    "updated_at": 1,
+    "modules": 1,
+    "target_margin": 1,
+    "risk_buffer": 1,
+    "negotiation_buffer": 1,
+    "estimated_team_size": 1,
+    "start_date": 1
+}
+
+# this process' id in job leases
+_worker_id = uuid.uuid4().hex
+
+# jobs this process is running, by id
+_tasks = {}
+
+
+def _stale_projects_filter(company_id, fingerprint, after_id=None):
+    query = {
+        "company_id": company_id,
+        "estimation_snapshot.rate_card_fingerprint": {"$ne": fingerprint}
+    }
+    if after_id is not None:
+        query["_id"] = {"$gt": after_id}
+    return query
+
+
+def _spawn(job_id):
+    if job_id in _tasks:
+        return
+
+    task = asyncio.create_task(run_repricing_job(job_id))
+    _tasks[job_id] = task
+    task.add_done_callback(lambda _: _tasks.pop(job_id, None))
+
+
+async def start_repricing_job(company_id):
+    """
+    Queues a job re-pricing every project of the company whose snapshot was
+    not priced with its current rate card. A company has at most one active
+    job; starting it again counts a new request on it, so the job reloads
+    the rate card and does not complete before it has seen every request.
+    """
+    company_id = ObjectId(company_id)
+    now = datetime.utcnow()
+
+    try:
+        job = await repricing_jobs_collection.find_one_and_update(
+            {"company_id": company_id, **ACTIVE_JOB},
+            {
+                "$setOnInsert": {
+                    "company_id": company_id,
+                    "status": "queued",
+                    "rate_card_fingerprint": None,
+                    "last_project_id": None,
+                    "total": None,
+                    "processed": 0,
+                    "repriced": 0,
+                    "skipped": 0,
+                    "lease_owner": None,
+                    "lease_expires_at": None,
+                    "error": None,
+                    "created_at": now,
+                    "started_at": None,
+                    "finished_at": None
+                },
+                "$set": {"updated_at": now},
+                "$inc": {"requests": 1}
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # a concurrent start inserted the active job first
+        job = await repricing_jobs_collection.find_one(
+            {"company_id": company_id, **ACTIVE_JOB}
+        )
+
+    _spawn(job["_id"])
+
+    return job
+
+
+async def ensure_repricing_indexes():
+    """
+    Creates the index allowing one active job per company. Jobs queued
+    before the `active` flag existed are flagged first.
+    """
+    await repricing_jobs_collection.update_many(
+        {"status": {"$in": ACTIVE_STATUSES}, "active": {"$exists": False}},
+        {"$set": ACTIVE_JOB}
+    )
+    await repricing_jobs_collection.create_index(
+        [("company_id", ASCENDING)],
+        unique=True,
+        partialFilterExpression=ACTIVE_JOB
+    )
+
+
+async def resume_repricing_jobs():
+    """
+    Restarts jobs left active by a stopped worker; their leases decide
+    which worker actually runs them.
+    """
+    jobs = repricing_jobs_collection.find(
+        {"status": {"$in": ACTIVE_STATUSES}}, {"_id": 1}
+    )
+    async for job in jobs:
+        _spawn(job["_id"])
+
+
+async def _claim(job_id):
+    now = datetime.utcnow()
+
+    return await repricing_jobs_collection.find_one_and_update(
+        {
+            "_id": job_id,
+            "status": {"$in": ACTIVE_STATUSES},
+            "$or": [
+                {"lease_owner": _worker_id},
+                {"lease_expires_at": None},
+                {"lease_expires_at": {"$lt": now}}
+            ]
+        },
+        {"$set": {
+            "status": "running",
+            "lease_owner": _worker_id,
+            "lease_expires_at": now + timedelta(seconds=REPRICING_LEASE_SECONDS),
+            "updated_at": now
+        }},
+        return_document=ReturnDocument.AFTER
+    )
+
+
+async def _reprice_chunk(chunk, calculated_at, rate_card):
+    while True:
+        try:
+            return await estimation_executor.run(
+                reprice_projects,
+                chunk,
+                calculated_at,
+                rate_card,
+                task_count=sum(count_tasks(p["modules"]) for p in chunk)
+            )
+        except HTTPException as e:
+            # pool is saturated by live traffic: wait for it instead
+            if e.status_code != 503:
+                raise
+            await asyncio.sleep(REPRICING_PAUSE_SECONDS * 10)
+
+
+async def _throttle():
+    await asyncio.sleep(REPRICING_PAUSE_SECONDS)
+
+    while estimation_executor.metrics()["queue_depth"] > 0:
+        await asyncio.sleep(REPRICING_PAUSE_SECONDS)
+
+
+async def _reprice_batch(batch, rate_card, calendar):
+    now = datetime.utcnow()
+    semaphore = asyncio.Semaphore(REPRICING_PARALLEL_CHUNKS)
+
+    async def run(chunk):
+        async with semaphore:
+            return await _reprice_chunk(chunk, now, rate_card)
+
+    chunks = [
+        batch[i:i + REPRICING_CHUNK_SIZE]
+        for i in range(0, len(batch), REPRICING_CHUNK_SIZE)
+    ]
+    results = await asyncio.gather(*(run(chunk) for chunk in chunks))
+
+    pairs = [pair for chunk_result in results for pair in chunk_result]
+    projects = {project["_id"]: project for project in batch}
+
+    snapshots = with_project_dates(
+        [snapshot for _, snapshot in pairs],
+        [projects[project_id].get("start_date") for project_id, _ in pairs],
+        calendar,
+        rate_card.settings
+    )
+
+    # a project edited meanwhile already got a fresh snapshot from the update
+    operations = [
+        UpdateOne(
+            {"_id": project_id, "updated_at": projects[project_id].get("updated_at")},
+            {"$set": {"estimation_snapshot": snapshot}}
+        )
+        for (project_id, _), snapshot in zip(pairs, snapshots)
+    ]
+    result = await projects_collection.bulk_write(operations, ordered=False)
+
+    return result.modified_count
+
+
+async def run_repricing_job(job_id):
+    job = await _claim(job_id)
+    if not job:
+        return
+
+    company_id = job["company_id"]
+
+    try:
+        while True:
+            # this pass covers the requests made so far; their rate card
+            # changes may come from other processes, so skip the cache
+            requested = job.get("requests")
+            invalidate_rate_card(company_id)
+            rate_card = await get_rate_card(company_id)
+            calendar = await get_work_calendar(company_id)
+
+            if job["rate_card_fingerprint"] != rate_card.fingerprint:
+                # new (or first) rate card: start over on what is now stale
+                job = await repricing_jobs_collection.find_one_and_update(
+                    {"_id": job_id},
+                    {"$set": {
+                        "rate_card_fingerprint": rate_card.fingerprint,
+                        "last_project_id": None,
+                        "total": await projects_collection.count_documents(
+                            _stale_projects_filter(company_id, rate_card.fingerprint)
+                        ),
+                        "processed": 0,
+                        "repriced": 0,
+                        "skipped": 0,
+                        "started_at": job["started_at"] or datetime.utcnow()
+                    }},
+                    return_document=ReturnDocument.AFTER
+                )
+
+            cursor = (
+                projects_collection
+                .find(
+                    _stale_projects_filter(
+                        company_id, rate_card.fingerprint, job["last_project_id"]
+                    ),
+                    PROJECT_PROJECTION
+                )
+                .sort("_id", 1)
+                .batch_size(REPRICING_BATCH_SIZE)
+            )
+
+            requested_again = False
+
+            while True:
+                batch = await cursor.to_list(length=REPRICING_BATCH_SIZE)
+                if not batch:
+                    break
+
+                for project in batch:
+                    project["modules"] = project.get("modules") or []
+
+                repriced = await _reprice_batch(batch, rate_card, calendar)
+
+                job = await repricing_jobs_collection.find_one_and_update(
+                    {"_id": job_id, "lease_owner": _worker_id},
+                    {
+                        "$set": {
+                            "last_project_id": batch[-1]["_id"],
+                            "lease_expires_at": datetime.utcnow()
+                            + timedelta(seconds=REPRICING_LEASE_SECONDS),
+                            "updated_at": datetime.utcnow()
+                        },
+                        "$inc": {
+                            "processed": len(batch),
+                            "repriced": repriced,
+                            "skipped": len(batch) - repriced
+                        }
+                    },
+                    return_document=ReturnDocument.AFTER
+                )
+                if not job:
+                    # lease lost to another worker
+                    await cursor.close()
+                    return
+
+                await _throttle()
+
+                if job.get("requests") != requested:
+                    requested_again = True
+                    await cursor.close()
+                    break
+
+            if requested_again:
+                continue
+
+            # only complete if no request came in since this pass started
+            completed = await repricing_jobs_collection.update_one(
+                {"_id": job_id, "lease_owner": _worker_id, "requests": requested},
+                {
+                    "$set": {
+                        "status": "completed",
+                        "lease_owner": None,
+                        "lease_expires_at": None,
+                        "finished_at": datetime.utcnow(),
+                        "updated_at": datetime.utcnow()
+                    },
+                    "$unset": {"active": ""}
+                }
+            )
+            if completed.modified_count:
+                return
+
+            job = await repricing_jobs_collection.find_one(
+                {"_id": job_id, "lease_owner": _worker_id}
+            )
+            if not job:
+                # lease lost to another worker
+                return
+    except Exception as e:
+        await repricing_jobs_collection.update_one(
+            {"_id": job_id},
+            {
+                "$set": {
+                    "status": "failed",
+                    "error": str(e),
+                    "lease_owner": None,
+                    "lease_expires_at": None,
+                    "finished_at": datetime.utcnow(),
+                    "updated_at": datetime.utcnow()
+                },
+                "$unset": {"active": ""}
+            }
+        )
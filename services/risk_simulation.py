@@ -0,0 +1,90 @@
+import secrets
+
+import numpy as np
+
+from core.estimation_constants import (
+    SIMULATION_SPREADS,
+    SIMULATION_SETTINGS,
+    RESOURCE_EFFICIENCY
+)
+from core.rate_card import DEFAULT_RATE_CARD
+
+
+def simulate_estimation(wbs, project, trials=None, seed=None, rate_card=DEFAULT_RATE_CARD):
+    """
+    Monte Carlo simulation of the project's cost, price and timeline.
+
+    Task hours are sampled from a triangular distribution around
+    hours * COMPLEXITY_MULTIPLIERS[level], one row per trial. The simulated
+    spread replaces the flat risk buffer, so prices only apply margin and
+    negotiation buffer on top of the simulated cost.
+    """
+    if seed is None:
+        seed = secrets.randbits(32)
+
+    cols = wbs.columns()
+    n_tasks = len(cols["hours"])
+
+    requested = trials or SIMULATION_SETTINGS["default_trials"]
+    budget = SIMULATION_SETTINGS["max_cells"] // max(n_tasks, 1)
+    trials = max(1, min(requested, budget))
+
+    multipliers = rate_card.multiplier_matrix(cols["roles"], cols["levels"])
+    spreads = np.array(
+        [SIMULATION_SPREADS.get(level, SIMULATION_SPREADS["medium"]) for level in cols["levels"]],
+        dtype=np.float64
+    ).reshape(-1, 2)
+    rates = rate_card.rates_for(cols["roles"])
+
+    level_idx = cols["level_idx"]
+    mode = cols["hours"] * multipliers[cols["role_idx"], level_idx]
+    left = mode * spreads[level_idx, 0]
+    right = mode * spreads[level_idx, 1]
+    unit_cost = rates[cols["role_idx"]] * rate_card.productivity_factor
+
+    rng = np.random.default_rng(seed)
+
+    sim_hours = np.zeros(trials)
+    sim_cost = np.zeros(trials)
+
+    if n_tasks:
+        chunk = max(1, SIMULATION_SETTINGS["chunk_cells"] // n_tasks)
+
+        for start in range(0, trials, chunk):
+            stop = min(start + chunk, trials)
+            sample = rng.triangular(left, mode, right, size=(stop - start, n_tasks))
+
+            sim_hours[start:stop] = sample.sum(axis=1)
+            sim_cost[start:stop] = sample @ unit_cost
+
+    percentiles = SIMULATION_SETTINGS["percentiles"]
+    hours_pct = np.percentile(sim_hours, percentiles).tolist()
+    cost_pct = np.percentile(sim_cost, percentiles).tolist()
+
+    hours_per_week = (
+        rate_card.settings["working_hours_per_day"]
+        * rate_card.settings["working_days_per_week"]
+    )
+    available_hours_per_week = (
+        hours_per_week * project["estimated_team_size"] * RESOURCE_EFFICIENCY
+    )
+
+    price_factor = (
+        (1 + project["target_margin"] / 100)
+        * (1 + project["negotiation_buffer"] / 100)
+    )
+
+    return {
+        "trials": trials,
+        "requested_trials": requested,
+        "seed": seed,
+        "percentiles": {
+            f"p{pct}": {
+                "hours": round(hrs, 1),
+                "cost": round(cost),
+                "price": round(cost * price_factor),
+                "weeks": (hrs / available_hours_per_week).__ceil__()
+            }
+            for pct, hrs, cost in zip(percentiles, hours_pct, cost_pct)
+        }
+    }
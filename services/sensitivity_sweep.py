@@ -0,0 +1,136 @@
+import math
+
+import numpy as np
+
+from core.estimation_constants import RESOURCE_EFFICIENCY
+from core.rate_card import DEFAULT_RATE_CARD
+from services.columnar_engine import calculate_totals
+
+# risk x margin x negotiation x team cells a single sweep may evaluate
+SWEEP_MAX_CELLS = 200_000
+
+
+def axis_size(axis):
+    """
+    Number of values of a sweep axis, computed without expanding it.
+    """
+    if isinstance(axis, dict):
+        if axis["stop"] < axis["start"]:
+            raise ValueError("A sweep range needs stop >= start")
+        # the tolerance keeps a stop that is a whole number of steps inclusive
+        return math.floor((axis["stop"] - axis["start"]) / axis["step"] + 1e-9) + 1
+
+    return np.size(axis)
+
+
+def expand_axis(axis):
+    """
+    A sweep axis is a scalar, a list of values or an inclusive
+    {"start", "stop", "step"} range.
+    """
+    if isinstance(axis, dict):
+        values = axis["start"] + np.arange(axis_size(axis)) * axis["step"]
+        return np.round(values, 6)
+
+    return np.atleast_1d(np.asarray(axis, dtype=np.float64))
+
+
+def price_points(total_cost, risk, margin, negotiation):
+    """
+    Final price and profit margin percent of calculate_estimation for
+    broadcastable arrays of risk, margin and negotiation percentages.
+    """
+    risk_amount = total_cost * risk / 100
+    cost_with_risk = total_cost + risk_amount
+
+    margin_amount = cost_with_risk * margin / 100
+    price_before_negotiation = cost_with_risk + margin_amount
+
+    negotiation_amount = price_before_negotiation * negotiation / 100
+    final_price = price_before_negotiation + negotiation_amount
+
+    profit = final_price - total_cost
+    if total_cost:
+        profit_percent = profit / total_cost * 100
+    else:
+        profit_percent = np.zeros_like(profit)
+
+    return final_price, profit_percent
+
+
+def weeks_for_team(total_hours, team, settings):
+    """
+    weeks_required of calculate_estimation for an array of team sizes.
+    """
+    hours_per_week = (
+        settings["working_hours_per_day"]
+        * settings["working_days_per_week"]
+    )
+    return np.ceil(total_hours / (hours_per_week * team * RESOURCE_EFFICIENCY))
+
+
+def sweep_estimation(project, rate_card=DEFAULT_RATE_CARD):
+    """
+    Evaluates the pricing and timeline formulas of calculate_estimation over
+    the grid of target_margin, risk_buffer, negotiation_buffer and
+    estimated_team_size values in `project`.
+
+    Tasks are aggregated once; the grid is pure broadcasting. Price and
+    margin do not depend on team size and weeks depend on nothing else, so
+    each output is shaped by the axes it actually varies with.
+    """
+    axes = ("risk_buffer", "target_margin", "negotiation_buffer", "estimated_team_size")
+
+    # sized before anything is allocated
+    cells = math.prod(axis_size(project[axis]) for axis in axes)
+    if cells > SWEEP_MAX_CELLS:
+        raise ValueError(
+            f"Sweep grid has {cells} cells, the limit is {SWEEP_MAX_CELLS}"
+        )
+
+    risk, margin, negotiation, team = (expand_axis(project[axis]) for axis in axes)
+
+    if (team <= 0).any():
+        raise ValueError("estimated_team_size values must be positive")
+    if (team != np.round(team)).any():
+        raise ValueError("estimated_team_size values must be whole numbers")
+
+    total_hours, total_cost = calculate_totals([project], rate_card)
+    total_hours = total_hours[0]
+    total_cost = total_cost[0]
+
+    # Pricing, broadcast as risk x margin x negotiation
+    final_price, profit_percent = price_points(
+        total_cost,
+        risk[:, None, None],
+        margin[None, :, None],
+        negotiation[None, None, :]
+    )
+
+    # Timeline, per team size
+    weeks_required = weeks_for_team(total_hours, team, rate_card.settings)
+
+    return {
+        "totals": {
+            "hours": round(float(total_hours), 1),
+            "base_cost": round(float(total_cost))
+        },
+        "axes": {
+            "risk_buffer": risk.tolist(),
+            "target_margin": margin.tolist(),
+            "negotiation_buffer": negotiation.tolist(),
+            "estimated_team_size": team.astype(int).tolist()
+        },
+        "final_price": {
+            "dims": ["risk_buffer", "target_margin", "negotiation_buffer"],
+            "values": np.round(final_price).astype(int).tolist()
+        },
+        "profit_margin_percent": {
+            "dims": ["risk_buffer", "target_margin", "negotiation_buffer"],
+            "values": np.round(profit_percent, 1).tolist()
+        },
+        "weeks_required": {
+            "dims": ["estimated_team_size"],
+            "values": weeks_required.astype(int).tolist()
+        }
+    }
@@ -0,0 +1,66 @@
+import numpy as np
+
+from core.estimation_constants import SIMULATION_SPREADS
+from core.rate_card import DEFAULT_RATE_CARD
+from services.cost_timeline_engine import build_estimation_result
+from services.estimation_snapshot import build_hour_matrix
+
+
+def estimate_template(template, rate_card=DEFAULT_RATE_CARD, team_size=1):
+    """
+    Cost, price and weeks of a template at its default_margin and
+    default_risk_buffer, from the role x level hour matrix stored when the
+    template was written, plus a low/high range where every level's hours
+    move to the ends of its SIMULATION_SPREADS band. Work is
+    O(roles x levels).
+    """
+    hour_matrix = template.get("hour_matrix")
+    if hour_matrix is None:
+        # templates written before the matrix was stored
+        hour_matrix = build_hour_matrix(template.get("modules") or [])
+
+    roles = hour_matrix["roles"]
+    levels = hour_matrix["levels"]
+
+    hours = np.array(hour_matrix["hours"], dtype=np.float64).reshape(len(roles), len(levels))
+    adj_hours = hours * rate_card.multiplier_matrix(roles, levels)
+
+    spreads = np.array(
+        [SIMULATION_SPREADS.get(level, SIMULATION_SPREADS["medium"]) for level in levels],
+        dtype=np.float64
+    ).reshape(-1, 2)
+
+    rates = rate_card.rates_for(roles) * rate_card.productivity_factor
+
+    pricing = {
+        "target_margin": template.get("default_margin") or 0,
+        "risk_buffer": template.get("default_risk_buffer") or 0,
+        "negotiation_buffer": 0,
+        "estimated_team_size": team_size
+    }
+
+    def estimate(level_factors):
+        adj_role_hours = (adj_hours * level_factors).sum(axis=1)
+        result = build_estimation_result(
+            pricing,
+            float(adj_role_hours.sum()),
+            float(adj_role_hours @ rates),
+            [],
+            {},
+            rate_card.settings
+        )
+        return {
+            "hours": result["totals"]["hours"],
+            "base_cost": result["totals"]["base_cost"],
+            "final_price": result["pricing"]["final_price"],
+            "weeks_required": result["timeline"]["weeks_required"]
+        }
+
+    return {
+        **estimate(1),
+        "estimated_team_size": team_size,
+        "range": {
+            "low": estimate(spreads[:, 0]),
+            "high": estimate(spreads[:, 1])
+        }
+    }
@@ -0,0 +1,49 @@
+import copy
+
+
+def _find(items, name, kind):
+    for i, item in enumerate(items):
+        if item["name"] == name:
+            return i
+    raise ValueError(f"{kind} '{name}' not found in template")
+
+
+def apply_template_overrides(modules, overrides):
+    """
+    Returns a copy of a template's modules with `overrides` applied in
+    order. Unknown module, feature or task names raise ValueError.
+    """
+    modules = copy.deepcopy(modules)
+
+    for override in overrides:
+        action = override["action"]
+        m = _find(modules, override["module"], "Module")
+
+        if action == "remove_module":
+            del modules[m]
+            continue
+
+        if not override.get("feature"):
+            raise ValueError(f"{action} needs a feature")
+
+        features = modules[m]["features"]
+        f = _find(features, override["feature"], "Feature")
+
+        if action == "remove_feature":
+            del features[f]
+            continue
+
+        if not override.get("task"):
+            raise ValueError(f"{action} needs a task")
+
+        tasks = features[f]["tasks"]
+        t = _find(tasks, override["task"], "Task")
+
+        if action == "remove_task":
+            del tasks[t]
+        else:
+            if override.get("hours") is None:
+                raise ValueError("set_hours needs hours")
+            tasks[t]["hours"] = override["hours"]
+
+    return modules
@@ -0,0 +1,152 @@
+import heapq
+
+from core.estimation_constants import SCHEDULE_ROLE_PHASES, RESOURCE_EFFICIENCY
+from core.rate_card import DEFAULT_RATE_CARD
+
+BUILD_PHASE = 1
+
+
+def schedule_project(wbs, team_composition, rate_card=DEFAULT_RATE_CARD):
+    """
+    Resource-constrained list scheduling of the WBS.
+
+    Features are taken in WBS order. Inside a feature, tasks run phase by
+    phase (analysis/design -> build -> QA, see SCHEDULE_ROLE_PHASES), longest
+    first, each on the earliest free member of its role; every role keeps a
+    min-heap of member availability. Times are effective work hours, so the
+    makespan converts to weeks with the usual hours/week x efficiency.
+
+    Work is O(tasks x log(team size)) plus a per-feature sort.
+    """
+    members = {}
+    for role, count in team_composition.items():
+        if count > 0:
+            members[role] = [0.0] * count
+
+    for role in wbs.roles:
+        if role not in members:
+            raise ValueError(f"No team members for role '{role}'")
+
+    multipliers = rate_card.multiplier_matrix(wbs.roles, wbs.levels).tolist()
+    role_phases = [SCHEDULE_ROLE_PHASES.get(role, BUILD_PHASE) for role in wbs.roles]
+
+    busy_hours = dict.fromkeys(members, 0.0)
+    features = []
+    makespan = 0.0
+
+    for module in wbs.modules:
+        for feature in module.features:
+            phases = {}
+            for i in range(feature.start, feature.stop):
+                r = wbs.role_codes[i]
+                adj_hours = wbs.hours[i] * multipliers[r][wbs.level_codes[i]]
+                phases.setdefault(role_phases[r], []).append((adj_hours, wbs.roles[r]))
+
+            # features only wait on people, phases wait on the previous phase
+            ready = 0.0
+            start = None
+
+            for phase in sorted(phases):
+                phase_end = ready
+
+                for adj_hours, role in sorted(phases[phase], reverse=True):
+                    heap = members[role]
+                    free_at = heapq.heappop(heap)
+
+                    task_start = max(free_at, ready)
+                    task_end = task_start + adj_hours
+                    heapq.heappush(heap, task_end)
+
+                    busy_hours[role] += adj_hours
+                    start = task_start if start is None else min(start, task_start)
+                    phase_end = max(phase_end, task_end)
+
+                ready = phase_end
+
+            makespan = max(makespan, ready)
+
+            features.append({
+                "module": module.name,
+                "feature": feature.name,
+                "start_hour": ready if start is None else start,
+                "end_hour": ready
+            })
+
+    return {
+        "makespan_hours": makespan,
+        "busy_hours": busy_hours,
+        "team_composition": {role: len(heap) for role, heap in members.items()},
+        "features": features
+    }
+
+
+def scheduled_timeline(wbs, team_composition, rate_card=DEFAULT_RATE_CARD):
+    """
+    Timeline block of calculate_estimation computed from the schedule
+    instead of total_hours / (team_size x hours/week x efficiency).
+    """
+    settings = rate_card.settings
+    schedule = schedule_project(wbs, team_composition, rate_card)
+
+    hours_per_week = (
+        settings["working_hours_per_day"]
+        * settings["working_days_per_week"]
+        * RESOURCE_EFFICIENCY
+    )
+    sprint_hours = hours_per_week * settings["sprint_duration_weeks"]
+
+    makespan = schedule["makespan_hours"]
+    weeks_required = (makespan / hours_per_week).__ceil__()
+    working_days_required = (
+        makespan / (hours_per_week / settings["working_days_per_week"])
+    ).__ceil__()
+    sprints_required = (
+        weeks_required / settings["sprint_duration_weeks"]
+    ).__ceil__()
+
+    team = schedule["team_composition"]
+
+    utilization = [
+        {
+            "role": role,
+            "members": count,
+            "hours": round(schedule["busy_hours"][role], 1),
+            "utilization_percent": round(
+                schedule["busy_hours"][role] / (count * makespan) * 100, 1
+            ) if makespan else 0
+        }
+        for role, count in team.items()
+    ]
+
+    sprint_assignments = [
+        {
+            "module": f["module"],
+            "feature": f["feature"],
+            "start_sprint": int(f["start_hour"] // sprint_hours) + 1,
+            "end_sprint": max(
+                (f["end_hour"] / sprint_hours).__ceil__(),
+                int(f["start_hour"] // sprint_hours) + 1
+            )
+        }
+        for f in schedule["features"]
+    ]
+
+    return {
+        "weeks_required": weeks_required,
+        "working_days_required": working_days_required,
+        "months_estimate": (weeks_required / 4).__ceil__(),
+        "sprints_required": sprints_required,
+        "estimated_team_size": sum(team.values()),
+        "assumptions": {
+            "working_hours_per_day": settings["working_hours_per_day"],
+            "working_days_per_week": settings["working_days_per_week"],
+            "sprint_duration_weeks": settings["sprint_duration_weeks"],
+            "resource_efficiency_percent": round(RESOURCE_EFFICIENCY * 100),
+            "team_composition": team
+        },
+        "schedule": {
+            "makespan_weeks": round(makespan / hours_per_week, 1),
+            "utilization": utilization,
+            "sprint_assignments": sprint_assignments
+        }
+    }
@@ -0,0 +1,91 @@
+from bson import ObjectId
+
+from core.estimation_constants import DEFAULT_SETTINGS
+from core.work_calendar import WorkCalendar
+from database.mongo import companies_collection
+from utils.ttl_cache import TTLCache
+
+WORK_CALENDAR_CACHE_SIZE = 256
+
+# also bounds how long "today" and the horizon of a calendar can lag
+WORK_CALENDAR_TTL_SECONDS = 3600
+
+CALENDAR_FIELDS = (
+    "timezone",
+    "holidays",
+    "estimation_settings"
+)
+
+_work_calendars = TTLCache(WORK_CALENDAR_CACHE_SIZE, WORK_CALENDAR_TTL_SECONDS)
+
+
+def compile_work_calendar(company):
+    company = company or {}
+    settings = company.get("estimation_settings") or {}
+
+    return WorkCalendar(
+        company.get("timezone"),
+        settings.get("working_days_per_week") or DEFAULT_SETTINGS["working_days_per_week"],
+        company.get("holidays") or ()
+    )
+
+
+async def get_work_calendar(company_id):
+    """
+    Returns the working calendar of a company from the in-process LRU,
+    with its business-day index already built.
+    """
+    key = str(company_id or "")
+
+    calendar = _work_calendars.get(key)
+    if calendar is not None:
+        return calendar
+
+    company = None
+    if company_id:
+        company = await companies_collection.find_one(
+            {"_id": ObjectId(key)},
+            {field: 1 for field in CALENDAR_FIELDS}
+        )
+    calendar = compile_work_calendar(company)
+
+    _work_calendars.set(key, calendar)
+
+    return calendar
+
+
+def invalidate_work_calendar(company_id):
+    _work_calendars.pop(str(company_id))
+
+
+def with_delivery_dates(results, start_dates, calendar, settings):
+    """
+    Copies of estimation results with timeline["dates"] filled in from the
+    calendar, all of them resolved in one batch.
+    """
+    dates = calendar.delivery_dates(
+        [result["timeline"] for result in results], start_dates, settings
+    )
+
+    return [
+        {**result, "timeline": {**result["timeline"], "dates": result_dates}}
+        for result, result_dates in zip(results, dates)
+    ]
+
+
+def with_project_dates(snapshots, start_dates, calendar, settings):
+    """
+    with_delivery_dates for stored project snapshots. A project whose start
+    date has since left the calendar horizon keeps its snapshot without
+    dates instead of failing the update.
+    """
+    try:
+        return with_delivery_dates(snapshots, start_dates, calendar, settings)
+    except ValueError:
+        if len(snapshots) == 1:
+            return snapshots
+
+    return [
+        with_project_dates([snapshot], [start_date], calendar, settings)[0]
+        for snapshot, start_date in zip(snapshots, start_dates)
+    ]
@@ -0,0 +1,110 @@
+import os
+
+# settings the app reads at import time; nothing connects or sends mail
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017/estimly_test")
+os.environ.setdefault("AUTH_SECRET_KEY", "test-auth-secret")
+os.environ.setdefault("PW_RESET_SECRET_KEY", "test-reset-secret")
+os.environ.setdefault("MAIL_USERNAME", "test")
+os.environ.setdefault("MAIL_PASSWORD", "test")
+os.environ.setdefault("MAIL_FROM", "no-reply@example.com")
+os.environ.setdefault("MAIL_PORT", "25")
+os.environ.setdefault("MAIL_SERVER", "localhost")
+os.environ.setdefault("MAIL_STARTTLS", "False")
+os.environ.setdefault("MAIL_SSL_TLS", "False")
+os.environ.setdefault("USE_CREDENTIALS", "False")
+
+import asyncio
+
+import mongomock.collection
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+
+# pymongo passes `sort` to bulk update builders, which mongomock predates
+_add_update = mongomock.collection.BulkOperationBuilder.add_update
+
+
+def _add_update_with_sort(self, *args, sort=None, **kwargs):
+    return _add_update(self, *args, **kwargs)
+
+
+mongomock.collection.BulkOperationBuilder.add_update = _add_update_with_sort
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def db():
+    return AsyncMongoMockClient()["estimly_test"]
+
+
+@pytest.fixture
+def mongo(db, monkeypatch):
+    """
+    Points every *_collection imported from database.mongo at the mock `db`,
+    and empties the in-process caches that hold company data.
+    """
+    import sys
+
+    import database.mongo
+    from services.estimation_memo import estimation_memo
+    from services.rate_cards import _rate_cards
+    from services.work_calendars import _work_calendars
+
+    collections = {
+        name: value for name, value in vars(database.mongo).items()
+        if name.endswith("_collection")
+    }
+
+    for module in list(sys.modules.values()):
+        for name, collection in collections.items():
+            if getattr(module, name, None) is collection:
+                monkeypatch.setattr(module, name, db[collection.name])
+
+    _rate_cards.clear()
+    _work_calendars.clear()
+    estimation_memo.clear()
+
+    return db
+
+
+@pytest.fixture
+def company_id(mongo):
+    company_id = ObjectId()
+    asyncio.run(mongo.companies.insert_one({"_id": company_id, "name": "Acme"}))
+    return company_id
+
+
+@pytest.fixture
+def make_client(mongo):
+    """
+    TestClient factory: an app serving `routers` where get_current_user and
+    get_read_user resolve to a user of `company_id` with `role`.
+    """
+    from dependencies import get_current_user, get_read_user
+
+    def make_client(*routers, company_id=None, role="ADMIN"):
+        user_id = str(ObjectId())
+        user = {
+            "_id": user_id,
+            "id": user_id,
+            "company_id": str(company_id) if company_id else None,
+            "role": role
+        }
+
+        app = FastAPI()
+        for router in routers:
+            app.include_router(router)
+        app.dependency_overrides[get_current_user] = lambda: user
+        app.dependency_overrides[get_read_user] = lambda: user
+
+        client = TestClient(app)
+        client.user = user
+        return client
+
+    return make_client
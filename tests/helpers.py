@@ -0,0 +1,13 @@
+from services.estimation_snapshot import diff_estimations
+
+
+def assert_same_estimation(expected, actual):
+    """
+    Engines sum the same hours in a different order, so a figure that lands
+    exactly on a rounding boundary may round either way: numbers may differ
+    by one unit of their rounding, nothing else may differ.
+    """
+    for difference in diff_estimations(expected, actual):
+        a, b = difference["full_recompute"], difference["repriced"]
+        assert isinstance(a, (int, float)) and isinstance(b, (int, float)), difference
+        assert abs(a - b) <= 1, difference
@@ -0,0 +1,50 @@
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+import services.admission_control
+from services.admission_control import AdmissionPolicy, _parse_limit, client_ip
+
+
+def request_from(peer, forwarded=None):
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request({"type": "http", "headers": headers, "client": (peer, 50000)})
+
+
+def test_forwarded_for_is_read_from_the_trusted_proxy_end(monkeypatch):
+    monkeypatch.setattr(services.admission_control, "ADMISSION_TRUST_FORWARDED_FOR", True)
+
+    # the client wrote the left-most entries itself
+    spoofed = request_from("10.0.0.2", "1.2.3.4, 198.51.100.7")
+    assert client_ip(spoofed) == "198.51.100.7"
+
+    monkeypatch.setattr(services.admission_control, "ADMISSION_TRUSTED_PROXY_HOPS", 2)
+    assert client_ip(request_from("10.0.0.2", "1.2.3.4, 198.51.100.7, 10.0.0.1")) == "198.51.100.7"
+    assert client_ip(request_from("10.0.0.2", "198.51.100.7")) == "198.51.100.7"
+
+
+def test_forwarded_for_is_ignored_unless_trusted():
+    assert client_ip(request_from("203.0.113.9", "1.2.3.4")) == "203.0.113.9"
+
+
+def test_random_forwarded_addresses_share_one_bucket(monkeypatch):
+    monkeypatch.setattr(services.admission_control, "ADMISSION_TRUST_FORWARDED_FOR", True)
+    policy = AdmissionPolicy("test", (2, 60), None)
+
+    policy.check(request_from("10.0.0.2", "1.1.1.1, 198.51.100.7"))
+    policy.check(request_from("10.0.0.2", "2.2.2.2, 198.51.100.7"))
+
+    with pytest.raises(HTTPException) as rejected:
+        policy.check(request_from("10.0.0.2", "3.3.3.3, 198.51.100.7"))
+    assert rejected.value.status_code == 429
+
+
+@pytest.mark.parametrize("value", ["0/60", "-1/60", "5/0", "5/-10"])
+def test_limits_that_admit_nothing_or_never_refill_are_rejected(value):
+    with pytest.raises(ValueError):
+        _parse_limit(value)
+
+
+def test_limits_parse_or_turn_off():
+    assert _parse_limit("5/60") == (5, 60.0)
+    assert _parse_limit("off") is None
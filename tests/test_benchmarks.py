@@ -0,0 +1,20 @@
+from benchmarks.run import build_cases
+from benchmarks.wbs_generator import generate_project
+from routes import projects
+from services import rate_cards, work_calendars
+
+
+def test_create_project_case_runs_without_a_database(monkeypatch):
+    # build_cases swaps the collections for in-memory stubs; restore them after
+    for module, name in (
+        (projects, "projects_collection"),
+        (rate_cards, "companies_collection"),
+        (work_calendars, "companies_collection")
+    ):
+        monkeypatch.setattr(module, name, getattr(module, name))
+
+    cases = build_cases(generate_project(10, seed=0))
+    cases["create_project"]()
+
+    [project] = projects.projects_collection.docs.values()
+    assert project["estimation_snapshot"]["totals"]["hours"] > 0
@@ -0,0 +1,164 @@
+import asyncio
+
+import pytest
+
+import routes.company
+import routes.projects
+import services.calibration
+from services.rate_cards import get_rate_card, invalidate_rate_card
+from tests.test_projects_routes import create_project
+
+
+@pytest.fixture
+def repricing_starts(monkeypatch):
+    started = []
+
+    async def record(company_id):
+        started.append(str(company_id))
+
+    monkeypatch.setattr(routes.projects, "start_repricing_job", record)
+    monkeypatch.setattr(routes.company, "start_repricing_job", record)
+    return started
+
+
+@pytest.fixture
+def client(make_client, company_id, repricing_starts):
+    return make_client(routes.projects.router, routes.company.router, company_id=company_id)
+
+
+def doubled_actuals(project, role, level):
+    """
+    Actuals at twice the estimate for every task of one role and level.
+    """
+    return [
+        {
+            "module": module["name"],
+            "feature": feature["name"],
+            "task": task["name"],
+            "actual_hours": task["hours"] * 2
+        }
+        for module in project["modules"]
+        for feature in module["features"]
+        for task in feature["tasks"]
+        if task["role"] == role and task["level"] == level
+    ]
+
+
+def most_common_cell(project):
+    counts = {}
+    for module in project["modules"]:
+        for feature in module["features"]:
+            for task in feature["tasks"]:
+                key = (task["role"], task["level"])
+                counts[key] = counts.get(key, 0) + 1
+    return max(counts, key=counts.get)
+
+
+def test_actuals_do_not_complete_the_project_by_default(client, mongo, company_id, repricing_starts):
+    project_id, project = create_project(client, tasks=120)
+    actuals = doubled_actuals(project, *most_common_cell(project))
+
+    response = client.post(f"/api/projects/{project_id}/actuals", json={"tasks": actuals})
+    assert response.status_code == 200, response.text
+
+    stored = client.get(f"/api/projects/{project_id}").json()
+    company = asyncio.run(mongo.companies.find_one({"_id": company_id}))
+
+    assert stored["status"] == "draft"
+    assert len(stored["actual_hours"]) == len(actuals)
+    assert "calibration" not in company
+    assert repricing_starts == []
+
+
+def test_completion_calibrates_once_and_starts_repricing(client, company_id, repricing_starts):
+    project_id, project = create_project(client, tasks=120)
+    role, level = most_common_cell(project)
+    actuals = doubled_actuals(project, role, level)
+    assert len(actuals) >= services.calibration.CALIBRATION_MIN_SAMPLES
+
+    body = {"tasks": actuals, "complete": True}
+    response = client.post(f"/api/projects/{project_id}/actuals", json=body)
+    assert response.status_code == 200, response.text
+
+    again = client.post(f"/api/projects/{project_id}/actuals", json=body)
+    assert again.status_code == 409
+
+    calibration = client.get("/api/company/calibration").json()
+    [factor] = calibration["factors"]
+    assert factor["samples"] == len(actuals)
+    assert factor["factor"] == 2
+    assert calibration["pending"] is False
+
+    invalidate_rate_card(company_id)
+    assert asyncio.run(get_rate_card(company_id)).multiplier(role, level) == 2
+    assert repricing_starts == [str(company_id)]
+
+
+def test_lost_calibration_race_is_reported_and_refit_later(client, company_id, repricing_starts, monkeypatch):
+    save = services.calibration._save_calibration
+
+    async def lose_race(company_id, stats, revision, full_refit=False):
+        if not full_refit:
+            return False
+        return await save(company_id, stats, revision, full_refit)
+
+    monkeypatch.setattr(services.calibration, "_save_calibration", lose_race)
+
+    project_id, project = create_project(client, tasks=120)
+    actuals = doubled_actuals(project, *most_common_cell(project))
+
+    response = client.post(
+        f"/api/projects/{project_id}/actuals", json={"tasks": actuals, "complete": True}
+    )
+    assert response.status_code == 503
+    assert client.get("/api/company/calibration").json()["pending"] is True
+    assert repricing_starts == []
+
+    refit = client.post("/api/company/calibration")
+    assert refit.status_code == 200, refit.text
+    assert refit.json()["pending"] is False
+    assert refit.json()["factors"][0]["samples"] == len(actuals)
+    assert repricing_starts == [str(company_id)]
+
+
+def test_completed_projects_cannot_be_reopened_and_counted_again(client):
+    project_id, project = create_project(client, tasks=120)
+    actuals = doubled_actuals(project, *most_common_cell(project))
+    body = {"tasks": actuals, "complete": True}
+
+    assert client.post(f"/api/projects/{project_id}/actuals", json=body).status_code == 200
+
+    reopened = client.patch(f"/api/projects/{project_id}", json={"status": "draft"})
+    assert reopened.status_code == 409
+    assert client.post(f"/api/projects/{project_id}/actuals", json=body).status_code == 409
+
+    [factor] = client.get("/api/company/calibration").json()["factors"]
+    assert factor["samples"] == len(actuals)
+
+
+def test_projects_are_not_completed_by_a_status_patch(client):
+    project_id, _ = create_project(client, tasks=120)
+
+    response = client.patch(f"/api/projects/{project_id}", json={"status": "Completed"})
+
+    assert response.status_code == 400
+    assert client.get(f"/api/projects/{project_id}").json()["status"] == "draft"
+
+
+def test_only_admins_and_managers_complete_projects(client, make_client, company_id):
+    project_id, project = create_project(client, tasks=120)
+    user = make_client(routes.projects.router, company_id=company_id, role="USER")
+    actuals = doubled_actuals(project, *most_common_cell(project))
+
+    completing = user.post(f"/api/projects/{project_id}/actuals", json={"tasks": actuals, "complete": True})
+    recording = user.post(f"/api/projects/{project_id}/actuals", json={"tasks": actuals})
+
+    assert completing.status_code == 403
+    assert recording.status_code == 200
+
+
+def test_only_admins_and_managers_refit(make_client, company_id, repricing_starts):
+    user = make_client(routes.company.router, company_id=company_id, role="USER")
+
+    assert user.post("/api/company/calibration").status_code == 403
+    assert repricing_starts == []
@@ -0,0 +1,42 @@
+import pytest
+from pydantic import ValidationError
+
+from benchmarks.wbs_generator import generate_project
+from schemas.wbs import MAX_TASK_HOURS, modules_adapter
+from services.columnar_engine import calculate_estimation_compact
+from services.compact_wbs import CompactWBS
+from services.cost_timeline_engine import calculate_estimation
+from tests.helpers import assert_same_estimation
+
+
+def test_round_trip_keeps_the_wbs():
+    modules = generate_project(500, seed=5)["modules"]
+
+    wbs = CompactWBS.from_modules(modules)
+
+    assert wbs.task_count == 500
+    assert wbs.to_dicts() == modules
+
+
+def test_compact_estimation_equals_calculate_estimation():
+    project = generate_project(800, seed=6, level_mix="complex")
+
+    assert_same_estimation(
+        calculate_estimation(project),
+        calculate_estimation_compact(CompactWBS.from_modules(project["modules"]), project)
+    )
+
+
+def test_largest_allowed_hours_fit_the_hours_array():
+    task = {"name": "Migration", "hours": MAX_TASK_HOURS, "role": "senior_dev", "level": "low"}
+    modules = modules_adapter.validate_python(
+        [{"name": "Core", "features": [{"name": "Data", "tasks": [task]}]}]
+    )
+
+    assert CompactWBS.from_modules(modules).columns()["hours"].tolist() == [MAX_TASK_HOURS]
+
+    task["hours"] = 2 ** 32
+    with pytest.raises(ValidationError):
+        modules_adapter.validate_python(
+            [{"name": "Core", "features": [{"name": "Data", "tasks": [task]}]}]
+        )
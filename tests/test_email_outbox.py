@@ -0,0 +1,194 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import services.email_outbox
+from services.email_outbox import (
+    EMAIL_OUTBOX_RETRY_BASE_SECONDS,
+    EMAIL_OUTBOX_RETRY_MAX_SECONDS,
+    EmailOutbox,
+    retry_delay
+)
+
+
+class FakeSMTP:
+    """
+    Local SMTP stand-in: records what it sends, or fails every send.
+    """
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.sent = []
+        self.is_connected = False
+        self.closed = 0
+
+    async def send(self, recipient, subject, html):
+        if self.fail:
+            raise ConnectionError("connection refused")
+        self.is_connected = True
+        self.sent.append((recipient, subject, html))
+
+    async def close(self):
+        self.is_connected = False
+        self.closed += 1
+
+
+@pytest.fixture
+def outbox(db):
+    smtp = FakeSMTP()
+    outbox = EmailOutbox(db.email_outbox, workers=1, connect=lambda: smtp)
+    outbox.smtp = smtp
+    return outbox
+
+
+@pytest.mark.anyio
+async def test_repeated_emails_with_a_coalesce_key_are_merged(outbox):
+    first = await outbox.enqueue("a@example.com", "Reset", "<p>1</p>", coalesce_key="reset:a")
+    second = await outbox.enqueue("a@example.com", "Reset", "<p>2</p>", coalesce_key="reset:a")
+    other = await outbox.enqueue("b@example.com", "Reset", "<p>1</p>", coalesce_key="reset:b")
+
+    assert first == second != other
+    assert outbox.coalesced == 1
+
+    message = await outbox._claim()
+    assert message["html"] == "<p>2</p>"
+    await outbox._deliver(outbox.smtp, message)
+
+    # already sent within the window: not sent again
+    assert await outbox.enqueue("a@example.com", "Reset", "<p>3</p>", coalesce_key="reset:a") == first
+    assert await outbox.collection.count_documents({"coalesce_key": "reset:a"}) == 1
+
+
+@pytest.mark.anyio
+async def test_failed_sends_back_off_until_marked_failed(db, monkeypatch):
+    monkeypatch.setattr(services.email_outbox, "EMAIL_OUTBOX_MAX_ATTEMPTS", 3)
+    smtp = FakeSMTP(fail=True)
+    outbox = EmailOutbox(db.email_outbox, workers=1, connect=lambda: smtp)
+
+    message_id = await outbox.enqueue("a@example.com", "Hello", "<p>hi</p>")
+
+    for attempt in range(1, 4):
+        message = await outbox._claim()
+        assert message["_id"] == message_id
+
+        before = datetime.utcnow()
+        await outbox._deliver(smtp, message)
+        stored = await outbox.collection.find_one({"_id": message_id})
+
+        assert stored["attempts"] == attempt
+        assert stored["last_error"] == "connection refused"
+        assert stored["next_attempt_at"] >= before + timedelta(
+            seconds=EMAIL_OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempt - 1) - 1
+        )
+
+        if attempt < 3:
+            assert stored["status"] == "pending"
+            # not due yet
+            assert await outbox._claim() is None
+            await outbox.collection.update_one(
+                {"_id": message_id}, {"$set": {"next_attempt_at": datetime.utcnow()}}
+            )
+
+    assert stored["status"] == "failed"
+    assert (outbox.retried, outbox.failed, smtp.closed) == (2, 1, 3)
+    assert await outbox._claim() is None
+
+
+def test_retry_delay_doubles_with_jitter_up_to_the_cap():
+    for attempts in (1, 2, 3):
+        delay = retry_delay(attempts)
+        base = EMAIL_OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+        assert base <= delay <= base * 1.2
+
+    assert EMAIL_OUTBOX_RETRY_MAX_SECONDS <= retry_delay(50) <= EMAIL_OUTBOX_RETRY_MAX_SECONDS * 1.2
+
+
+@pytest.mark.anyio
+async def test_message_of_a_dead_worker_is_sent_once_its_lease_expires(outbox):
+    message_id = await outbox.enqueue("a@example.com", "Hello", "<p>hi</p>")
+    await outbox.collection.update_one(
+        {"_id": message_id},
+        {"$set": {
+            "status": "sending",
+            "lease_owner": "dead-worker",
+            "lease_expires_at": datetime.utcnow() + timedelta(seconds=30)
+        }}
+    )
+
+    assert await outbox._claim() is None
+
+    await outbox.collection.update_one(
+        {"_id": message_id},
+        {"$set": {"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)}}
+    )
+
+    message = await outbox._claim()
+    assert message["_id"] == message_id
+    assert message["lease_owner"] != "dead-worker"
+
+    await outbox._deliver(outbox.smtp, message)
+
+    stored = await outbox.collection.find_one({"_id": message_id})
+    assert stored["status"] == "sent"
+    assert outbox.smtp.sent == [("a@example.com", "Hello", "<p>hi</p>")]
+
+
+@pytest.mark.anyio
+async def test_workers_drain_the_outbox_over_one_connection(outbox):
+    await outbox.start()
+    try:
+        for i in range(3):
+            await outbox.enqueue(f"user{i}@example.com", "Hello", "<p>hi</p>")
+
+        for _ in range(100):
+            if outbox.sent == 3:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await outbox.stop()
+
+    assert [recipient for recipient, _, _ in outbox.smtp.sent] == [
+        f"user{i}@example.com" for i in range(3)
+    ]
+    assert await outbox.collection.count_documents({"status": "sent"}) == 3
+
+    indexes = await outbox.collection.index_information()
+    assert any(
+        [key for key, _ in index["key"]] == ["status", "lease_expires_at"]
+        for index in indexes.values()
+    )
+
+
+@pytest.mark.anyio
+async def test_workers_survive_outbox_errors_while_delivering(outbox, monkeypatch):
+    monkeypatch.setattr(services.email_outbox, "EMAIL_OUTBOX_POLL_SECONDS", 0.01)
+    deliver = outbox._deliver
+    calls = []
+
+    async def unreachable_once(smtp, message):
+        calls.append(message["recipient"])
+        if len(calls) == 1:
+            raise ConnectionError("outbox unreachable")
+        await deliver(smtp, message)
+
+    monkeypatch.setattr(outbox, "_deliver", unreachable_once)
+
+    await outbox.start()
+    try:
+        await outbox.enqueue("a@example.com", "Hello", "<p>hi</p>")
+        await outbox.enqueue("b@example.com", "Hello", "<p>hi</p>")
+
+        for _ in range(100):
+            if outbox.sent == 1:
+                break
+            await asyncio.sleep(0.01)
+
+        assert not outbox._tasks[0].done()
+    finally:
+        await outbox.stop()
+
+    assert outbox.metrics()["errors"] == 1
+    assert outbox.smtp.sent == [("b@example.com", "Hello", "<p>hi</p>")]
+    # left to its lease
+    assert await outbox.collection.count_documents({"status": "sending"}) == 1
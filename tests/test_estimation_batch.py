@@ -0,0 +1,62 @@
+import pytest
+
+from benchmarks.wbs_generator import generate_project
+from routes.estimation_calculate import router
+from services.columnar_engine import calculate_estimation_batch
+from services.cost_timeline_engine import calculate_estimation
+from tests.test_projects_routes import set_rates
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client(router)
+
+
+def batch_projects():
+    return [
+        generate_project(300, seed=1),
+        generate_project(120, seed=2, role_mix="qa_heavy", level_mix="complex", fan_out="deep"),
+        {**generate_project(40, seed=3, role_mix="dev_heavy"), "estimated_team_size": 7}
+    ]
+
+
+def test_batch_matches_calculate_estimation_exactly():
+    projects = batch_projects()
+
+    assert calculate_estimation_batch(projects) == [
+        calculate_estimation(project) for project in projects
+    ]
+
+
+def test_batch_endpoint_prices_with_the_company_rate_card(make_client, mongo, company_id):
+    client = make_client(router, company_id=company_id)
+    projects = batch_projects()
+    rate_card = set_rates(mongo, company_id, {"senior_dev": 90, "qa": 40})
+
+    response = client.post("/api/estimation/calculate-batch", json={
+        "projects": [{**project, "start_date": "2030-03-04"} for project in projects]
+    })
+    assert response.status_code == 200, response.text
+
+    for project, result in zip(projects, response.json()):
+        dates = result["timeline"].pop("dates")
+        assert dates["start_date"] == "2030-03-04"
+        assert result == calculate_estimation(project, rate_card)
+
+
+def test_batch_rejects_scheduler_and_simulation_options(client):
+    project = generate_project(20, seed=1)
+    team = {
+        task["role"]: 1
+        for module in project["modules"]
+        for feature in module["features"]
+        for task in feature["tasks"]
+    }
+
+    for options in ({"team_composition": team}, {"simulation": {"trials": 100}}):
+        response = client.post("/api/estimation/calculate-batch", json={
+            "projects": [project, {**project, **options}]
+        })
+
+        assert response.status_code == 422
+        assert "projects[1]" in response.text
@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from services.estimation_executor import EstimationExecutor
+
+
+class DisconnectedRequest:
+    async def is_disconnected(self):
+        return True
+
+
+@pytest.fixture
+def executor():
+    executor = EstimationExecutor(inline_max_tasks=10, workers=1, max_queued=0)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.mark.anyio
+async def test_small_payloads_run_inline(executor):
+    assert await executor.run(sum, [1, 2, 3], task_count=3) == 6
+    assert executor.metrics()["inline_execution"]["count"] == 1
+
+
+@pytest.mark.anyio
+async def test_large_payloads_run_on_the_pool(executor):
+    assert await executor.run(sum, [1, 2, 3], task_count=11) == 6
+    assert executor.metrics()["in_flight"] == 0
+
+
+@pytest.mark.anyio
+async def test_disconnected_client_gets_no_result(executor):
+    result = await executor.run(
+        time.sleep, 1, task_count=11, request=DisconnectedRequest()
+    )
+
+    assert result is None
+    assert executor.cancelled == 1
+
+    # the job still occupies the only worker
+    assert executor.metrics()["in_flight"] == 1
+    with pytest.raises(HTTPException) as busy:
+        await executor.run(sum, [1], task_count=11)
+    assert busy.value.status_code == 503
+
+    for _ in range(100):
+        if executor.metrics()["in_flight"] == 0:
+            break
+        await asyncio.sleep(0.05)
+
+    assert executor.metrics()["in_flight"] == 0
+    assert await executor.run(sum, [1], task_count=11) == 1
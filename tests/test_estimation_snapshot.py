@@ -0,0 +1,114 @@
+import copy
+from datetime import datetime
+
+import pytest
+
+from benchmarks.wbs_generator import generate_project
+from core.rate_card import DEFAULT_RATE_CARD
+from services.cost_timeline_engine import calculate_estimation
+from services.estimation_snapshot import (
+    build_estimation_snapshot,
+    build_hour_matrix,
+    module_cache_is_current,
+    reprice_from_matrix
+)
+from tests.helpers import assert_same_estimation
+
+CUSTOM_RATE_CARD = DEFAULT_RATE_CARD.with_overrides(
+    resource_rates={"senior_dev": 41.5, "qa_junior": 9},
+    complexity_multipliers={"high": 1.75},
+    settings={"productivity_factor": 0.9, "working_hours_per_day": 7}
+)
+
+NOW = datetime(2026, 1, 5)
+
+
+@pytest.mark.parametrize("rate_card", [DEFAULT_RATE_CARD, CUSTOM_RATE_CARD])
+@pytest.mark.parametrize("tasks,profile", [
+    (1, {}),
+    (250, {"role_mix": "dev_heavy", "level_mix": "simple", "fan_out": "wide"}),
+    (2000, {"role_mix": "qa_heavy", "level_mix": "complex", "fan_out": "deep"})
+])
+def test_repricing_from_hour_matrix_equals_full_recalculation(tasks, profile, rate_card):
+    project = generate_project(tasks, seed=3, **profile)
+
+    repriced = reprice_from_matrix(build_hour_matrix(project["modules"]), project, rate_card)
+
+    assert_same_estimation(calculate_estimation(project, rate_card), repriced)
+
+
+def test_repricing_with_new_pricing_fields_equals_full_recalculation():
+    project = generate_project(500, seed=4)
+    hour_matrix = build_hour_matrix(project["modules"])
+
+    repriced_project = {
+        **project,
+        "target_margin": 35,
+        "risk_buffer": 12.5,
+        "negotiation_buffer": 0,
+        "estimated_team_size": 7
+    }
+
+    assert_same_estimation(
+        calculate_estimation(repriced_project),
+        reprice_from_matrix(hour_matrix, repriced_project)
+    )
+
+
+# Incremental snapshots
+
+def snapshot_estimation(snapshot):
+    return {
+        key: value for key, value in snapshot.items()
+        if key in ("totals", "wbs", "pricing", "timeline", "resource_allocation")
+    }
+
+
+def test_incremental_snapshot_after_module_edit_equals_full_recalculation():
+    project = generate_project(400, seed=5)
+    snapshot = build_estimation_snapshot(project, NOW)
+
+    edited = copy.deepcopy(project)
+    edited["modules"][1]["features"][0]["tasks"][0]["hours"] += 7
+    edited["modules"].pop(0)
+
+    incremental = build_estimation_snapshot(edited, NOW, snapshot)
+
+    assert_same_estimation(calculate_estimation(edited), snapshot_estimation(incremental))
+    assert incremental["hour_matrix"] == build_hour_matrix(edited["modules"])
+
+
+def test_pricing_only_snapshot_reuses_module_cache():
+    project = generate_project(300, seed=6)
+    snapshot = build_estimation_snapshot(project, NOW, None, CUSTOM_RATE_CARD)
+
+    pricing_only = {key: value for key, value in project.items() if key != "modules"}
+    pricing_only["target_margin"] = 40
+
+    updated = build_estimation_snapshot(pricing_only, NOW, snapshot, CUSTOM_RATE_CARD)
+
+    assert_same_estimation(
+        calculate_estimation({**project, "target_margin": 40}, CUSTOM_RATE_CARD),
+        snapshot_estimation(updated)
+    )
+    assert updated["module_cache_fingerprint"] == CUSTOM_RATE_CARD.fingerprint
+
+
+def test_pricing_only_snapshot_needs_modules_after_rate_change():
+    project = generate_project(300, seed=7)
+    snapshot = build_estimation_snapshot(project, NOW)
+    pricing_only = {key: value for key, value in project.items() if key != "modules"}
+
+    assert module_cache_is_current(snapshot, DEFAULT_RATE_CARD)
+    assert not module_cache_is_current(snapshot, CUSTOM_RATE_CARD)
+
+    with pytest.raises(ValueError):
+        build_estimation_snapshot(pricing_only, NOW, snapshot, CUSTOM_RATE_CARD)
+
+    repriced = build_estimation_snapshot(project, NOW, snapshot, CUSTOM_RATE_CARD)
+
+    assert_same_estimation(
+        calculate_estimation(project, CUSTOM_RATE_CARD), snapshot_estimation(repriced)
+    )
+    assert repriced["rate_card_fingerprint"] == CUSTOM_RATE_CARD.fingerprint
+    assert repriced["module_cache_fingerprint"] == CUSTOM_RATE_CARD.fingerprint
@@ -0,0 +1,77 @@
+import pytest
+
+from benchmarks.wbs_generator import generate_project
+from core.rate_card import DEFAULT_RATE_CARD
+from services.cost_timeline_engine import calculate_estimation
+from services.estimation_solver import solve_estimation, solve_margin
+
+
+def final_price(total_cost, risk_buffer, margin, negotiation_buffer):
+    return calculate_estimation({
+        "modules": [{"name": "M", "features": [{"name": "F", "tasks": [
+            # 1 hour at a rate of total_cost / productivity
+            {"name": "T", "hours": 1, "role": "senior_dev", "level": "low"}
+        ]}]}],
+        "target_margin": margin,
+        "risk_buffer": risk_buffer,
+        "negotiation_buffer": negotiation_buffer,
+        "estimated_team_size": 1
+    }, DEFAULT_RATE_CARD.with_overrides(
+        resource_rates={"senior_dev": total_cost / DEFAULT_RATE_CARD.productivity_factor}
+    ))["pricing"]["final_price"]
+
+
+@pytest.mark.parametrize("total_cost,step", [
+    (12_345.67, 0.1),
+    (12_345.67, 0.001),
+    (80.0, 0.0001),
+    (3.0, 0.001),
+    (2_500_000.0, 0.5)
+])
+def test_margin_is_the_smallest_grid_point_reaching_the_price(total_cost, step):
+    target_price = round(total_cost * 1.37) + 1
+
+    solution, neighbours = solve_margin(total_cost, target_price, 7, 3, step)
+    margin = solution["target_margin"]
+
+    assert solution["meets_target"]
+    assert final_price(total_cost, 7, margin, 3) == solution["final_price"] >= target_price
+    assert final_price(total_cost, 7, round(margin - step, 6), 3) < target_price
+
+    below = [n for n in neighbours if n["target_margin"] < margin]
+    assert below and not below[0]["meets_target"]
+
+
+def test_too_fine_a_margin_step_is_rejected():
+    with pytest.raises(ValueError, match="margin_step"):
+        solve_margin(1.0, 10, 0, 0, 0.000001)
+
+
+def test_team_size_is_the_smallest_meeting_the_deadline():
+    project = {
+        **generate_project(600, seed=11),
+        "solve_for": "estimated_team_size",
+        "target_weeks": 12,
+        "max_team_size": 50
+    }
+
+    result = solve_estimation(project)
+    team = result["solution"]["estimated_team_size"]
+
+    def weeks(size):
+        return calculate_estimation({**project, "estimated_team_size": size})["timeline"]["weeks_required"]
+
+    assert result["solution"]["weeks_required"] == weeks(team) <= 12
+    assert team == 1 or weeks(team - 1) > 12
+
+
+def test_unreachable_deadline_is_rejected():
+    project = {
+        **generate_project(600, seed=11),
+        "solve_for": "estimated_team_size",
+        "target_weeks": 1,
+        "max_team_size": 2
+    }
+
+    with pytest.raises(ValueError, match="not reachable"):
+        solve_estimation(project)
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from benchmarks.wbs_generator import generate_project
+from routes.estimation_calculate import router
+from tests.helpers import assert_same_estimation
+
+PRICING = ("target_margin", "risk_buffer", "negotiation_buffer", "estimated_team_size")
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client(router)
+
+
+def ndjson(project, **header):
+    lines = [{**{field: project[field] for field in PRICING}, **header}]
+    for module in project["modules"]:
+        for feature in module["features"]:
+            for task in feature["tasks"]:
+                lines.append({**task, "module": module["name"], "feature": feature["name"]})
+    return "\n".join(json.dumps(line) for line in lines)
+
+
+def stream(client, body):
+    return client.post(
+        "/api/estimation/calculate-stream",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+
+
+def test_stream_matches_calculate(client):
+    project = generate_project(400, seed=9)
+
+    streamed = stream(client, ndjson(project, start_date="2030-03-04"))
+    calculated = client.post("/api/estimation/calculate", json={
+        **project, "start_date": "2030-03-04"
+    })
+
+    assert streamed.status_code == 200, streamed.text
+    assert calculated.status_code == 200, calculated.text
+    assert streamed.json()["timeline"]["dates"]["start_date"] == "2030-03-04"
+    assert_same_estimation(calculated.json(), streamed.json())
+
+
+def test_modules_with_a_repeated_name_stay_separate(client):
+    project = generate_project(300, seed=2)
+    project["modules"] = project["modules"][:3]
+    project["modules"][2]["name"] = project["modules"][0]["name"]
+
+    streamed = stream(client, ndjson(project)).json()
+    calculated = client.post("/api/estimation/calculate", json=project).json()
+
+    assert [m["name"] for m in streamed["wbs"]["modules"]] == [
+        m["name"] for m in project["modules"]
+    ]
+    assert_same_estimation(calculated, streamed)
+
+
+def test_missing_header_is_rejected(client):
+    assert stream(client, "").status_code == 400
@@ -0,0 +1,197 @@
+import pytest
+from fastapi import HTTPException
+from starlette.websockets import WebSocketDisconnect
+
+import routes.estimation_calculate
+from benchmarks.wbs_generator import generate_project
+from services.cost_timeline_engine import calculate_estimation
+from services.live_estimation import LiveEstimationSession
+from tests.helpers import assert_same_estimation
+
+TOKEN = "live-test-token"
+
+
+@pytest.fixture
+def client(make_client, monkeypatch):
+    client = make_client(routes.estimation_calculate.router)
+
+    async def user_from_token(token):
+        if token != TOKEN:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        return client.user
+
+    monkeypatch.setattr(routes.estimation_calculate, "get_user_from_token", user_from_token)
+
+    return client
+
+
+def repeated_names_project():
+    project = generate_project(300, seed=3)
+    modules = project["modules"] = project["modules"][:3]
+    modules[2]["name"] = modules[0]["name"]
+
+    feature = modules[1]["features"][0]
+    feature["tasks"][1]["name"] = feature["tasks"][0]["name"]
+    modules[1]["features"][1]["name"] = feature["name"]
+
+    return project
+
+
+def open_session(websocket, project):
+    websocket.send_json({"token": TOKEN})
+    websocket.send_json(project)
+    return websocket.receive_json()
+
+
+def test_initial_result_matches_calculate(client):
+    project = {
+        **repeated_names_project(),
+        "start_date": "2030-03-04",
+        "simulation": {"trials": 500, "seed": 4}
+    }
+    project["team_composition"] = {
+        task["role"]: 2
+        for module in project["modules"]
+        for feature in module["features"]
+        for task in feature["tasks"]
+    }
+
+    calculated = client.post("/api/estimation/calculate", json=project)
+    assert calculated.status_code == 200, calculated.text
+
+    with client.websocket_connect("/api/estimation/live") as websocket:
+        message = open_session(websocket, project)
+
+    assert message["type"] == "result", message
+    live = message["result"]
+    expected = calculated.json()
+
+    assert live["timeline"]["schedule"] == expected["timeline"]["schedule"]
+    assert live["timeline"]["dates"] == expected["timeline"]["dates"]
+    assert live["simulation"] == expected["simulation"]
+    assert_same_estimation(expected, live)
+
+
+def test_edits_address_the_first_of_repeated_names(client):
+    project = repeated_names_project()
+    first = project["modules"][0]
+    task = first["features"][0]["tasks"][0]
+
+    with client.websocket_connect("/api/estimation/live") as websocket:
+        initial = open_session(websocket, project)["result"]
+
+        websocket.send_json({"ops": [{
+            "op": "update_task",
+            "module": first["name"],
+            "feature": first["features"][0]["name"],
+            "task": task["name"],
+            "changes": {"hours": task["hours"] + 10}
+        }]})
+        changed = websocket.receive_json()["changes"]
+
+        websocket.send_json({"ops": [{"op": "remove_module", "module": first["name"]}]})
+        removed = websocket.receive_json()["changes"]
+
+    assert [m["index"] for m in changed["modules"]] == [0]
+    assert changed["modules"][0]["hours"] > initial["wbs"]["modules"][0]["hours"]
+
+    # the module sharing the name stays, now in second place
+    assert removed["module_list"] == initial["wbs"]["modules"][1:]
+
+    project["modules"] = project["modules"][1:]
+    assert abs(removed["totals"]["hours"] - calculate_estimation(project)["totals"]["hours"]) <= 1
+
+
+def test_task_cap_applies_to_every_edit():
+    project = generate_project(20, seed=5)
+    session = LiveEstimationSession(project, max_tasks=21)
+    session.result()
+
+    def add(name):
+        session.apply({
+            "op": "add_task",
+            "module": "Extra",
+            "feature": "Extra",
+            "task": {"name": name, "role": "senior_dev", "level": "low", "hours": 8}
+        })
+
+    add("One")
+    with pytest.raises(ValueError, match="21"):
+        add("Two")
+
+    session.apply({"op": "remove_module", "module": "Extra"})
+    add("Three")
+    assert session.task_count == 21
+
+
+def test_rollback_undoes_every_edit_since_the_last_delta():
+    project = repeated_names_project()
+    session = LiveEstimationSession(project)
+    initial = session.result()
+    tasks = session.task_count
+    module = project["modules"][1]
+    feature = module["features"][0]
+
+    for op in (
+        {"op": "set_pricing", "target_margin": 60},
+        {"op": "add_task", "module": "Extra", "feature": "Extra",
+         "task": {"name": "New", "role": "senior_dev", "level": "low", "hours": 8}},
+        {"op": "update_task", "module": module["name"], "feature": feature["name"],
+         "task": feature["tasks"][0]["name"], "changes": {"hours": 999, "role": "qa"}},
+        {"op": "remove_task", "module": module["name"], "feature": feature["name"],
+         "task": feature["tasks"][0]["name"]},
+        {"op": "remove_module", "module": project["modules"][0]["name"]}
+    ):
+        session.apply(op)
+
+    session.rollback()
+
+    assert session.delta() == {}
+    assert session.result() == initial
+    assert session.task_count == tasks
+
+
+def test_session_without_a_valid_token_is_closed(client):
+    with client.websocket_connect("/api/estimation/live") as websocket:
+        websocket.send_json({"token": "forged"})
+
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_json()
+
+    assert closed.value.code == 1008
+
+
+def test_edit_that_cannot_be_dated_is_rolled_back(client):
+    project = {
+        **generate_project(300, seed=6),
+        "estimated_team_size": 1,
+        "start_date": "2030-03-04"
+    }
+    module = project["modules"][0]
+    feature = module["features"][0]
+    task = feature["tasks"][0]
+    address = {"module": module["name"], "feature": feature["name"], "task": task["name"]}
+
+    with client.websocket_connect("/api/estimation/live") as websocket:
+        initial = open_session(websocket, project)["result"]
+
+        # past the horizon of the calendar
+        websocket.send_json({"ops": [
+            {"op": "remove_module", "module": project["modules"][-1]["name"]},
+            {"op": "update_task", **address, "changes": {"hours": 100_000}}
+        ]})
+        failed = websocket.receive_json()
+
+        websocket.send_json({"ops": [{"op": "update_task", **address, "changes": {"hours": 200_000}}]})
+        invalid = websocket.receive_json()
+
+        websocket.send_json({"ops": [{"op": "update_task", **address, "changes": {"hours": task["hours"] + 1}}]})
+        changed = websocket.receive_json()
+
+    assert (failed["type"], failed["seq"]) == ("error", 1)
+    assert (invalid["type"], invalid["seq"]) == ("error", 2)
+
+    assert changed["type"] == "delta"
+    assert "module_list" not in changed["changes"]
+    assert changed["changes"]["totals"]["hours"] > initial["totals"]["hours"]
+    assert changed["changes"]["totals"]["hours"] - initial["totals"]["hours"] < 2
@@ -0,0 +1,47 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from services.password_hasher import PasswordHasher
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(workers=1, max_queued=1)
+    yield hasher
+    hasher.shutdown()
+
+
+@pytest.mark.anyio
+async def test_hashes_beyond_workers_and_queue_are_rejected(hasher):
+    release = threading.Event()
+
+    running = asyncio.create_task(hasher._run(release.wait))
+    queued = asyncio.create_task(hasher._run(release.wait))
+    await asyncio.sleep(0.05)
+
+    assert hasher.metrics()["queue_depth"] == 1
+    with pytest.raises(HTTPException) as busy:
+        await hasher._run(release.wait)
+    assert busy.value.status_code == 503
+
+    release.set()
+    await asyncio.gather(running, queued)
+
+    metrics = hasher.metrics()
+    assert (metrics["in_flight"], metrics["rejected"]) == (0, 1)
+    assert metrics["hash_execution"]["count"] == 2
+    assert metrics["queue_wait"]["count"] == 2
+    # the second hash waited for the first
+    assert metrics["queue_wait"]["max_ms"] >= 40
+
+
+@pytest.mark.anyio
+async def test_hashes_verify_on_the_pool(hasher):
+    hashed = await hasher.hash("correct horse")
+
+    assert await hasher.verify("correct horse", hashed)
+    assert not await hasher.verify("wrong horse", hashed)
+    assert hasher.metrics()["hash_execution"]["count"] == 3
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+
+import utils.security
+from routes.auth import router
+from utils.security import hash_password
+
+
+@pytest.fixture
+def client(mongo):
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+@pytest.fixture
+def user(mongo, company_id):
+    user = {
+        "_id": ObjectId(),
+        "full_name": "Ada",
+        "email": "rehash@example.com",
+        "password_hash": hash_password("correct horse"),
+        "role": "ADMIN",
+        "company_id": company_id
+    }
+    asyncio.run(mongo.users.insert_one(user))
+    return user
+
+
+def stored_hash(mongo, user):
+    return asyncio.run(mongo.users.find_one({"_id": user["_id"]}))["password_hash"]
+
+
+def login(client, password="correct horse"):
+    return client.post("/auth/login", json={"email": "rehash@example.com", "password": password})
+
+
+def test_login_rehashes_when_the_argon2_settings_change(client, mongo, user, monkeypatch):
+    assert login(client).status_code == 200
+    assert stored_hash(mongo, user) == user["password_hash"]
+
+    # as if ARGON2_* were changed for this host
+    monkeypatch.setattr(utils.security, "pwd_context", CryptContext(
+        schemes=["argon2"],
+        deprecated="auto",
+        argon2__rounds=2,
+        argon2__memory_cost=8192,
+        argon2__parallelism=1
+    ))
+
+    assert login(client, "wrong horse").status_code == 401
+    assert stored_hash(mongo, user) == user["password_hash"]
+
+    assert login(client).status_code == 200
+    rehashed = stored_hash(mongo, user)
+    assert "m=8192,t=2,p=1" in rehashed
+    assert utils.security.verify_password("correct horse", rehashed)
+
+    assert login(client).status_code == 200
+    assert stored_hash(mongo, user) == rehashed
@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+import pytest
+from bson import ObjectId
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt
+
+import dependencies
+from dependencies import get_read_user, get_user_from_token, invalidate_user
+from utils.auth_jwt import ALGORITHM, SECRET_KEY
+
+
+@pytest.fixture
+def user(mongo, company_id):
+    dependencies._claims_cache.clear()
+    dependencies._user_cache.clear()
+
+    user_id = ObjectId()
+    asyncio.run(mongo.users.insert_one({
+        "_id": user_id,
+        "full_name": "Ada",
+        "email": "ada@example.com",
+        "password_hash": "secret",
+        "role": "USER",
+        "company_id": company_id
+    }))
+    return user_id
+
+
+def token_for(user_id, **claims):
+    return jwt.encode({"user_id": str(user_id), **claims}, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def bearer(token):
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def test_claims_are_not_cached_past_the_token_expiry(user, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+
+    expiring = token_for(user, exp=int(time.time()) + 5)
+    lasting = token_for(user, exp=int(time.time()) + 3600)
+    dependencies._verify_claims(expiring)
+    dependencies._verify_claims(lasting)
+
+    now[0] += 10
+
+    assert dependencies._claims_cache.get(expiring) is None
+    assert dependencies._claims_cache.get(lasting) is not None
+
+
+def test_cached_user_rows_are_dropped_by_invalidate_user(user, mongo):
+    token = token_for(user)
+    principal = asyncio.run(get_user_from_token(token))
+
+    assert principal["role"] == "USER"
+    assert "password_hash" not in principal
+
+    asyncio.run(mongo.users.update_one({"_id": user}, {"$set": {"role": "ADMIN"}}))
+    assert asyncio.run(get_user_from_token(token))["role"] == "USER"
+
+    invalidate_user(user)
+    assert asyncio.run(get_user_from_token(token))["role"] == "ADMIN"
+
+
+def test_claims_only_reads_fall_back_to_the_user_row(user, mongo, company_id, monkeypatch):
+    monkeypatch.setattr(dependencies, "AUTH_CLAIMS_ONLY_READS", True)
+
+    with_claims = token_for(user, company_id=str(company_id), role="manager")
+    without_claims = token_for(user, company_id="None")
+
+    from_claims = asyncio.run(get_read_user(bearer(with_claims)))
+    from_row = asyncio.run(get_read_user(bearer(without_claims)))
+
+    assert (from_claims["role"], from_claims["company_id"]) == ("manager", str(company_id))
+    assert "full_name" not in from_claims
+    assert (from_row["role"], from_row["full_name"]) == ("USER", "Ada")
+
+    # claims alone never touch the database
+    asyncio.run(mongo.users.delete_one({"_id": user}))
+    invalidate_user(user)
+    assert asyncio.run(get_read_user(bearer(with_claims)))["role"] == "manager"
@@ -0,0 +1,217 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from benchmarks.wbs_generator import generate_project
+import routes.projects
+from routes.projects import router
+from services.cost_timeline_engine import calculate_estimation
+from services.estimation_memo import estimation_memo
+from services.estimation_snapshot import build_module_cache, build_template_hour_matrix
+from services.rate_cards import get_rate_card, invalidate_rate_card, to_rate_entries
+from tests.helpers import assert_same_estimation
+
+ESTIMATION_SECTIONS = ("totals", "wbs", "pricing", "timeline", "resource_allocation")
+
+
+@pytest.fixture
+def client(make_client, company_id):
+    return make_client(router, company_id=company_id)
+
+
+def set_rates(mongo, company_id, resource_rates):
+    asyncio.run(mongo.companies.update_one(
+        {"_id": company_id},
+        {"$set": {"resource_rates": to_rate_entries("resource_rates", resource_rates)}, "$inc": {"rate_card_version": 1}}
+    ))
+    invalidate_rate_card(company_id)
+    return asyncio.run(get_rate_card(company_id))
+
+
+def create_project(client, tasks=200, seed=0):
+    project = generate_project(tasks, seed=seed)
+    response = client.post("/api/projects/", json={
+        **project,
+        "estimation_technique": {"name": "Bottom-up"}
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["project_id"], project
+
+
+def stored_estimation(client, project_id):
+    snapshot = client.get(f"/api/projects/{project_id}").json()["estimation_snapshot"]
+    estimation = {section: snapshot[section] for section in ESTIMATION_SECTIONS}
+    # calendar dates are covered separately
+    estimation["timeline"] = {
+        key: value for key, value in snapshot["timeline"].items() if key != "dates"
+    }
+    return estimation
+
+
+def test_pricing_only_patch_after_rate_change_uses_new_rates(client, mongo, company_id):
+    project_id, project = create_project(client)
+    rate_card = set_rates(mongo, company_id, {"senior_dev": 80, "pm": 70})
+
+    response = client.patch(f"/api/projects/{project_id}", json={"target_margin": 33})
+    assert response.status_code == 200, response.text
+
+    assert_same_estimation(
+        calculate_estimation({**project, "target_margin": 33}, rate_card),
+        stored_estimation(client, project_id)
+    )
+
+
+def test_project_created_from_a_memoized_snapshot_keeps_its_module_cache(client, mongo):
+    first_id, project = create_project(client, seed=5)
+    hits = estimation_memo.hits
+
+    second = client.post("/api/projects/", json={
+        **project,
+        "name": "Copy of " + project["name"],
+        "estimation_technique": {"name": "Bottom-up"}
+    })
+    assert second.status_code == 200, second.text
+    second_id = second.json()["project_id"]
+    assert estimation_memo.hits == hits + 1
+
+    first, copied = (
+        asyncio.run(mongo.projects.find_one({"_id": ObjectId(project_id)}))["estimation_snapshot"]
+        for project_id in (first_id, second_id)
+    )
+
+    assert copied["module_cache"] and copied["hour_matrix"]
+    assert {**copied, "calculated_at": None} == {**first, "calculated_at": None}
+
+    response = client.patch(f"/api/projects/{second_id}", json={"risk_buffer": 3})
+    assert response.status_code == 200, response.text
+
+    assert_same_estimation(
+        calculate_estimation({**project, "risk_buffer": 3}),
+        stored_estimation(client, second_id)
+    )
+
+
+def test_project_snapshots_carry_calendar_dates(client, mongo, company_id):
+    asyncio.run(mongo.companies.update_one(
+        {"_id": company_id}, {"$set": {"holidays": ["2030-03-05"]}}
+    ))
+    project = generate_project(100, seed=7)
+    response = client.post("/api/projects/", json={
+        **project,
+        "estimation_technique": {"name": "Bottom-up"},
+        "start_date": "2030-03-02"
+    })
+    assert response.status_code == 200, response.text
+    project_id = response.json()["project_id"]
+
+    snapshot = client.get(f"/api/projects/{project_id}").json()["estimation_snapshot"]
+    dates = snapshot["timeline"]["dates"]
+
+    # Saturday start, holiday on Tuesday
+    assert dates["start_date"] == "2030-03-04"
+    assert dates["working_days"] == snapshot["timeline"]["working_days_required"]
+    assert dates["sprints"][0]["end_date"] == "2030-03-18"
+
+    response = client.patch(f"/api/projects/{project_id}", json={"start_date": "2030-04-08"})
+    assert response.status_code == 200, response.text
+    assert response.json()["project"]["start_date"] == "2030-04-08"
+    assert response.json()["project"]["estimation_snapshot"]["timeline"]["dates"]["start_date"] == "2030-04-08"
+
+    response = client.post(f"/api/projects/{project_id}/reprice", json={"estimated_team_size": 9})
+    assert response.json()["timeline"]["dates"]["start_date"] == "2030-04-08"
+
+
+def test_start_date_outside_the_calendar_is_rejected_only_when_set(client, mongo):
+    project_id, _ = create_project(client)
+
+    response = client.patch(f"/api/projects/{project_id}", json={"start_date": "1999-01-04"})
+    assert response.status_code == 400
+
+    # a stored start date that has aged out of the horizon keeps updates working
+    asyncio.run(mongo.projects.update_one(
+        {"_id": ObjectId(project_id)}, {"$set": {"start_date": "1999-01-04"}}
+    ))
+    response = client.patch(f"/api/projects/{project_id}", json={"target_margin": 40})
+    assert response.status_code == 200, response.text
+    assert "dates" not in response.json()["project"]["estimation_snapshot"]["timeline"]
+
+
+def test_projects_from_a_template_are_priced_with_a_module_cache(client, mongo, company_id):
+    project = generate_project(200, seed=5)
+    template_id = ObjectId()
+    asyncio.run(mongo.custom_templates.insert_one({
+        "_id": template_id,
+        "name": "Shop",
+        "default_margin": 20,
+        "default_risk_buffer": 10,
+        "modules": project["modules"],
+        "company_id": company_id
+    }))
+    payload = {
+        "template_id": str(template_id),
+        "template_type": "custom",
+        "name": project["name"],
+        "client_name": project["client_name"],
+        "estimation_technique": {"name": "Bottom-up"},
+        "negotiation_buffer": project["negotiation_buffer"],
+        "estimated_team_size": project["estimated_team_size"]
+    }
+
+    response = client.post("/api/projects/from-template", json=payload)
+    assert response.status_code == 200, response.text
+    project_id = response.json()["project_id"]
+
+    stored = client.get(f"/api/projects/{project_id}").json()
+    assert stored["template_name"] == "Shop"
+    assert stored["estimation_snapshot"]["module_cache"]
+    assert_same_estimation(
+        calculate_estimation({**project, "target_margin": 20, "risk_buffer": 10}),
+        stored_estimation(client, project_id)
+    )
+
+    duplicate = client.post("/api/projects/from-template", json=payload)
+    assert duplicate.status_code == 409
+
+
+def test_unmodified_template_copies_are_priced_from_the_template_matrix(client, mongo, company_id, monkeypatch):
+    project = generate_project(300, seed=6)
+    rate_card = set_rates(mongo, company_id, {"senior_dev": 80, "qa": 45})
+    template_id = ObjectId()
+    asyncio.run(mongo.custom_templates.insert_one({
+        "_id": template_id,
+        "name": "Shop",
+        "default_margin": 20,
+        "default_risk_buffer": 10,
+        "modules": project["modules"],
+        "hour_matrix": build_template_hour_matrix(project["modules"]),
+        "company_id": company_id
+    }))
+
+    async def walk_tasks(*args):
+        raise AssertionError("the tasks of an unmodified copy were walked")
+
+    monkeypatch.setattr(routes.projects, "_price_new_project", walk_tasks)
+
+    response = client.post("/api/projects/from-template", json={
+        "template_id": str(template_id),
+        "template_type": "custom",
+        "name": project["name"],
+        "client_name": project["client_name"],
+        "estimation_technique": {"name": "Bottom-up"},
+        "negotiation_buffer": project["negotiation_buffer"],
+        "estimated_team_size": project["estimated_team_size"]
+    })
+    assert response.status_code == 200, response.text
+    project_id = response.json()["project_id"]
+
+    assert_same_estimation(
+        calculate_estimation({**project, "target_margin": 20, "risk_buffer": 10}, rate_card),
+        stored_estimation(client, project_id)
+    )
+
+    # later edits find every module in the cache
+    snapshot = client.get(f"/api/projects/{project_id}").json()["estimation_snapshot"]
+    assert [entry["hash"] for entry in snapshot["module_cache"]] == [
+        entry["hash"] for entry in build_module_cache(project["modules"], rate_card=rate_card)
+    ]
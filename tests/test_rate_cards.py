@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+import routes.company
+from core.rate_card import DEFAULT_RATE_CARD
+from services.cost_timeline_engine import calculate_task_cost
+from services.rate_cards import compile_rate_card, get_rate_card
+
+
+@pytest.fixture
+def client(make_client, company_id, monkeypatch):
+    async def no_repricing(company_id):
+        return None
+
+    monkeypatch.setattr(routes.company, "start_repricing_job", no_repricing)
+
+    return make_client(routes.company.router, company_id=company_id)
+
+
+def test_company_without_rates_uses_the_default_card():
+    assert compile_rate_card({"_id": ObjectId(), "name": "Acme"}) is DEFAULT_RATE_CARD
+
+
+def test_stored_entries_and_legacy_dicts_compile_to_the_same_card():
+    company_id = ObjectId()
+
+    entries = compile_rate_card({
+        "_id": company_id,
+        "resource_rates": [
+            {"role": "senior_dev", "rate": 40},
+            {"role": "data.engineer", "rate": 55}
+        ],
+        "complexity_multipliers": [{"level": "high", "multiplier": 1.7}]
+    })
+    legacy = compile_rate_card({
+        "_id": company_id,
+        "resource_rates": {"senior_dev": 40, "data.engineer": 55},
+        "complexity_multipliers": {"high": 1.7}
+    })
+
+    assert entries.fingerprint == legacy.fingerprint
+    assert entries.resource_rates["data.engineer"] == 55
+    assert entries.resource_rates["pm"] == DEFAULT_RATE_CARD.resource_rates["pm"]
+    assert entries.complexity_multipliers["high"] == 1.7
+
+
+def test_rates_for_roles_that_are_not_valid_keys_are_stored_and_priced(client, mongo, company_id):
+    rates = {"data.engineer": 55, "$ops": 33, "senior_dev": 40}
+
+    response = client.patch("/api/company/", json={"resource_rates": rates})
+    assert response.status_code == 200, response.text
+    assert response.json()["data"]["resource_rates"] == rates
+
+    stored = asyncio.run(mongo.companies.find_one({"_id": company_id}))
+    assert stored["resource_rates"] == [
+        {"role": role, "rate": rate} for role, rate in rates.items()
+    ]
+    assert stored["rate_card_version"] == 1
+
+    assert client.get("/api/company/").json()["resource_rates"] == rates
+
+    rate_card = asyncio.run(get_rate_card(company_id))
+    task = {"name": "Pipeline", "role": "data.engineer", "level": "low", "hours": 10}
+    _, cost, _ = calculate_task_cost(task, rate_card)
+
+    assert cost == pytest.approx(10 * 55 * rate_card.productivity_factor)
+
+
+def test_only_admins_and_managers_change_rates(make_client, client, company_id):
+    user = make_client(routes.company.router, company_id=company_id, role="USER")
+
+    assert user.patch("/api/company/", json={"resource_rates": {"pm": 10}}).status_code == 403
+    assert user.patch("/api/company/", json={"name": "Acme Ltd"}).status_code == 200
+
+    manager = make_client(routes.company.router, company_id=company_id, role="manager")
+    assert manager.patch("/api/company/", json={"resource_rates": {"pm": 10}}).status_code == 200
+
+
+def test_negative_rates_and_non_positive_multipliers_are_rejected(client):
+    for body in (
+        {"resource_rates": {"pm": -10}},
+        {"resource_rates": {"pm": "Infinity"}},
+        {"complexity_multipliers": {"high": 0}},
+        {"complexity_multipliers": {"high": -1.5}}
+    ):
+        assert client.patch("/api/company/", json=body).status_code == 422, body
+
+    assert client.patch("/api/company/", json={"resource_rates": {"intern": 0}}).status_code == 200
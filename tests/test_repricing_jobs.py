@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+import routes.company
+import services.repricing_jobs
+from routes.projects import router as projects_router
+from services.cost_timeline_engine import calculate_estimation
+from services.rate_cards import get_rate_card, invalidate_rate_card, to_rate_entries
+from services.repricing_jobs import (
+    ensure_repricing_indexes,
+    run_repricing_job,
+    start_repricing_job
+)
+from tests.helpers import assert_same_estimation
+from tests.test_projects_routes import create_project, set_rates, stored_estimation
+
+
+@pytest.fixture
+def jobs(mongo, monkeypatch):
+    """
+    Jobs are started without spawning; tests run them with run_repricing_job.
+    """
+    monkeypatch.setattr(services.repricing_jobs, "_spawn", lambda job_id: None)
+    monkeypatch.setattr(services.repricing_jobs, "REPRICING_PAUSE_SECONDS", 0)
+    asyncio.run(ensure_repricing_indexes())
+    return mongo.repricing_jobs
+
+
+@pytest.fixture
+def client_for(make_client, company_id):
+    def client_for(role):
+        return make_client(
+            projects_router, routes.company.router, company_id=company_id, role=role
+        )
+
+    return client_for
+
+
+def test_job_reprices_projects_after_a_pricing_only_patch(jobs, mongo, company_id, client_for):
+    client = client_for("ADMIN")
+    patched_id, patched = create_project(client, seed=1)
+    untouched_id, untouched = create_project(client, tasks=150, seed=2)
+
+    rate_card = set_rates(mongo, company_id, {"senior_dev": 80, "pm": 70})
+
+    response = client.patch(f"/api/projects/{patched_id}", json={"target_margin": 33})
+    assert response.status_code == 200, response.text
+
+    job = asyncio.run(start_repricing_job(company_id))
+    asyncio.run(run_repricing_job(job["_id"]))
+
+    job = asyncio.run(jobs.find_one({"_id": job["_id"]}))
+    assert job["status"] == "completed"
+    assert "active" not in job
+
+    assert_same_estimation(
+        calculate_estimation({**patched, "target_margin": 33}, rate_card),
+        stored_estimation(client, patched_id)
+    )
+    assert_same_estimation(
+        calculate_estimation(untouched, rate_card),
+        stored_estimation(client, untouched_id)
+    )
+
+
+def test_company_has_one_active_job(jobs, company_id):
+    async def start_twice():
+        return await asyncio.gather(
+            start_repricing_job(company_id), start_repricing_job(company_id)
+        )
+
+    first, second = asyncio.run(start_twice())
+
+    assert first["_id"] == second["_id"]
+    assert asyncio.run(jobs.count_documents({"company_id": company_id})) == 1
+
+    asyncio.run(run_repricing_job(first["_id"]))
+    assert asyncio.run(start_repricing_job(company_id))["_id"] != first["_id"]
+
+
+def test_only_admins_and_managers_start_jobs(jobs, client_for):
+    response = client_for("USER").post("/api/company/repricing-jobs")
+    assert response.status_code == 403
+
+    response = client_for("manager").post("/api/company/repricing-jobs")
+    assert response.status_code == 200, response.text
+    assert response.json()["status"] == "queued"
+
+
+def test_rate_change_requested_during_the_last_batch_is_repriced(jobs, mongo, company_id, client_for, monkeypatch):
+    client = client_for("ADMIN")
+    first_id, first = create_project(client, seed=3)
+    second_id, second = create_project(client, tasks=150, seed=4)
+
+    set_rates(mongo, company_id, {"senior_dev": 80})
+    throttled = []
+
+    # both projects fit in one batch: the change comes after the last one
+    async def change_rates_in_another_process():
+        throttled.append(None)
+        if len(throttled) == 1:
+            # this process' rate card cache is not invalidated
+            await mongo.companies.update_one(
+                {"_id": company_id},
+                {"$set": {"resource_rates": to_rate_entries("resource_rates", {"senior_dev": 95})},
+                 "$inc": {"rate_card_version": 1}}
+            )
+            await start_repricing_job(company_id)
+
+    monkeypatch.setattr(services.repricing_jobs, "_throttle", change_rates_in_another_process)
+
+    async def run():
+        job = await start_repricing_job(company_id)
+        await run_repricing_job(job["_id"])
+        return await jobs.find_one({"_id": job["_id"]})
+
+    job = asyncio.run(run())
+    assert job["status"] == "completed"
+
+    invalidate_rate_card(company_id)
+    rate_card = asyncio.run(get_rate_card(company_id))
+    assert rate_card.resource_rates["senior_dev"] == 95
+    assert job["rate_card_fingerprint"] == rate_card.fingerprint
+
+    for project_id, project in ((first_id, first), (second_id, second)):
+        assert_same_estimation(
+            calculate_estimation(project, rate_card), stored_estimation(client, project_id)
+        )
@@ -0,0 +1,69 @@
+from benchmarks.wbs_generator import generate_project
+from core.estimation_constants import SIMULATION_SETTINGS, SIMULATION_SPREADS
+from core.rate_card import DEFAULT_RATE_CARD
+from services.compact_wbs import CompactWBS
+from services.risk_simulation import simulate_estimation
+
+
+def simulate(project, **kwargs):
+    return simulate_estimation(CompactWBS.from_modules(project["modules"]), project, **kwargs)
+
+
+def test_same_seed_gives_same_percentiles():
+    project = generate_project(300, seed=1)
+
+    first = simulate(project, trials=2000, seed=42)
+
+    assert first == simulate(project, trials=2000, seed=42)
+    assert first["percentiles"] != simulate(project, trials=2000, seed=43)["percentiles"]
+
+
+def test_unseeded_simulation_reports_its_seed():
+    project = generate_project(50, seed=1)
+
+    result = simulate(project, trials=500)
+
+    assert result == simulate(project, trials=500, seed=result["seed"])
+
+
+def test_percentiles_are_ordered_and_within_the_spread():
+    project = generate_project(400, seed=2, level_mix="complex")
+
+    result = simulate(project, trials=3000, seed=7)
+    p50, p80, p95 = (result["percentiles"][p] for p in ("p50", "p80", "p95"))
+
+    for field in ("hours", "cost", "price", "weeks"):
+        assert p50[field] <= p80[field] <= p95[field]
+
+    low = high = 0
+    for module in project["modules"]:
+        for feature in module["features"]:
+            for task in feature["tasks"]:
+                hours = task["hours"] * DEFAULT_RATE_CARD.complexity_multipliers[task["level"]]
+                left, right = SIMULATION_SPREADS[task["level"]]
+                low += hours * left
+                high += hours * right
+
+    assert low <= p50["hours"] <= p95["hours"] <= high
+
+
+def test_price_applies_margin_and_negotiation_to_simulated_cost():
+    project = {
+        **generate_project(100, seed=3),
+        "target_margin": 20,
+        "negotiation_buffer": 10
+    }
+
+    for p in simulate(project, trials=1000, seed=5)["percentiles"].values():
+        assert abs(p["price"] - p["cost"] * 1.2 * 1.1) <= 1
+
+
+def test_trials_are_capped_by_the_cell_budget(monkeypatch):
+    monkeypatch.setitem(SIMULATION_SETTINGS, "max_cells", 10_000)
+    monkeypatch.setitem(SIMULATION_SETTINGS, "chunk_cells", 1_000)
+    project = generate_project(200, seed=4)
+
+    result = simulate(project, trials=5000, seed=1)
+
+    assert result["requested_trials"] == 5000
+    assert result["trials"] == 50
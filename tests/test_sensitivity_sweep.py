@@ -0,0 +1,84 @@
+import pytest
+from pydantic import ValidationError
+
+from benchmarks.wbs_generator import generate_project
+from schemas.project import EstimationSweepRequest, SweepRange
+from services.cost_timeline_engine import calculate_estimation
+from services.sensitivity_sweep import SWEEP_MAX_CELLS, expand_axis, sweep_estimation
+
+
+def test_sweep_cells_match_calculate_estimation():
+    project = generate_project(300, seed=8)
+    grid = {
+        **project,
+        "risk_buffer": {"start": 0, "stop": 20, "step": 10},
+        "target_margin": [15, 30],
+        "negotiation_buffer": 5,
+        "estimated_team_size": {"start": 2, "stop": 6, "step": 2}
+    }
+
+    result = sweep_estimation(grid)
+
+    assert result["axes"]["risk_buffer"] == [0, 10, 20]
+    assert result["axes"]["estimated_team_size"] == [2, 4, 6]
+
+    for i, risk in enumerate(result["axes"]["risk_buffer"]):
+        for j, margin in enumerate(result["axes"]["target_margin"]):
+            expected = calculate_estimation({
+                **project,
+                "risk_buffer": risk,
+                "target_margin": margin,
+                "negotiation_buffer": 5
+            })
+            assert abs(result["final_price"]["values"][i][j][0] - expected["pricing"]["final_price"]) <= 1
+
+    for k, team in enumerate(result["axes"]["estimated_team_size"]):
+        expected = calculate_estimation({**project, "estimated_team_size": team})
+        assert result["weeks_required"]["values"][k] == expected["timeline"]["weeks_required"]
+
+
+def test_range_includes_a_stop_that_is_a_whole_number_of_steps():
+    assert expand_axis({"start": 0.1, "stop": 0.3, "step": 0.1}).tolist() == [0.1, 0.2, 0.3]
+    assert expand_axis({"start": 0, "stop": 1, "step": 0.4}).tolist() == [0, 0.4, 0.8]
+
+
+def test_oversized_grid_is_rejected_before_expanding():
+    project = {
+        **generate_project(10, seed=1),
+        "risk_buffer": {"start": 0, "stop": 1e12, "step": 1e-3},
+        "target_margin": 20,
+        "negotiation_buffer": 5,
+        "estimated_team_size": 3
+    }
+
+    with pytest.raises(ValueError, match=str(SWEEP_MAX_CELLS)):
+        sweep_estimation(project)
+
+
+def test_range_with_stop_before_start_is_invalid():
+    with pytest.raises(ValidationError):
+        SweepRange(start=10, stop=5, step=1)
+
+    with pytest.raises(ValueError):
+        expand_axis({"start": 10, "stop": 5, "step": 1})
+
+
+def test_team_sizes_are_whole_numbers():
+    project = {
+        **generate_project(10, seed=2),
+        "risk_buffer": 10,
+        "target_margin": 20,
+        "negotiation_buffer": 5
+    }
+
+    for team in ({"start": 1, "stop": 2, "step": 0.5}, {"start": 1.5, "stop": 3, "step": 1}):
+        with pytest.raises(ValidationError):
+            EstimationSweepRequest.model_validate({**project, "estimated_team_size": team})
+
+        with pytest.raises(ValueError, match="whole numbers"):
+            sweep_estimation({**project, "estimated_team_size": team})
+
+    request = EstimationSweepRequest.model_validate(
+        {**project, "estimated_team_size": {"start": 1, "stop": 3, "step": 1}}
+    )
+    assert sweep_estimation(request.model_dump())["axes"]["estimated_team_size"] == [1, 2, 3]
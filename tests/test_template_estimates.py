@@ -0,0 +1,82 @@
+import pytest
+
+from benchmarks.wbs_generator import generate_project
+from routes.custom_templates import router
+from services.cost_timeline_engine import calculate_estimation
+from services.estimation_snapshot import build_hour_matrix
+from services.template_estimates import estimate_template
+
+
+def template_of(project, margin=25, risk=10):
+    return {
+        "name": "Shop",
+        "default_margin": margin,
+        "default_risk_buffer": risk,
+        "modules": project["modules"],
+        "hour_matrix": build_hour_matrix(project["modules"])
+    }
+
+
+@pytest.fixture
+def client(make_client, company_id):
+    return make_client(router, company_id=company_id)
+
+
+def test_estimate_matches_calculate_at_template_defaults():
+    project = generate_project(300, seed=11)
+
+    estimate = estimate_template(template_of(project), team_size=3)
+    expected = calculate_estimation({
+        **project,
+        "target_margin": 25,
+        "risk_buffer": 10,
+        "negotiation_buffer": 0,
+        "estimated_team_size": 3
+    })
+
+    assert abs(estimate["hours"] - expected["totals"]["hours"]) <= 1
+    assert abs(estimate["base_cost"] - expected["totals"]["base_cost"]) <= 1
+    assert abs(estimate["final_price"] - expected["pricing"]["final_price"]) <= 1
+    assert estimate["weeks_required"] == expected["timeline"]["weeks_required"]
+
+
+def test_templates_without_a_stored_matrix_are_estimated_from_modules():
+    template = template_of(generate_project(100, seed=12))
+
+    stored = estimate_template(template)
+    del template["hour_matrix"]
+
+    assert estimate_template(template) == stored
+
+
+def test_range_brackets_the_point_estimate():
+    estimate = estimate_template(template_of(generate_project(300, seed=13, level_mix="complex")))
+    low, high = estimate["range"]["low"], estimate["range"]["high"]
+
+    for field in ("hours", "base_cost", "final_price", "weeks_required"):
+        assert low[field] <= estimate[field] <= high[field]
+
+    assert low["final_price"] < estimate["final_price"] < high["final_price"]
+
+
+def test_single_template_reads_do_not_expose_the_hour_matrix(client):
+    project = generate_project(60, seed=14)
+    created = client.post("/api/custom-templates/", json={
+        "name": "Shop",
+        "default_margin": 20,
+        "default_risk_buffer": 5,
+        "modules": project["modules"]
+    })
+    assert created.status_code == 200, created.text
+    template_id = created.json()["template_id"]
+
+    fetched = client.get(f"/api/custom-templates/{template_id}").json()
+    updated = client.patch(f"/api/custom-templates/{template_id}", json={
+        "modules": project["modules"][:1]
+    }).json()["data"]
+    listed = client.get("/api/custom-templates/").json()
+
+    assert "hour_matrix" not in fetched
+    assert "hour_matrix" not in updated
+    assert "hour_matrix" not in listed[0]
+    assert listed[0]["estimate"]["range"]["low"]["final_price"] <= listed[0]["estimate"]["final_price"]
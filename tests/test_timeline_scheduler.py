@@ -0,0 +1,105 @@
+import pytest
+
+from benchmarks.wbs_generator import generate_project
+from core.rate_card import DEFAULT_RATE_CARD
+from services.compact_wbs import CompactWBS
+from services.timeline_scheduler import schedule_project, scheduled_timeline
+
+# effective hours per week: 8 h x 5 days x 80% efficiency
+WEEK = 32
+
+
+def task(role, hours, level="low"):
+    return {"name": f"{role} {hours}h", "role": role, "level": level, "hours": hours}
+
+
+def wbs_of(*features):
+    return CompactWBS.from_modules([{
+        "name": "Core",
+        "features": [
+            {"name": f"Feature {i}", "tasks": tasks}
+            for i, tasks in enumerate(features)
+        ]
+    }])
+
+
+def test_phases_of_a_feature_run_in_sequence():
+    wbs = wbs_of([task("qa_junior", 8), task("senior_dev", 20), task("ui_ux", 6)])
+
+    schedule = schedule_project(wbs, {"qa_junior": 1, "senior_dev": 1, "ui_ux": 1})
+
+    # design 6h, then build 20h, then QA 8h
+    assert schedule["makespan_hours"] == 34
+    assert schedule["features"][0] == {
+        "module": "Core",
+        "feature": "Feature 0",
+        "start_hour": 0,
+        "end_hour": 34
+    }
+
+
+def test_tasks_of_one_role_share_its_members():
+    wbs = wbs_of([task("senior_dev", 10), task("senior_dev", 10), task("senior_dev", 10)])
+
+    assert schedule_project(wbs, {"senior_dev": 1})["makespan_hours"] == 30
+    assert schedule_project(wbs, {"senior_dev": 2})["makespan_hours"] == 20
+    assert schedule_project(wbs, {"senior_dev": 3})["makespan_hours"] == 10
+
+
+def test_features_overlap_when_members_are_free():
+    wbs = wbs_of([task("senior_dev", 12)], [task("junior_dev", 5), task("qa_senior", 4)])
+
+    schedule = schedule_project(wbs, {"senior_dev": 1, "junior_dev": 1, "qa_senior": 1})
+
+    assert schedule["features"][1]["start_hour"] == 0
+    assert schedule["features"][1]["end_hour"] == 9
+    assert schedule["makespan_hours"] == 12
+
+
+def test_hours_are_adjusted_by_complexity():
+    wbs = wbs_of([task("senior_dev", 10, "high")])
+
+    schedule = schedule_project(wbs, {"senior_dev": 1})
+
+    assert schedule["makespan_hours"] == pytest.approx(10 * DEFAULT_RATE_CARD.complexity_multipliers["high"])
+
+
+def test_missing_role_is_rejected():
+    with pytest.raises(ValueError, match="qa_senior"):
+        schedule_project(wbs_of([task("qa_senior", 4)]), {"senior_dev": 2})
+
+
+def test_timeline_reports_makespan_and_utilization():
+    wbs = wbs_of(
+        [task("senior_dev", 40), task("senior_dev", 24)],
+        [task("qa_junior", 16)]
+    )
+
+    timeline = scheduled_timeline(wbs, {"senior_dev": 2, "qa_junior": 1})
+
+    assert timeline["estimated_team_size"] == 3
+    assert timeline["schedule"]["makespan_weeks"] == round(40 / WEEK, 1)
+    assert timeline["weeks_required"] == 2
+    assert timeline["schedule"]["utilization"] == [
+        {"role": "senior_dev", "members": 2, "hours": 64, "utilization_percent": 80.0},
+        {"role": "qa_junior", "members": 1, "hours": 16, "utilization_percent": 40.0}
+    ]
+
+
+def test_a_larger_team_finishes_sooner_but_not_below_the_longest_role():
+    project = generate_project(1500, seed=6)
+    wbs = CompactWBS.from_modules(project["modules"])
+
+    solo = schedule_project(wbs, dict.fromkeys(wbs.roles, 1))
+    team = schedule_project(wbs, dict.fromkeys(wbs.roles, 8))
+
+    assert team["makespan_hours"] < solo["makespan_hours"]
+    # one member per role works its hours back to back at best
+    assert solo["makespan_hours"] >= max(solo["busy_hours"].values())
+    assert team["makespan_hours"] >= max(team["busy_hours"].values()) / 8
+
+
+def test_single_members_with_no_phases_take_the_total_hours():
+    wbs = wbs_of([task("senior_dev", 7), task("senior_dev", 5)], [task("senior_dev", 9)])
+
+    assert schedule_project(wbs, {"senior_dev": 1})["makespan_hours"] == 21
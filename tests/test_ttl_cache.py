@@ -0,0 +1,36 @@
+import time
+
+from utils.ttl_cache import TTLCache
+
+
+def test_entries_expire_after_their_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = TTLCache(10, ttl=60)
+
+    cache.set("default", 1)
+    cache.set("short", 2, ttl=5)
+    cache.set("expired", 3, ttl=0)
+
+    assert cache.get("expired") is None
+    assert cache.get("short") == 2
+
+    now[0] += 10
+    assert cache.get("short") is None
+    assert cache.get("default") == 1
+
+    now[0] += 60
+    assert cache.get("default") is None
+
+
+def test_least_recently_used_entries_are_evicted_first():
+    cache = TTLCache(2, ttl=60)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.evictions == 1
@@ -0,0 +1,81 @@
+from datetime import date
+
+import pytest
+
+from core.estimation_constants import DEFAULT_SETTINGS
+from core.rate_card import DEFAULT_RATE_CARD
+from core.work_calendar import WorkCalendar
+from services.compact_wbs import CompactWBS
+from services.cost_timeline_engine import build_estimation_result
+from services.timeline_scheduler import scheduled_timeline
+
+# 2030-03-04 is a Monday
+MONDAY = date(2030, 3, 4)
+
+
+def timeline(total_hours, team=1, settings=DEFAULT_SETTINGS):
+    project = {"target_margin": 0, "risk_buffer": 0, "negotiation_buffer": 0, "estimated_team_size": team}
+    return build_estimation_result(project, total_hours, 0, [], {}, settings)["timeline"]
+
+
+def test_end_date_follows_the_working_hours_not_whole_weeks():
+    # 100 h at 8 h/day x 80% efficiency: 16 working days, 4 weeks
+    t = timeline(100)
+    assert (t["working_days_required"], t["weeks_required"]) == (16, 4)
+
+    [dates] = WorkCalendar().delivery_dates([t], [MONDAY])
+
+    assert dates["start_date"] == "2030-03-04"
+    assert dates["end_date"] == "2030-03-25"
+    assert dates["working_days"] == 16
+    assert [s["end_date"] for s in dates["sprints"]] == ["2030-03-15", "2030-03-25"]
+
+
+def test_shorter_working_days_take_longer():
+    settings = {**DEFAULT_SETTINGS, "working_hours_per_day": 4}
+
+    assert timeline(100, settings=settings)["working_days_required"] == 32
+    assert timeline(100, team=4, settings=settings)["working_days_required"] == 8
+
+
+def test_holidays_and_non_working_weekdays_are_skipped():
+    calendar = WorkCalendar("Europe/Berlin", 4, ["2030-03-05"])
+
+    [dates] = calendar.delivery_dates(
+        [{"working_days_required": 5, "weeks_required": 2, "sprints_required": 1}],
+        [date(2030, 3, 1)]
+    )
+
+    # Friday is not a working day, Tuesday is a holiday
+    assert dates["timezone"] == "Europe/Berlin"
+    assert dates["start_date"] == "2030-03-04"
+    assert dates["end_date"] == "2030-03-12"
+
+
+def test_stored_timelines_without_working_days_count_whole_weeks():
+    [dates] = WorkCalendar().delivery_dates(
+        [{"weeks_required": 2, "sprints_required": 1}], [MONDAY]
+    )
+
+    assert dates["working_days"] == 10
+    assert dates["end_date"] == "2030-03-15"
+
+
+def test_unknown_timezone_falls_back_to_utc():
+    assert WorkCalendar("Mars/Olympus").timezone.key == "UTC"
+
+
+def test_start_outside_the_calendar_is_rejected():
+    with pytest.raises(ValueError):
+        WorkCalendar().delivery_dates([timeline(10)], [date(1999, 1, 4)])
+
+
+def test_scheduled_timeline_counts_working_days_from_the_makespan():
+    wbs = CompactWBS.from_modules([{"name": "M", "features": [{"name": "F", "tasks": [
+        {"name": "T", "hours": 64, "role": "senior_dev", "level": "low"}
+    ]}]}])
+
+    t = scheduled_timeline(wbs, {"senior_dev": 1}, DEFAULT_RATE_CARD)
+
+    assert t["working_days_required"] == 10
+    assert t["weeks_required"] == 2
@@ -0,0 +1,115 @@
+"""
+Picks Argon2 cost parameters for a target hash latency on this host.
+
+    python -m utils.argon2_calibration --target-ms 250
+    python -m utils.argon2_calibration --target-ms 250 --env-file .env
+
+Memory cost is raised first (it is what makes attacks on GPUs expensive),
+doubling from --min-memory-mib while a hash stays within the target; time
+cost is then raised as far as the target allows. The result is printed as
+ARGON2_* settings, or written into --env-file. Run it on the production
+host type: passwords hashed with other parameters are rehashed on login.
+"""
+import argparse
+import statistics
+import time
+
+from passlib.hash import argon2
+
+SAMPLE_PASSWORD = "calibration-sample-password"
+
+
+def measure(time_cost, memory_cost, parallelism, samples):
+    hasher = argon2.using(rounds=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+    hasher.hash(SAMPLE_PASSWORD)  # warm-up
+
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        hasher.hash(SAMPLE_PASSWORD)
+        timings.append(time.perf_counter() - started)
+
+    return statistics.median(timings) * 1000
+
+
+def calibrate(target_ms, parallelism, min_memory_mib, max_memory_mib, min_time_cost, samples):
+    memory_cost = min_memory_mib * 1024
+    time_cost = min_time_cost
+    latency = measure(time_cost, memory_cost, parallelism, samples)
+
+    while memory_cost * 2 <= max_memory_mib * 1024:
+        candidate = measure(time_cost, memory_cost * 2, parallelism, samples)
+        if candidate > target_ms:
+            break
+        memory_cost *= 2
+        latency = candidate
+
+    while True:
+        candidate = measure(time_cost + 1, memory_cost, parallelism, samples)
+        if candidate > target_ms:
+            break
+        time_cost += 1
+        latency = candidate
+
+    return {
+        "ARGON2_TIME_COST": time_cost,
+        "ARGON2_MEMORY_COST": memory_cost,
+        "ARGON2_PARALLELISM": parallelism
+    }, latency
+
+
+def write_env_file(path, settings):
+    try:
+        with open(path) as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        lines = []
+
+    remaining = dict(settings)
+    for i, line in enumerate(lines):
+        key = line.split("=", 1)[0].strip()
+        if key in remaining:
+            lines[i] = f"{key}={remaining.pop(key)}"
+
+    lines += [f"{key}={value}" for key, value in remaining.items()]
+
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target-ms", type=float, default=250)
+    parser.add_argument("--parallelism", type=int, default=4)
+    # OWASP minimums: 19 MiB with a time cost of 2
+    parser.add_argument("--min-memory-mib", type=int, default=19)
+    parser.add_argument("--max-memory-mib", type=int, default=256)
+    parser.add_argument("--min-time-cost", type=int, default=2)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--env-file", help="write the settings into this env file")
+    args = parser.parse_args()
+
+    settings, latency = calibrate(
+        args.target_ms,
+        args.parallelism,
+        args.min_memory_mib,
+        args.max_memory_mib,
+        args.min_time_cost,
+        args.samples
+    )
+
+    if latency > args.target_ms:
+        print(f"# the minimum parameters already take {latency:.0f} ms here")
+    else:
+        print(f"# {latency:.0f} ms per hash (target {args.target_ms:.0f} ms)")
+
+    for key, value in settings.items():
+        print(f"{key}={value}")
+
+    if args.env_file:
+        write_env_file(args.env_file, settings)
+        print(f"# written to {args.env_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,77 @@
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
+from email.message import EmailMessage
+
+import aiosmtplib
 from decouple import config
 
-conf = ConnectionConfig(
-    MAIL_USERNAME=config("MAIL_USERNAME"),
-    MAIL_PASSWORD=config("MAIL_PASSWORD"),
-    MAIL_FROM=config("MAIL_FROM"),
-    MAIL_PORT=config("MAIL_PORT", cast=int),
-    MAIL_SERVER=config("MAIL_SERVER"),
-    MAIL_STARTTLS=config("MAIL_STARTTLS", cast=bool),  # False for SSL
-    MAIL_SSL_TLS=config("MAIL_SSL_TLS", cast=bool),    # True for SSL
-    USE_CREDENTIALS=config("USE_CREDENTIALS", cast=bool),
-)
-
-async def send_reset_email(email: str, reset_link: str):
-    message = MessageSchema(
-        subject="Reset your password",
-        recipients=[email],
-        body=f"""
+MAIL_USERNAME = config("MAIL_USERNAME")
+MAIL_PASSWORD = config("MAIL_PASSWORD")
+MAIL_FROM = config("MAIL_FROM")
+MAIL_PORT = config("MAIL_PORT", cast=int)
+MAIL_SERVER = config("MAIL_SERVER")
+MAIL_STARTTLS = config("MAIL_STARTTLS", cast=bool)  # False for SSL
+MAIL_SSL_TLS = config("MAIL_SSL_TLS", cast=bool)    # True for SSL
+USE_CREDENTIALS = config("USE_CREDENTIALS", cast=bool)
+
+
+def reset_email(reset_link: str):
+    subject = "Reset your password"
+    body = f"""
         <p>You requested a password reset.</p>
         <p><a href="{reset_link}">Click here to reset your password</a></p>
         <p>This link expires in 30 minutes.</p>
-        """,
-        subtype="html",
-    )
+        """
+    return subject, body
+
+
+class SMTPConnection:
+    """
+    One SMTP session reused across messages: connects (and logs in) on the
+    first send, reconnects once when the server has dropped it meanwhile.
+    """
+
+    def __init__(
+        self,
+        hostname=MAIL_SERVER,
+        port=MAIL_PORT,
+        username=MAIL_USERNAME if USE_CREDENTIALS else None,
+        password=MAIL_PASSWORD if USE_CREDENTIALS else None,
+        use_tls=MAIL_SSL_TLS,
+        start_tls=MAIL_STARTTLS,
+        sender=MAIL_FROM
+    ):
+        self.sender = sender
+        self._smtp = aiosmtplib.SMTP(
+            hostname=hostname,
+            port=port,
+            username=username,
+            password=password,
+            use_tls=use_tls,
+            start_tls=start_tls
+        )
+
+    @property
+    def is_connected(self):
+        return self._smtp.is_connected
+
+    async def send(self, recipient: str, subject: str, html: str):
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = recipient
+        message["Subject"] = subject
+        message.set_content(html, subtype="html")
+
+        if not self._smtp.is_connected:
+            await self._smtp.connect()
+
+        try:
+            await self._smtp.send_message(message)
+        except aiosmtplib.SMTPServerDisconnected:
+            await self._smtp.connect()
+            await self._smtp.send_message(message)
 
-    fm = FastMail(conf)
-    await fm.send_message(message)
+    async def close(self):
+        if self._smtp.is_connected:
+            try:
+                await self._smtp.quit()
+            except aiosmtplib.SMTPException:
+                self._smtp.close()
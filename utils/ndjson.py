@@ -0,0 +1,31 @@
+MAX_LINE_BYTES = 64 * 1024
+
+
+class NDJSONLineTooLong(Exception):
+    pass
+
+
+async def iter_ndjson_lines(stream, max_line_bytes=MAX_LINE_BYTES):
+    """
+    Yields (line_number, line) for every non-empty line of an async byte
+    stream, holding at most one partial line in memory.
+    """
+    buffer = b""
+    line_number = 0
+
+    async for chunk in stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+
+        for line in lines:
+            line_number += 1
+            if len(line) > max_line_bytes:
+                raise NDJSONLineTooLong(line_number)
+            if line.strip():
+                yield line_number, line
+
+        if len(buffer) > max_line_bytes:
+            raise NDJSONLineTooLong(line_number + 1)
+
+    if buffer.strip():
+        yield line_number + 1, buffer
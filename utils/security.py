@@ -1,8 +1,19 @@
+from decouple import config
 from passlib.context import CryptContext
 
+# Argon2 cost; the defaults are passlib's. Pick values for the host with
+# `python -m utils.argon2_calibration`. Hashes made with other values are
+# upgraded on the next successful login.
+ARGON2_TIME_COST = config("ARGON2_TIME_COST", default=3, cast=int)
+ARGON2_MEMORY_COST = config("ARGON2_MEMORY_COST", default=65536, cast=int)  # KiB
+ARGON2_PARALLELISM = config("ARGON2_PARALLELISM", default=4, cast=int)
+
 pwd_context = CryptContext(
     schemes=["argon2"],
-    deprecated="auto"
+    deprecated="auto",
+    argon2__rounds=ARGON2_TIME_COST,
+    argon2__memory_cost=ARGON2_MEMORY_COST,
+    argon2__parallelism=ARGON2_PARALLELISM
 )
 
 def hash_password(password: str) -> str:
@@ -10,3 +21,10 @@ def hash_password(password: str) -> str:
 
 def verify_password(password: str, hashed_password: str) -> bool:
     return pwd_context.verify(password, hashed_password)
+
+def verify_and_update_password(password: str, hashed_password: str):
+    """
+    Returns (valid, new_hash); new_hash is set when the stored hash was made
+    with outdated parameters and should replace it.
+    """
+    return pwd_context.verify_and_update(password, hashed_password)
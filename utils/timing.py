@@ -0,0 +1,23 @@
+class Timing:
+    """
+    Count, average and maximum of recorded durations, for metrics endpoints.
+    """
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 2) if self.count else 0,
+            "max_ms": round(self.max * 1000, 2)
+        }